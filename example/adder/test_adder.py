@@ -28,6 +28,23 @@ async def test_boundary(adder_env):
                 await adder_env.add_agent.exec_add(a, b, cin)
 
 
+class AddTransaction(toffee.RandTransaction):
+    a = toffee.RandField(width=64)
+    b = toffee.RandField(width=64)
+    cin = toffee.RandField(dist={0: 1, 1: 1})
+
+    @toffee.constraint("a", "b", "cin")
+    def no_overflow(self, a, b, cin):
+        return a + b + cin < 2**64
+
+
+@toffee_test.testcase
+async def test_constrained_random(adder_env):
+    stream = AddTransaction().stream(batch_size=256, background="thread")
+    await stream.drive(adder_env.add_agent.exec_add, 1000)
+    stream.close()
+
+
 """
 Coverage definition
 """
@@ -46,6 +63,7 @@ def adder_cover_point(adder):
     g.add_cover_point(adder.io_a, {"a > 0": fc.Gt(0)}, name="signal a set")
     g.add_cover_point(adder.io_b, {"b > 0": fc.Gt(0)}, name="signal b set")
     g.add_cover_point(adder.io_sum, {"sum > 0": fc.Gt(0)}, name="signal sum set")
+    g.add_auto_bin_point(adder.io_sum, width=64, bin_num=4, name="sum range")
 
     return g
 
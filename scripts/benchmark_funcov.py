@@ -0,0 +1,75 @@
+import argparse
+import timeit
+
+import toffee.funcov as fc
+
+
+class Target:
+    def __init__(self):
+        self.value = 0
+
+
+def bench_create_group(number):
+    """Time the construction of an empty CovGroup."""
+
+    return timeit.timeit(lambda: fc.CovGroup("bench"), number=number)
+
+
+def bench_add_watch_point(number, bins):
+    """Time add_watch_point with a number of CovEq bins into one group."""
+
+    target = Target()
+    group = fc.CovGroup("bench")
+    bin_dict = {f"bin_{i}": fc.Eq(i) for i in range(bins)}
+    names = iter(range(number))
+    return timeit.timeit(
+        lambda: group.add_watch_point(target, bin_dict, name=f"point_{next(names)}"),
+        number=number,
+    )
+
+
+def bench_fixture(number, points, bins):
+    """Time a CovGroup built as in a testcase fixture, with its points, and sampled once."""
+
+    targets = [Target() for _ in range(points)]
+
+    def build():
+        group = fc.CovGroup()
+        for i, target in enumerate(targets):
+            group.add_watch_point(
+                target, {f"bin_{j}": fc.Eq(j) for j in range(bins)}, name=f"point_{i}"
+            )
+        group.sample()
+
+    return timeit.timeit(build, number=number)
+
+
+def report(name, seconds, number):
+    print(
+        f"{name:<40} {seconds / number * 1e6:10.2f} us/op {number / seconds:12.0f} op/s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark CovGroup creation")
+    parser.add_argument(
+        "-n", "--number", type=int, default=10000, help="operations per test"
+    )
+    parser.add_argument(
+        "--points", type=int, default=16, help="points in a fixture group"
+    )
+    parser.add_argument("--bins", type=int, default=8, help="bins of each point")
+    args = parser.parse_args()
+
+    report("CovGroup()", bench_create_group(args.number), args.number)
+    report(
+        f"add_watch_point({args.bins} bins)",
+        bench_add_watch_point(args.number, args.bins),
+        args.number,
+    )
+    fixtures = max(args.number // args.points, 1)
+    report(
+        f"fixture group ({args.points}x{args.bins} bins)",
+        bench_fixture(fixtures, args.points, args.bins),
+        fixtures,
+    )
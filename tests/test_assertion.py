@@ -0,0 +1,98 @@
+import asyncio
+import math
+
+import toffee_test
+
+import toffee
+from toffee.triggers import *
+
+
+class FakeXData:
+    def __init__(self):
+        self.value = 0
+
+
+class DUT:
+    def __init__(self):
+        self.event = asyncio.Event()
+        self.req = FakeXData()
+        self.ack = FakeXData()
+        self.rst = FakeXData()
+
+    def Step(self, cycles): ...
+
+
+async def drive(dut, trace):
+    for req, ack, rst in trace:
+        dut.req.value, dut.ack.value, dut.rst.value = req, ack, rst
+        await ClockCycles(dut)
+
+
+@toffee_test.testcase
+async def test_req_ack_within():
+    dut = DUT()
+    dut.event.clear()
+    toffee.start_clock(dut)
+
+    toffee.setup_logging(toffee.CRITICAL)
+    within = toffee.assert_property("req_ack", dut.req, toffee.Sequence(dut.ack, 1, 3))
+    nxt = toffee.assert_property("req_ack_next", dut.req, dut.ack, next_cycle=True)
+
+    trace = [
+        (1, 0, 0),  # cycle 0: req, acked at cycle 2
+        (0, 0, 0),
+        (0, 1, 0),
+        (1, 0, 0),  # cycle 3: req, acked at cycle 4
+        (1, 1, 0),  # cycle 4: req, never acked
+        (0, 0, 0),
+        (0, 0, 0),
+        (0, 0, 0),
+        (0, 0, 0),
+    ]
+    await drive(dut, trace)
+
+    assert within.attempts == len(trace)
+    assert within.matches == 3
+    assert within.passes == 2
+    assert within.fails == 1
+    assert within.failures == [(4, 7)]
+    assert within.vacuous == len(trace) - 3
+
+    assert nxt.passes == 1
+    assert nxt.fails == 2
+    assert [start for start, _ in nxt.failures] == [0, 4]
+    toffee.setup_logging()
+
+
+@toffee_test.testcase
+async def test_sequence_and_cover():
+    dut = DUT()
+    dut.event.clear()
+    toffee.start_clock(dut)
+
+    # req ##1 req ##[1:$] ack
+    seq = toffee.Sequence(dut.req).then(dut.req).then(dut.ack, 1, math.inf)
+    cover = toffee.cover_property("burst", seq)
+    prop = toffee.assert_property(
+        "no_ack_in_reset", lambda: dut.rst.value, lambda: not dut.ack.value
+    )
+    guarded = toffee.assert_property(
+        "ack_follows", dut.req, toffee.Sequence(dut.ack, 1, 2), disable=dut.rst
+    )
+
+    trace = [
+        (1, 0, 0),
+        (1, 0, 0),  # req ##1 req, from cycles 0 and 1
+        (1, 0, 1),  # reset drops the attempts of ack_follows
+        (0, 0, 0),
+        (0, 0, 0),
+        (0, 1, 0),  # ack ends the bursts started at cycles 0 and 1
+    ]
+    await drive(dut, trace)
+
+    assert cover.matches == 2
+    assert prop.attempts == len(trace)
+    assert prop.passes == 1 and prop.fails == 0
+    assert guarded.disabled == 2
+    assert guarded.attempts == len(trace) - 1
+    assert guarded.pending == 0
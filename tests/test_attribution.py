@@ -0,0 +1,74 @@
+import toffee.funcov as fc
+from toffee.attribution import CovAttribution
+
+
+class Value:
+    def __init__(self, value=0):
+        self.value = value
+
+
+def build_group():
+    v = Value()
+    g = fc.CovGroup("group", disable_sample_when_point_hinted=False)
+    g.add_watch_point(
+        v, {f"{'low' if i < 2 else 'high'}{i}": fc.Eq(i) for i in range(4)}, name="v"
+    )
+    g.add_watch_point(v, {"odd": lambda x: x.value % 2 == 1}, name="odd")
+    g.mark_function("v", "test_low", bin_name="low*")
+    g.mark_function("v", "test_high", bin_name=["high2", "high3"])
+    g.mark_function("odd", "test_low")
+    return v, g
+
+
+def test_runtime_attribution():
+    v, g = build_group()
+    index = CovAttribution().add_marks(g)
+    runs = {
+        "test_low": [0, 1],
+        "test_high": [2, 3],
+        "test_all": [0, 1, 2, 3],
+        "test_one": [1],
+    }
+    for test, values in runs.items():
+        with index.testcase(test, g):
+            for value in values:
+                v.value = value
+                g.sample()
+
+    assert index.bins_of("test_low") == [
+        ("group", "v", "low0"),
+        ("group", "v", "low1"),
+        ("group", "odd", "odd"),
+    ]
+    assert sorted(index.tests_of("group", "v", "low1")) == [
+        "test_all",
+        "test_low",
+        "test_one",
+    ]
+    assert index.tests_of("group", "v", "high2", marked=True) == ["test_high"]
+    assert index.unhit_marks() == {}
+    assert index.minimize() == ["test_all"]
+    assert sorted(index.minimize(["test_low", "test_high", "test_one"])) == [
+        "test_high",
+        "test_low",
+    ]
+
+
+def test_merge_and_export():
+    first, second = CovAttribution(), CovAttribution()
+    first.add_hits("a", "g", "p", ["x", "y"])
+    second.add_hits("b", "g", "p", ["z"]).add_hits("a", "g", "q", ["w"])
+    v, g = build_group()
+    v.value = 3
+    g.sample()
+    second.add_dict(g.as_dict(), "c")
+
+    merged = CovAttribution.from_dict(first.merge(second).as_dict())
+    assert sorted(merged.bins_of("a")) == [
+        ("g", "p", "x"),
+        ("g", "p", "y"),
+        ("g", "q", "w"),
+    ]
+    assert merged.bins_of("c") == [("group", "v", "high3"), ("group", "odd", "odd")]
+    assert len(merged.covered()) == 6
+    assert merged.minimize() == ["a", "c", "b"]
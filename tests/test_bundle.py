@@ -182,3 +182,116 @@ def test_bundle_list():
 
     bundle.assign({"c": 1, "d": 2, "vec": [{"a": 3, "b": 4}, {"a": 5, "b": 6}]}, multilevel=True)
     bundle.assign({"c": 1, "d": 2, "vec": [{"a": 3, "b": 4}, {"a": 5, "b": 6}]}, multilevel=False)
+
+def test_lazy_bind():
+    toffee.setup_logging(INFO)
+
+    class MyDUT(FakeDUT):
+        def __init__(self):
+            self.io_a, self.io_b = FakePin(), FakePin()
+            self.io_sub_a, self.io_sub_b = FakePin(), FakePin()
+            self.io_sub_deep_a, self.io_sub_deep_b = FakePin(), FakePin()
+            self.io_vec_0, self.io_vec_1 = FakePin(), FakePin()
+            self.io_bl_0_a, self.io_bl_0_b, self.io_bl_1_a, self.io_bl_1_b = (
+                FakePin(),
+                FakePin(),
+                FakePin(),
+                FakePin(),
+            )
+
+    class LeafBundle(Bundle):
+        a, b = Signals(2)
+
+    class SubBundle(Bundle):
+        a, b = Signals(2)
+        deep = LeafBundle.from_prefix("deep_")
+
+    class TopBundle(Bundle):
+        signals = ["a", "b"]
+        sub = SubBundle.from_prefix("sub_")
+        vec = SignalList("vec_#", 2)
+        bl = BundleList(LeafBundle, "bl_#_", 2)
+
+    dut = MyDUT()
+    eager = TopBundle.from_prefix("io_").bind(dut)
+    bundle = TopBundle.from_prefix("io_").bind(dut, lazy=True)
+
+    assert "a" not in bundle.sub.__dict__
+    assert "a" not in bundle.sub.deep.__dict__
+    assert bundle.sub.deep.a is dut.io_sub_deep_a
+    assert bundle.sub.a is dut.io_sub_a
+    assert "a" not in bundle.bl[1].__dict__
+
+    assert bundle.a is dut.io_a
+    assert bundle.vec[1] is dut.io_vec_1
+    assert bundle.bl[1].b is dut.io_bl_1_b
+    assert bundle.as_dict(multilevel=False) == eager.as_dict(multilevel=False)
+    assert [name for name, _ in bundle.all_signals()] == [
+        name for name, _ in eager.all_signals()
+    ]
+
+    bundle.bind(dut)
+    assert bundle.bl[0].a is dut.io_bl_0_a
+
+    # a failed lazy bind is reported with its cause and retried on the next access
+    leaf = (
+        LeafBundle.from_prefix("io_sub_").set_write_mode_as_imme().bind(dut, lazy=True)
+    )
+    for _ in range(2):
+        try:
+            leaf.a
+            assert False, "the lazy bind should fail without IsOutIO"
+        except RuntimeError as e:
+            assert "IsOutIO" in str(e)
+    dut.io_sub_a.IsOutIO = dut.io_sub_b.IsOutIO = lambda: True
+    dut.io_sub_a.AsImmWrite = dut.io_sub_b.AsImmWrite = lambda: None
+    assert leaf.a is dut.io_sub_a
+
+
+def test_bundle_compact_members():
+    class LeafBundle(Bundle):
+        a, b = Signals(2)
+
+    class TopBundle(Bundle):
+        a = Signal()
+        sub = LeafBundle.from_prefix("sub_")
+        vec = SignalList("vec_#", 2)
+        bl = BundleList(LeafBundle, "bl_#_", 4)
+
+    bundle_1, bundle_2 = TopBundle(), TopBundle()
+
+    # a template declared under several names gets a copy for each name
+    shared = LeafBundle.from_prefix("sub_")
+    shared_vec = SignalList("vec_#", 2)
+
+    class OtherBundle(Bundle):
+        other, again = shared, shared
+        vec, other_vec = shared_vec, shared_vec
+
+    class UserBundle(Bundle):
+        sub = shared
+
+    dut = FakeDUT()
+    dut.io_sub_a, dut.io_sub_b, dut.io_vec_0, dut.io_vec_1 = (
+        FakePin(),
+        FakePin(),
+        FakePin(),
+        FakePin(),
+    )
+    user, other = UserBundle.from_prefix("io_").bind(dut), OtherBundle.from_prefix(
+        "io_"
+    ).bind(dut)
+    assert user.sub is user.sub and user.sub.a is dut.io_sub_a
+    assert other.other is not other.again and other.again.b is dut.io_sub_b
+    assert other.other_vec[1] is dut.io_vec_1 and other.vec is not other.other_vec
+    assert bundle_1.current_level_signals is bundle_2.current_level_signals
+    assert "sub" not in bundle_1.__dict__ and "vec" not in bundle_1.__dict__
+
+    assert bundle_1.sub is not bundle_2.sub
+    assert bundle_1.sub is bundle_1.sub
+    assert bundle_1.vec.names is bundle_2.vec.names
+    assert bundle_1.bl.bundles == [None] * 4
+    assert bundle_1.bl[2] is not bundle_2.bl[2]
+    assert [idx for idx, _ in bundle_1.bl.created_bundles()] == [2]
+
+    assert bundle_1.__dut_requests__ is None
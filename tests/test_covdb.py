@@ -0,0 +1,84 @@
+import toffee.funcov as fc
+from toffee.covdb import CovDB
+
+
+class Value:
+    def __init__(self, value=0):
+        self.value = value
+
+
+def run_group(values, name="group"):
+    v = Value()
+    g = fc.CovGroup(name, disable_sample_when_point_hinted=False)
+    g.add_watch_point(v, {"zero": fc.Eq(0), "one": fc.Eq(1), "two": fc.Eq(2)}, name="v")
+    g.add_auto_bin_point(v, low=0, high=7, bin_num=4, name="range")
+    g.add_cross_point(["v", "range"], name="cross")
+    g.mark_function("v", "test_a", bin_name="one")
+    g.set_guard(lambda: v.value < 7)
+    for value in values:
+        v.value = value
+        g.sample()
+    return g
+
+
+def test_merge_runs(tmp_path):
+    runs = [[0, 0, 5], [1, 7], [0, 3]]
+    paths = []
+    for i, values in enumerate(runs):
+        path = tmp_path / f"run{i}.db"
+        CovDB().add_run([run_group(values)]).save(path)
+        paths.append(path)
+
+    db = CovDB.merge_files(paths)
+    assert db.runs == 3
+
+    expected = run_group([x for values in runs for x in values]).as_dict()
+    (merged,) = db.as_dicts()
+    for key in (
+        "name",
+        "bin_num_total",
+        "bin_num_hints",
+        "point_num_hints",
+        "__lineno__",
+    ):
+        assert merged[key] == expected[key]
+    assert [p["bins"] for p in merged["points"]] == [
+        p["bins"] for p in expected["points"]
+    ]
+    assert merged["points"][2]["kind"] == "cross"
+    assert merged["points"][0]["functions"] == {"one": ["test_a"]}
+    assert merged["__sample_count__"] == 6
+    assert merged["__skip_count__"] == 1
+
+    unhit = db.unhit_bins()
+    assert ("group", "v", "two") in unhit
+    assert ("group", "v", "zero") not in unhit
+    assert len(unhit) == merged["bin_num_total"] - merged["bin_num_hints"]
+
+    # in-memory merge gives the same counters as the files
+    other = CovDB()
+    for values in runs:
+        other.merge(CovDB().add_run([run_group(values)]))
+    assert other.as_dicts() == db.as_dicts()
+
+    db.save(tmp_path / "all.db")
+    assert CovDB.load(tmp_path / "all.db").as_dicts() == db.as_dicts()
+
+
+def test_changed_definition():
+    changed = fc.CovGroup("group")
+    changed.add_watch_point(Value(), {"zero": fc.Eq(0)}, name="v")
+    db = CovDB().add_run([run_group([0])]).add_run([changed, run_group([1], "other")])
+    assert [d["name"] for d in db.as_dicts()] == ["group", "group", "other"]
+
+
+def test_bin_count_check(tmp_path):
+    db = CovDB().add_run([run_group([0])])
+    (record,) = db.groups.values()
+    record.counters.append(0)
+    db.save(tmp_path / "bad.db")
+    try:
+        CovDB.load(tmp_path / "bad.db")
+        assert False, "a counter block that does not match the bins should be rejected"
+    except ValueError as e:
+        assert "Corrupted" in str(e)
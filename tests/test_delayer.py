@@ -1,7 +1,7 @@
 import asyncio
 
-
 import toffee_test
+
 import toffee
 from toffee.triggers import *
 
@@ -28,6 +28,8 @@ async def test_delayer():
 
     delayed_a = toffee.Delayer(dut.a, 2)
     delayed_b = toffee.Delayer(dut.b, 3)
+    delayed_a3 = toffee.Delayer(dut.a, 3)
+    late_a = deep_a = None
 
     for i in range(10):
         dut.a.value = i
@@ -41,5 +43,19 @@ async def test_delayer():
 
         if i < 3:
             assert delayed_b.value is None
+            assert delayed_a3.value is None
         else:
             assert delayed_b.value == dut.b.value - 3
+            assert delayed_a3.value == dut.a.value - 3
+            assert delayed_a3.value_list == [i - 3, i - 2, i - 1, i]
+
+        if i == 4:
+            # the values kept for the other Delayers of the signal stay when it grows
+            deep_a = toffee.Delayer(dut.a, 4)
+        elif i == 5:
+            late_a = toffee.Delayer(dut.a, 1)
+        elif i == 6:
+            assert late_a.value is None
+        elif i > 6:
+            assert late_a.value == dut.a.value - 1
+    assert deep_a.value == dut.a.value - 4
@@ -95,6 +95,392 @@ def test_funcov():
     print("test_funcov pass pid: ", os.getpid(), file=sys.stderr)
 
 
+def test_compiled_sample():
+    import random
+
+    v = TextData(0)
+    bins = {
+        "eq": fc.Eq(3),
+        "ne": fc.Ne(3),
+        "in": fc.In([1, 5, 9]),
+        "in_range": fc.In(range(10, 20)),
+        "not_in": fc.NotIn((1, 2)),
+        "gt": fc.Gt(15),
+        "ge": fc.Ge(15),
+        "lt": fc.Lt(4),
+        "le": fc.Le(4),
+        "range": fc.IsInRange(6, 8),
+        "and": [fc.Gt(2), fc.Lt(6), fc.Ne(4)],
+        "python": lambda x: x.value % 7 == 0,
+        "mixed": [fc.Ge(1), lambda x: x.value % 2 == 1],
+    }
+    g = fc.CovGroup("compiled", disable_sample_when_point_hinted=False)
+    g.add_watch_point(v, bins, name="compiled")
+    g.add_watch_point(v, dict(bins), name="reference", dynamic_bin=True)
+
+    random.seed(0)
+    for _ in range(200):
+        v.value = random.randint(0, 25)
+        g.sample()
+        assert dict(g.cover_point("compiled")["hints"]) == dict(
+            g.cover_point("reference")["hints"]
+        )
+    assert g.is_point_covered("compiled") == g.is_point_covered("reference")
+
+    report = g.as_dict()
+    assert report["points"][0]["bins"] == report["points"][1]["bins"]
+
+    g.reset_point("compiled")
+    assert not g.is_point_covered("compiled")
+    v.value = 3
+    g.sample()
+    assert g.cover_point("compiled")["hints"]["eq"] == 1
+    assert g.cover_point("reference")["hints"]["eq"] > 1
+
+
+def test_deferred_sample():
+    import random
+
+    def build(*values):
+        g = fc.CovGroup("deferred", disable_sample_when_point_hinted=False)
+        g.add_watch_point(
+            values[0],
+            {
+                "eq": fc.Eq(3),
+                "not_in": fc.NotIn([1, 2]),
+                "not_in_empty": fc.NotIn([]),
+                "in_range": fc.In(range(10, 20)),
+                "gt": fc.Gt(15),
+                "and": [fc.Gt(2), fc.Lt(6), fc.Ne(4)],
+                "python": lambda x: x.value % 7 == 0,
+            },
+            name="a",
+        )
+        g.add_watch_point(
+            values[1], {"wide": fc.Ge(2**64), "le": fc.Le(9)}, name="wide"
+        )
+        g.add_watch_point(
+            values[2],
+            {
+                "eq": fc.Eq(2**63 - 1),
+                "big": fc.Ge(2**63),
+                "small": fc.Lt(2**63),
+                "range": fc.IsInRange(2**63 - 1, 2**63),
+                "float": fc.Gt(2.5),
+            },
+            name="uint64",
+        )
+        return g
+
+    inline_values = TextData(0), TextData(0), TextData(0)
+    deferred_values = TextData(0), TextData(0), TextData(0)
+    inline = build(*inline_values)
+    deferred = build(*deferred_values).defer_sample(buffer_size=64)
+    background = build(*deferred_values).defer_sample(buffer_size=32, background=True)
+
+    random.seed(1)
+    for _ in range(500):
+        a, b = random.randint(0, 25), random.choice([0, 9, 10, 2**64, 2**70])
+        c = random.choice([5, 2**63 - 1, 2**63, 2**63 + 1, 2**64 - 1])
+        for values in (inline_values, deferred_values):
+            values[0].value, values[1].value, values[2].value = a, b, c
+        for g in (inline, deferred, background):
+            g.sample()
+
+    assert deferred.sampler.recorded() > 0
+    expected = inline.as_dict()
+    for g in (deferred, background):
+        report = g.as_dict()
+        assert report["points"] == expected["points"]
+        assert report["hinted"] == expected["hinted"]
+        assert report["__sample_count__"] == expected["__sample_count__"]
+    background.clear()
+
+
+def test_cross_and_transition():
+    a, b = TextData(0), TextData(0)
+
+    def build():
+        g = fc.CovGroup("cross", disable_sample_when_point_hinted=False)
+        g.add_watch_point(
+            a, {"a0": fc.Eq(0), "a1": fc.Eq(1), "a_odd": fc.In([1, 3])}, name="a"
+        )
+        g.add_watch_point(b, {"small": fc.Lt(4), "big": fc.Ge(4)}, name="b")
+        g.add_cross_point(["a", "b"], name="a_x_b")
+        g.add_transition_point(
+            a, {"0->1": [0, 1], "1->0->1": [1, 0, 1], "3->3": [3, 3]}, name="a_seq"
+        )
+        g.add_transition_point(b, {"0->5": [0, 5]}, name="b_change", on_change=True)
+        return g
+
+    values = [(0, 0), (1, 0), (0, 0), (1, 5), (3, 5), (3, 5), (1, 9)]
+    inline, deferred = build(), build().defer_sample(buffer_size=4)
+    for g in (inline, deferred):
+        for va, vb in values:
+            a.value, b.value = va, vb
+            g.sample()
+
+    for g in (inline, deferred):
+        hints = dict(g.cover_point("a_x_b")["hints"])
+        assert len(hints) == 6
+        assert hints == {
+            "a0,small": 2,
+            "a0,big": 0,
+            "a1,small": 1,
+            "a1,big": 2,
+            "a_odd,small": 1,
+            "a_odd,big": 4,
+        }
+        assert dict(g.cover_point("a_seq")["hints"]) == {
+            "0->1": 2,
+            "1->0->1": 1,
+            "3->3": 1,
+        }
+        assert g.cover_point("b_change")["hints"]["0->5"] == 1
+        assert g.cover_point("a_x_b")["bins"]["a1,big"] == ("a1", "big")
+
+    report = inline.as_dict()
+    cross = report["points"][2]
+    assert cross["kind"] == "cross" and cross["cross"] == ["a", "b"]
+    assert report["bin_num_total"] == 3 + 2 + 6 + 3 + 1
+    assert not inline.is_point_covered("a_x_b")
+
+    a.value, b.value = 0, 7
+    inline.sample()
+    assert inline.is_point_covered("a_x_b")
+    inline.reset_point("a_x_b")
+    assert inline.cover_point("a_x_b")["hints"]["a0,big"] == 0
+    try:
+        inline.del_point("a")
+        assert False
+    except ValueError:
+        pass
+
+
+def test_auto_bin_point():
+    import random
+
+    v, w = TextData(0), TextData(0)
+
+    def build():
+        g = fc.CovGroup("auto", disable_sample_when_point_hinted=False)
+        g.add_auto_bin_point(v, low=10, high=109, bin_num=8, name="uniform")
+        g.add_auto_bin_point(w, width=64, mode="log2", name="log2")
+        g.add_auto_bin_point(v, edges=[0, 5, 50, 200], name="edges")
+        g.add_auto_bin_point(w, width=64, bin_num=4, name="quarters")
+        g.add_cross_point(["uniform", "edges"])
+        return g
+
+    # The reference point checks every bin condition
+    reference = fc.CovGroup("reference", disable_sample_when_point_hinted=False)
+    for point in build().cov_points.values():
+        if point.get("kind") == "auto":
+            reference.add_watch_point(
+                point["taget"], dict(point["bins"]), name=str(id(point))
+            )
+
+    inline, deferred = build(), build().defer_sample(buffer_size=50)
+    assert len(inline.cover_point("log2")["bins"]) == 65
+    assert list(inline.cover_point("edges")["bins"]) == [
+        "[0, 4]",
+        "[5, 49]",
+        "[50, 199]",
+    ]
+
+    random.seed(2)
+    for _ in range(300):
+        v.value = random.randint(0, 250)
+        w.value = random.getrandbits(random.randint(0, 64))
+        if random.random() < 0.3:
+            w.value = random.choice([2**62, 2**63 - 1, 2**63, 2**64 - 1])
+        for g in (inline, deferred, reference):
+            g.sample()
+
+    expected = [p["bins"] for p in reference.as_dict()["points"]]
+    for g in (inline, deferred):
+        report = g.as_dict()
+        assert [p["bins"] for p in report["points"][:4]] == expected
+        assert report["points"][4]["bins"] == inline.as_dict()["points"][4]["bins"]
+    assert inline.cover_point("log2")["hints"]["[0, 0]"] > 0
+
+    # a float is placed in the bin of its floor
+    auto = fc.CovAutoBins(10, 109, bin_num=8)
+    assert auto.index_of(22.5) == auto.index_of(22) and isinstance(
+        auto.index_of(22.5), int
+    )
+    assert fc.CovAutoBins(0, 255, mode="log2").index_of(5.5) == 3
+
+
+def test_timeline():
+    v = TextData(0)
+    cycle = [0]
+
+    def build():
+        g = fc.CovGroup("timeline", disable_sample_when_point_hinted=False)
+        g.add_watch_point(v, {f"is{i}": fc.Eq(i) for i in range(4)}, name="v")
+        g.add_auto_bin_point(v, low=0, high=15, bin_num=4, name="range")
+        g.add_cross_point(["v", "range"])
+        return g.enable_timeline(interval=4, cycle=lambda: cycle[0], flat_window=3)
+
+    values = [0, 0, 1, 1, 2, 9, 2, 3] + [0] * 40
+    inline, deferred = build(), build().defer_sample(buffer_size=8)
+    for g in (inline, deferred):
+        cycle[0] = 0
+        for value in values:
+            cycle[0] += 10
+            v.value = value
+            g.sample()
+
+    for g in (inline, deferred):
+        report = g.as_dict()
+        first_hits = {b["name"]: b["first_hit"] for b in report["points"][0]["bins"]}
+        assert first_hits == {"is0": 10, "is1": 30, "is2": 50, "is3": 80}
+        assert report["points"][1]["bins"][2]["first_hit"] == 60
+        assert report["points"][2]["bins"][0]["first_hit"] == 10
+        timeline = report["timeline"]
+        assert timeline["stamps"][:3] == [40, 80, 120]
+        assert timeline["coverage"][:2] == [5 / 24, 10 / 24]
+        # the coverage stops growing after cycle 80, and the group stops after 3 flat snapshots
+        assert report["__stop_sample__"]
+        assert g.sample_count < len(values)
+    assert inline.timeline.efficiency() > 0
+
+    # in background mode the snapshots wait for the counts of the worker
+    background = build().defer_sample(buffer_size=4, background=True)
+    expected = list(inline.timeline.coverage)
+    cycle[0] = 0
+    for value in values:
+        cycle[0] += 10
+        v.value = value
+        background.sample()
+        for i, coverage in enumerate(background.timeline.coverage):
+            assert coverage == expected[min(i, len(expected) - 1)]
+    report = background.as_dict()
+    assert report["timeline"]["coverage"][:2] == [5 / 24, 10 / 24]
+    assert report["__stop_sample__"]
+    assert background.sample_count >= inline.sample_count
+    background.clear()
+
+
+def test_guard_sample():
+    v = TextData(0)
+    valid = TextData(0)
+    g = fc.CovGroup("guard", disable_sample_when_point_hinted=False)
+    g.add_watch_point(v, {f"is{i}": fc.Eq(i) for i in range(4)}, name="v")
+    g.set_guard(valid, fc.Eq(1))
+    for i in range(8):
+        v.value = i % 4
+        valid.value = i % 2
+        g.sample()
+    report = g.as_dict()
+    assert [b["hints"] for b in report["points"][0]["bins"]] == [0, 2, 0, 2]
+    assert report["__sample_count__"] == 4
+    assert report["__skip_count__"] == 4
+    assert report["__sample_calln__"] == 8
+
+    g.set_guard(lambda: v.value > 1)
+    v.value = 0
+    g.sample()
+    v.value = 2
+    g.sample()
+    assert g.skip_count == 5 and g.sample_count == 5
+    g.set_guard(None)
+    v.value = 0
+    g.sample()
+    assert g.is_all_covered()
+
+
+def test_sample_on_transaction():
+    import asyncio
+
+    import toffee
+    from toffee.agent import Agent
+    from toffee.agent import driver_method
+
+    class DUT:
+        def __init__(self):
+            self.event = asyncio.Event()
+
+        def Step(self, cycles): ...
+
+    class FakeBundle:
+        async def step(self):
+            pass
+
+    class FakeAgent(Agent):
+        @driver_method()
+        async def exec_op(self, value):
+            return value
+
+    v = TextData(0)
+    g = fc.CovGroup("transaction", disable_sample_when_point_hinted=False)
+    g.add_watch_point(v, {f"is{i}": fc.Eq(i) for i in range(4)}, name="v")
+
+    async def main():
+        toffee.start_clock(DUT())
+        agent = FakeAgent(FakeBundle())
+        g.sample_on_transaction(agent.exec_op)
+        for i in range(4):
+            v.value = await agent.exec_op(i)
+
+    toffee.run(main())
+    assert g.sample_count == 4
+    assert [b["hints"] for b in g.as_dict()["points"][0]["bins"]] == [2, 1, 1, 0]
+
+
+def test_retire_points():
+    a, b = TextData(0), TextData(0)
+    g = fc.CovGroup("retire")
+    g.add_watch_point(a, {f"a{i}": fc.Eq(i) for i in range(4)}, name="a")
+    g.add_watch_point(b, {"b0": fc.Eq(0), "b1": fc.Eq(1)}, name="b", once=False)
+    g.add_watch_point(a, {"odd": lambda x: x.value % 2 == 1}, name="odd")
+    g.add_cross_point(["a", "odd"], name="cross", once=False)
+    g.add_watch_point(b, {"big": fc.Gt(5)}, name="big")
+
+    for value in [0, 1, 2, 3, 0, 1, 2, 3]:
+        a.value = b.value = value
+        g.sample()
+    # the crossed points are still evaluated, the once point "big" is retired
+    assert g.cover_point("a")["hints"]["a1"] == 2
+    assert g.cover_point("b")["hints"]["b1"] == 2
+    assert g.sampler.retired() == 0
+    b.value = 6
+    for _ in range(3):
+        g.sample()
+    assert g.cover_point("big")["hints"]["big"] == 1
+    assert g.sampler.retired() == 1
+
+    g.stop_sample()
+    assert g.sample_stoped()
+    g.resume_sample()
+    assert g.sampler.retired() == 0
+    g.sample()
+    assert g.cover_point("big")["hints"]["big"] == 2
+
+    # a retired bin stops counting before the lists are compiled again
+    for buffer_size in (0, 8):
+        g = fc.CovGroup("retire_bins").defer_sample(buffer_size=buffer_size)
+        g.add_watch_point(a, {f"a{i}": fc.Eq(i) for i in range(64)}, name="a")
+        for value in [0, 1, 0, 1, 0, 2, 2, 2]:
+            a.value = value
+            g.sample()
+        g.flush()
+        hints = g.cover_point("a")["hints"]
+        assert [hints[f"a{i}"] for i in range(4)] == [1, 1, 1, 0]
+        assert g.sampler.retire_pending == 3
+
+
+def test_group_location():
+    import inspect
+
+    g = fc.CovGroup()
+    lineno = inspect.currentframe().f_lineno - 1
+    assert g.filename == __file__
+    assert g.lineno == lineno
+    assert g.name == "%s:%s" % (__file__, lineno)
+    assert g.as_dict()["__lineno__"] == lineno
+
+
 def test_sample_assert(request):
     assert 1 == 1
     print("test_sample_assert pass pid: ", os.getpid(), file=sys.stderr)
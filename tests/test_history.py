@@ -0,0 +1,66 @@
+import asyncio
+
+import toffee_test
+
+import toffee
+from toffee.triggers import *
+
+
+class FakeXData:
+    def __init__(self):
+        self.value = 0
+
+
+class DUT:
+    def __init__(self):
+        self.event = asyncio.Event()
+        self.valid = FakeXData()
+        self.data = FakeXData()
+
+    def Step(self, cycles): ...
+
+
+@toffee_test.testcase
+async def test_history():
+    dut = DUT()
+    dut.event.clear()
+    toffee.start_clock(dut)
+
+    valid = toffee.track(dut.valid, 4)
+    data = toffee.History(dut.data, 2)
+    valid_seq = [0, 1, 1, 0, 0, 0, 0, 1]
+
+    for i, v in enumerate(valid_seq):
+        dut.valid.value = v
+        dut.data.value = i // 2
+        await ClockCycles(dut)
+
+        assert valid.past(0) == v
+        assert valid.size == min(i + 1, 4)
+        assert valid.values() == valid_seq[max(i - 3, 0) : i + 1]
+        assert valid.past(1) == (valid_seq[i - 1] if i >= 1 else None)
+        assert toffee.past(dut.valid, 1) == valid.past(1)
+
+        assert valid.rose() == (i >= 1 and v == 1 and valid_seq[i - 1] == 0)
+        assert valid.fell() == (i >= 1 and v == 0 and valid_seq[i - 1] == 1)
+        assert toffee.rose(dut.valid) == valid.rose()
+
+        window = valid_seq[max(i - 3, 0) : i + 1]
+        assert toffee.past_any(dut.valid, 4) == any(window)
+        assert toffee.past_all(dut.valid, 4) == all(window)
+        assert toffee.past_count(dut.valid, 4) == sum(window)
+        assert valid.count(2, lambda x: x == 0) == window[-2:].count(0)
+
+        assert data.stable() == (i >= 1 and i % 2 == 1)
+        assert toffee.stable(dut.data) == data.stable()
+
+    # the queries reuse the tracked History of a signal when it is deep enough
+    assert toffee.track(dut.valid, 3) is valid
+    assert toffee.track(dut.data, 1) is data
+
+    # a deeper History starts empty and takes over the queries
+    deep = toffee.track(dut.data, 8)
+    assert deep is not data and deep.size == 0
+    assert toffee.past(dut.data, 0) is None
+    await ClockCycles(dut)
+    assert toffee.past(dut.data, 0) == dut.data.value
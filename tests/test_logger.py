@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import time
+
+import toffee_test
+
+import toffee
+from toffee.logger import AsyncHandler
+from toffee.logger import current_component
+from toffee.triggers import ClockCycles
+
+
+class SlowHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        time.sleep(0.001)
+        self.records.append(record)
+
+
+def test_async_logging(tmp_path):
+    log_file = tmp_path / "toffee.log"
+    toffee.setup_logging(
+        toffee.INFO, console_display=False, log_file=str(log_file), async_mode=True
+    )
+
+    for i in range(100):
+        toffee.info("match %d", i, extra={"log_id": "cmp"})
+    toffee.flush_logging()
+
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 100
+    assert "(id: cmp)" in lines[0] and "(id: (id:" not in lines[0]
+    assert lines[-1].endswith("match 99\x1b[0m")
+
+    toffee.setup_logging()
+
+
+def test_async_drop_policy():
+    target = SlowHandler()
+    handler = AsyncHandler([target], queue_size=4, drop_policy="drop")
+    logger = logging.getLogger("toffee_test_drop")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+
+    for i in range(50):
+        if i == 49:
+            logger.warning("kept %d", i)
+        else:
+            logger.info("info %d", i)
+    handler.flush()
+
+    assert handler.dropped > 0
+    assert len(target.records) + handler.dropped == 50
+    # the records from WARNING on are never dropped
+    assert target.records[-1].getMessage() == "kept 49"
+
+    logger.removeHandler(handler)
+    handler.close()
+    assert not handler.thread.is_alive()
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class DUT:
+    def __init__(self):
+        self.event = asyncio.Event()
+
+    def Step(self, cycles): ...
+
+
+@toffee_test.testcase
+async def test_cycle_stamp():
+    dut = DUT()
+    dut.event.clear()
+    toffee.start_clock(dut)
+
+    handler = ListHandler()
+    toffee.setup_logging(toffee.INFO, console_display=False)
+    toffee.get_logger().addHandler(handler)
+
+    for _ in range(3):
+        await ClockCycles(dut)
+        toffee.info("tick")
+
+    assert [r.cycle for r in handler.records] == [1, 2, 3]
+    toffee.get_logger().removeHandler(handler)
+    toffee.setup_logging()
+
+
+def test_rate_limit():
+    handler = ListHandler()
+    toffee.setup_logging(toffee.INFO, console_display=False)
+    toffee.get_logger().addHandler(handler)
+    record_filter = toffee.logger.record_filter
+
+    toffee.set_rate_limit(2, 5, log_id="stuck")
+    toffee.set_rate_limit(1)
+    for i in range(20):
+        toffee.warning("stuck %d", i, extra={"log_id": "stuck"})
+        toffee.info("same site %d", i)
+    assert record_filter.suppressed["stuck"] == 20 - 2 - 3
+    assert [r.args[0] for r in handler.records if r.msg == "stuck %d"] == [
+        0,
+        1,
+        6,
+        11,
+        16,
+    ]
+    assert [r.args[0] for r in handler.records if r.msg == "same site %d"] == [0]
+    assert handler.records[0].cycle == -1
+
+    toffee.summary()
+    assert "stuck:\t15" in handler.records[-1].getMessage()
+    assert "test_logger.py:" in handler.records[-1].getMessage()
+
+    toffee.set_rate_limit(None)
+    toffee.set_rate_limit(None, log_id="stuck")
+    record_filter.seen.clear()
+    record_filter.suppressed.clear()
+    toffee.get_logger().removeHandler(handler)
+    toffee.setup_logging()
+
+
+@toffee_test.testcase
+async def test_stats():
+    dut = DUT()
+    dut.event.clear()
+    toffee.start_clock(dut)
+
+    toffee.setup_logging(toffee.INFO, console_display=False)
+    toffee.logger.stats_handler.reset()
+    toffee.set_stats_window(4)
+
+    async def monitor():
+        current_component.set("Agent.monitor")
+        for _ in range(6):
+            await ClockCycles(dut)
+            toffee.warning("late", extra={"log_id": "timing"})
+
+    await toffee.create_task(monitor())
+    toffee.error("unscoped")
+
+    stats = toffee.get_stats()
+    assert stats["severity"] == {"WARNING": 6, "ERROR": 1}
+    assert stats["id"] == {"timing": {"WARNING": 6}, "default": {"ERROR": 1}}
+    assert stats["component"] == {"Agent.monitor": {"WARNING": 6}}
+    assert stats["window_size"] == 4
+    assert stats["window"] == {0: {"WARNING": 3}, 4: {"WARNING": 3, "ERROR": 1}}
+
+    handler = ListHandler()
+    toffee.get_logger().addHandler(handler)
+    toffee.summary()
+    text = handler.records[-1].getMessage()
+    assert "timing:\t6" in text and "Agent.monitor:\t6" in text
+
+    toffee.set_stats_window(1000)
+    toffee.get_logger().removeHandler(handler)
+    toffee.setup_logging()
@@ -0,0 +1,142 @@
+import asyncio
+
+from toffee.stimulus import *
+
+
+class PacketTransaction(RandTransaction):
+    addr = RandField(0, 0xFF)
+    length = RandField(dist={1: 1, (2, 8): 3})
+    kind = RandField(dist={0: 1, 1: 1})
+    data = RandField(width=128)
+    solve_before = [("kind", "addr")]
+
+    @constraint("addr", "length")
+    def in_page(self, addr, length):
+        return (addr & 0xF) + length <= 16
+
+    @constraint("kind", "addr", vectorized=True)
+    def kind_addr(self, kind, addr):
+        return (kind == 0) | (addr >= 0x80)
+
+
+def check_transaction(txn):
+    assert 0 <= txn["addr"] <= 0xFF
+    assert 1 <= txn["length"] <= 8
+    assert (txn["addr"] & 0xF) + txn["length"] <= 16
+    assert txn["kind"] == 0 or txn["addr"] >= 0x80
+    assert 0 <= txn["data"] < 2**128
+
+
+def test_generate():
+    generator = PacketTransaction(seed=1)
+    assert generator.order == ["kind", "addr", "length", "data"]
+
+    transactions = generator.generate(1000)
+    assert len(transactions) == 1000
+    for txn in transactions:
+        check_transaction(txn)
+    assert {txn["kind"] for txn in transactions} == {0, 1}
+
+    assert PacketTransaction(seed=1).generate(1000) == transactions
+
+    generator.set_range("addr", 0x80, 0x8F).set_dist("length", {4: 1})
+    for txn in generator.generate(100):
+        check_transaction(txn)
+        assert 0x80 <= txn["addr"] <= 0x8F and txn["length"] == 4
+    assert PacketTransaction.addr.high == 0xFF
+
+
+def test_unsolvable():
+    class BadTransaction(RandTransaction):
+        a = RandField(0, 3)
+
+        @constraint("a")
+        def never(self, a):
+            return a > 3
+
+    try:
+        BadTransaction().generate(10)
+        assert False
+    except ValueError:
+        pass
+
+
+def test_stream():
+    for background in (None, "thread", "process"):
+        stream = PacketTransaction(seed=2).stream(batch_size=64, background=background)
+        transactions = stream.take(200)
+        stream.close()
+        assert len(transactions) == 200
+        for txn in transactions:
+            check_transaction(txn)
+
+    calls = []
+
+    async def exec_packet(addr, length, kind, data):
+        calls.append((addr, length, kind, data))
+        return addr
+
+    stream = PacketTransaction(seed=3).stream(batch_size=16)
+    results = asyncio.run(stream.drive(exec_packet, 50))
+    assert len(calls) == 50 and results == [addr for addr, _, _, _ in calls]
+
+
+class Pin:
+    def __init__(self):
+        self.value = 0
+
+
+def test_coverage_feedback():
+    import toffee.funcov as fc
+
+    class WideTransaction(RandTransaction):
+        a = RandField(width=32)
+        b = RandField(dist={0: 1, 1: 1})
+
+    pin_a, pin_b = Pin(), Pin()
+    group = fc.CovGroup("feedback")
+    group.add_watch_point(
+        pin_a,
+        {
+            "eq": fc.Eq(12345),
+            "range": fc.IsInRange(100, 110),
+            "in": fc.In([7, 2**31]),
+            "and": [fc.Gt(1000), fc.Lt(1003)],
+            "any": lambda x: x.value > 0,
+        },
+        name="a",
+    )
+    group.add_watch_point(pin_b, {"one": fc.Eq(1)}, name="b")
+
+    assert CoverageFeedback.solve_condition(fc.Ne(0), 0, 10) is None
+    assert CoverageFeedback.solve_condition([fc.Ge(3), fc.Le(20)], 0, 10) == [(3, 10)]
+
+    generator = WideTransaction(seed=4)
+    feedback = CoverageFeedback(generator, group, {"a": pin_a, "b": "b"}, batch_size=16)
+    assert sorted(feedback.unhit_targets("a")) == [
+        (7, 7),
+        (100, 110),
+        (1001, 1002),
+        (12345, 12345),
+        (2**31, 2**31),
+    ]
+
+    async def exec_wide(a, b):
+        pin_a.value, pin_b.value = a, b
+        group.sample()
+
+    count = asyncio.run(feedback.drive(exec_wide, 10000))
+    assert group.is_all_covered()
+    assert count < 1000
+    assert generator.fields["a"].dist is None
+
+    # the hints of a deferred group are flushed before they are read
+    deferred = fc.CovGroup("deferred").defer_sample(buffer_size=1000)
+    deferred.add_watch_point(
+        pin_a, {"eq": fc.Eq(5), "range": fc.IsInRange(8, 9)}, name="a"
+    )
+    feedback = CoverageFeedback(WideTransaction(seed=1), deferred, {"a": "a"})
+    pin_a.value = 5
+    deferred.sample()
+    assert feedback.unhit_targets("a") == [(8, 9)]
+    assert feedback.hint_count() == 1
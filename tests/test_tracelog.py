@@ -0,0 +1,63 @@
+import toffee
+from toffee._compare import compare_once
+from toffee.tracelog import main
+
+
+def test_trace_log(tmp_path, capsys):
+    trace = tmp_path / "toffee.trace"
+    toffee.setup_logging(toffee.INFO, console_display=False, trace_file=str(trace))
+
+    for i in range(3):
+        toffee.info("match %d of %s", i, "port", extra={"log_id": "cmp"})
+    toffee.warning("wide value %x", 1 << 100)
+    compare_once({"sum": 3}, {"sum": 3}, match_detail=True)
+    toffee.summary()
+
+    records = list(toffee.read_trace(str(trace)))
+    assert [r.message for r in records[:3]] == [f"match {i} of port" for i in range(3)]
+    assert records[0].template == records[2].template == "match %d of %s"
+    assert records[0].log_id == "cmp" and records[0].levelname == "INFO"
+    assert records[3].args == (1 << 100,)
+    assert records[3].message == f"wide value {1 << 100:x}"
+    assert "{'sum': 3}" in records[4].message
+    assert records[5].message.startswith("Log Summary")
+    assert "INFO:\t4" in records[5].message
+
+    stats = toffee.trace_summary(str(trace))
+    assert stats["severity"] == {"INFO": 5, "WARNING": 1}
+    assert stats["id"] == {"cmp": 3, "default": 3}
+
+    assert main([str(trace), "--level", "warning"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert len(out) == 1 and "TOFFEE_WARNING" in out[0]
+
+    assert main([str(trace), "--id", "cmp", "--grep", "match [12]"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert len(out) == 2 and out[0].endswith("match 1 of port")
+    assert "(id: cmp)" in out[0]
+
+    main([str(trace), "--summary"])
+    assert "WARNING:\t1" in capsys.readouterr().out
+
+    toffee.setup_logging()
+
+
+def test_trace_log_async(tmp_path):
+    log_file, trace = tmp_path / "toffee.log", tmp_path / "toffee.trace"
+    toffee.setup_logging(
+        toffee.INFO,
+        console_display=False,
+        log_file=str(log_file),
+        async_mode=True,
+        trace_file=str(trace),
+    )
+
+    for i in range(3):
+        toffee.info("match %d of %s", i, "port", extra={"log_id": "cmp"})
+    toffee.flush_logging()
+
+    assert log_file.read_text().splitlines()[2].endswith("match 2 of port\x1b[0m")
+    toffee.setup_logging()
+    records = list(toffee.read_trace(str(trace)))
+    assert [r.template for r in records] == ["match %d of %s"] * 3
+    assert [r.args for r in records] == [(i, "port") for i in range(3)]
@@ -0,0 +1,77 @@
+import asyncio
+
+import toffee
+from toffee.agent import Agent
+from toffee.agent import driver_method
+from toffee.agent import monitor_method
+from toffee.transaction import KIND_DRIVER
+from toffee.transaction import KIND_MONITOR
+from toffee.triggers import ClockCycles
+
+
+class DUT:
+    def __init__(self):
+        self.event = asyncio.Event()
+        self.out = 0
+
+    def Step(self, cycles): ...
+
+
+class FakeBundle:
+    def __init__(self, dut):
+        self.dut = dut
+
+    async def step(self):
+        await self.dut.event.wait()
+
+
+class FakeAgent(Agent):
+    @driver_method()
+    async def exec_op(self, a, b=1):
+        await ClockCycles(self.bundle.dut, a)
+        self.bundle.dut.out = a + b
+        return {"sum": a + b}
+
+    @monitor_method()
+    async def watch_out(self):
+        if self.bundle.dut.out:
+            ret, self.bundle.dut.out = self.bundle.dut.out, 0
+            return ret
+
+
+def test_transaction_trace(tmp_path):
+    path = str(tmp_path / "agent.trace")
+
+    async def main():
+        dut = DUT()
+        toffee.start_clock(dut)
+        agent = FakeAgent(FakeBundle(dut))
+        with toffee.TransactionTrace(path, chunk_size=2) as trace:
+            trace.attach(agent)
+            for a in (1, 2, 3):
+                await agent.exec_op(a, b=1 << 70)
+            await ClockCycles(dut, 2)
+            trace.detach(agent)
+            await agent.exec_op(1)
+        return trace.count
+
+    assert toffee.run(main()) == 6
+
+    data = toffee.read_transactions(path)
+    kinds = list(data["kind"])
+    assert kinds.count(KIND_DRIVER) == 3 and kinds.count(KIND_MONITOR) == 3
+
+    drivers = [i for i, k in enumerate(kinds) if k == KIND_DRIVER]
+    assert [data["component"][i] for i in drivers] == ["FakeAgent.exec_op"] * 3
+    assert [data["args"][i] for i in drivers] == [
+        {"a": a, "b": 1 << 70} for a in (1, 2, 3)
+    ]
+    assert [data["result"][i]["sum"] for i in drivers] == [
+        a + (1 << 70) for a in (1, 2, 3)
+    ]
+    assert [int(data["end"][i] - data["start"][i]) for i in drivers] == [1, 2, 3]
+
+    monitors = [i for i, k in enumerate(kinds) if k == KIND_MONITOR]
+    assert [data["component"][i] for i in monitors] == ["FakeAgent.watch_out"] * 3
+    assert [data["args"][i] for i in monitors] == [None] * 3
+    assert [data["result"][i] for i in monitors] == [a + (1 << 70) for a in (1, 2, 3)]
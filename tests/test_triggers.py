@@ -0,0 +1,55 @@
+import asyncio
+
+import toffee_test
+
+import toffee
+from toffee.triggers import *
+
+
+class FakeXData:
+    def __init__(self):
+        self.value = 0
+
+
+class DUT:
+    def __init__(self):
+        self.event = asyncio.Event()
+        self.valid = FakeXData()
+        self.ready = FakeXData()
+        self.cycle = 0
+        # the outputs after each step
+        self.trace = [(0, 0), (1, 0), (1, 0), (1, 1), (0, 1), (0, 0)]
+
+    def Step(self, cycles):
+        self.cycle += cycles
+        if self.cycle <= len(self.trace):
+            self.valid.value, self.ready.value = self.trace[self.cycle - 1]
+
+
+@toffee_test.testcase
+async def test_compound_triggers():
+    dut = DUT()
+    dut.event.clear()
+    toffee.start_clock(dut)
+
+    handshake = Level(dut.valid) & Level(dut.ready)
+    fired = await (handshake | Timeout(10))
+    assert dut.cycle == 4
+    assert len(fired) == 2 and not any(isinstance(t, Timeout) for t in fired)
+
+    # ready is still high, valid fell at this clock event
+    fell = Fall(dut.valid)
+    fired = await wait_for(fell & ~Level(dut.valid, 1) | Rise(dut.ready))
+    assert dut.cycle == 5 and fired[0] is fell
+
+    timeout = Timeout(3)
+    fired = await (Edge(dut.ready) & Level(dut.valid) | timeout)
+    assert dut.cycle == 8 and fired == [timeout]
+
+    # the waits of one loop share a single watcher task
+    results = await toffee.gather(
+        wait_for(Timeout(2)), wait_for(Timeout(4)), wait_for(Predicate(lambda: True))
+    )
+    assert dut.cycle == 12 and [len(r) for r in results] == [1, 1, 1]
+    watcher = asyncio.get_event_loop().trigger_watcher
+    assert watcher.task is None and watcher.entries == []
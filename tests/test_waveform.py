@@ -0,0 +1,119 @@
+import asyncio
+import os
+
+import toffee_test
+
+import toffee
+from toffee.debug import PdbToffee
+from toffee.triggers import ClockCycles
+
+
+class DUT:
+    def __init__(self):
+        self.event = asyncio.Event()
+        self.cycle = 0
+        self.dumping = True
+        self.dumped = []  # the cycles in the waveform
+        self.flushes = 0
+        self.file = None
+
+    def Step(self, cycles):
+        for _ in range(cycles):
+            if self.dumping:
+                self.dumped.append(self.cycle)
+                if self.file is not None:
+                    with open(self.file, "a") as f:
+                        f.write(f"{self.cycle}\n")
+            self.cycle += 1
+
+    def FlushWaveform(self):
+        self.flushes += 1
+
+    def WaveformPause(self):
+        self.dumping = False
+
+    def WaveformResume(self):
+        self.dumping = True
+
+    def SetWaveform(self, filename):
+        self.file = filename
+        open(self.file, "w").close()
+
+
+@toffee_test.testcase
+async def test_waveform_windows():
+    dut = DUT()
+    dut.event.clear()
+    toffee.start_clock(dut)
+
+    wave = toffee.WaveformController(dut, flush_interval=4).attach()
+    wave.add_window(2, 5)
+    wave.add_window(8, 10)
+    await ClockCycles(dut, 12)
+    assert dut.dumped == [2, 3, 4, 8, 9]
+
+    # turned off at run time, the windows no longer apply
+    wave.clear_windows()
+    wave.disable()
+    await ClockCycles(dut, 3)
+    wave.enable()
+    await ClockCycles(dut, 2)
+    assert dut.dumped[5:] == [15, 16]
+    assert dut.flushes >= 2
+
+
+@toffee_test.testcase
+async def test_waveform_attach_late():
+    dut = DUT()
+    dut.event.clear()
+    toffee.start_clock(dut)
+
+    await ClockCycles(dut, 6)
+    wave = toffee.WaveformController(dut).attach()
+    assert wave.cycle == dut.cycle
+    wave.add_window(8, 10)
+    await ClockCycles(dut, 6)
+    assert dut.dumped == [0, 1, 2, 3, 4, 5, 8, 9]
+
+
+@toffee_test.testcase
+async def test_waveform_around_failures(tmp_path):
+    dut = DUT()
+    dut.event.clear()
+    toffee.start_clock(dut)
+
+    toffee.setup_logging(toffee.ERROR, console_display=False)
+    wave = toffee.WaveformController(dut).attach()
+    wave.dump_around_failures(4, 2, filename=str(tmp_path / "seg_{}.txt"))
+
+    await ClockCycles(dut, 10)
+    toffee.error("mismatch")
+    await ClockCycles(dut, 11)
+    wave.close()
+    toffee.setup_logging()
+
+    kept = []
+    for name in sorted(os.listdir(tmp_path)):
+        with open(tmp_path / name) as f:
+            kept.extend(int(line) for line in f)
+    # at least 4 cycles before the error at cycle 10 and 2 after it
+    assert wave.triggers == 1
+    assert set(range(6, 13)) <= set(kept)
+    assert len(kept) <= 12
+
+
+def test_debugger_twave():
+    dut = DUT()
+    pdb = PdbToffee(dut, waveform=toffee.WaveformController(dut))
+    pdb.do_tstep("3")
+    assert dut.dumped == [0, 1, 2] and dut.flushes == 1
+
+    pdb.do_twave("off")
+    pdb.do_tstep("2")
+    pdb.do_twave("on")
+    pdb.do_twave("window 7 9")
+    pdb.do_twave("autoflush off")
+    pdb.do_tstep("5")
+    assert dut.dumped == [0, 1, 2, 7, 8]
+    # flushed when paused only
+    assert dut.flushes == 4
@@ -1,25 +1,43 @@
 from .agent import *
+from .assertion import *
 from .asynchronous import *
+from .attribution import *
 from .bundle import *
+from .covdb import *
 from .delay import *
 from .env import *
 from .executor import *
 from .funcov import *
+from .history import *
 from .logger import *
 from .model import *
+from .randomizer import *
+from .stimulus import *
+from .tracelog import *
+from .transaction import *
 from .triggers import *
 from .utils import *
+from .waveform import *
 
 __all__ = (
     agent.__all__
     + model.__all__
     + triggers.__all__
     + asynchronous.__all__
+    + assertion.__all__
     + logger.__all__
     + executor.__all__
     + funcov.__all__
+    + covdb.__all__
+    + attribution.__all__
     + bundle.__all__
     + env.__all__
     + utils.__all__
     + delay.__all__
+    + history.__all__
+    + randomizer.__all__
+    + stimulus.__all__
+    + tracelog.__all__
+    + transaction.__all__
+    + waveform.__all__
 )
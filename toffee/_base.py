@@ -1,4 +1,32 @@
 __all__ = ['MObject']
 
+import sys
+from array import array
+
+
 class MObject(object):
     pass
+
+
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _to_le(values: array) -> bytes:
+    """
+    Get the bytes of an array in little-endian order
+    """
+    if _BIG_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(typecode, data) -> array:
+    """
+    Build an array from bytes in little-endian order
+    """
+    values = array(typecode)
+    values.frombytes(data)
+    if _BIG_ENDIAN:
+        values.byteswap()
+    return values
@@ -9,7 +9,11 @@ from .asynchronous import Event
 from .asynchronous import Queue
 from ._compare import compare_once
 from .executor import add_priority_task
+from .logger import current_component
 from .logger import warning
+from .transaction import KIND_DRIVER
+from .transaction import KIND_MONITOR
+from .transaction import TransactionTrace
 
 
 class BaseAgent:
@@ -19,6 +23,28 @@ class BaseAgent:
         self.agent_name = ""
         self.compare_func = compare_func
         self.model_infos = {}
+        self.transaction_callbacks = []
+        self.component = self.name
+        self.trace = None  # the TransactionTrace the transactions are written to
+
+    def add_transaction_callback(self, callback):
+        """
+        Add a callback that is called with each transaction.
+
+        Args:
+            callback: A function that takes the transaction, which is the result of the DUT
+                      for a driver and the monitored item for a monitor.
+        """
+
+        self.transaction_callbacks.append(callback)
+
+    def notify_transaction(self, item):
+        """
+        Call the transaction callbacks with a transaction.
+        """
+
+        for callback in self.transaction_callbacks:
+            callback(item)
 
 
 class Driver(BaseAgent):
@@ -124,12 +150,12 @@ class Driver(BaseAgent):
         for model_result in model_results:
             if model_result is not None and dut_result is None:
                 warning(
-                    f"The model result is {model_result}, but the DUT result is None."
+                    "The model result is %s, but the DUT result is None.", model_result
                 )
 
             elif model_result is None and dut_result is not None:
                 warning(
-                    f"The dut result is {dut_result}, but the model result is None."
+                    "The dut result is %s, but the model result is None.", dut_result
                 )
 
             elif model_result is not None and dut_result is not None:
@@ -138,10 +164,14 @@ class Driver(BaseAgent):
                 )
 
     async def model_exec_wrapper(self, model_coro, results, compare_func):
-        results["model_results"] = await model_coro
+        token = current_component.set(self.component)
+        try:
+            results["model_results"] = await model_coro
 
-        if results["dut_result"] is not None:
-            compare_func(results["dut_result"], results["model_results"])
+            if results["dut_result"] is not None:
+                compare_func(results["dut_result"], results["model_results"])
+        finally:
+            current_component.reset(token)
 
     async def process_driver_call(self, agent, arg_list, kwarg_list):
         """
@@ -155,6 +185,22 @@ class Driver(BaseAgent):
             The result of the DUT if imme_ret is False, otherwise None.
         """
 
+        self.component = f"{type(agent).__name__}.{self.name}"
+        token = current_component.set(self.component)
+        try:
+            trace = self.trace
+            if trace is None:
+                return await self.__process_driver_call(agent, arg_list, kwarg_list)
+
+            start = TransactionTrace.cycle()
+            result = await self.__process_driver_call(agent, arg_list, kwarg_list)
+            args = self.__get_args_dict(arg_list, kwarg_list)
+            trace.add(KIND_DRIVER, self.component, start, args, result)
+            return result
+        finally:
+            current_component.reset(token)
+
+    async def __process_driver_call(self, agent, arg_list, kwarg_list):
         results = {"dut_result": None, "model_results": None}
 
         model_coro = self.model_exec_wrapper(
@@ -186,6 +232,9 @@ class Driver(BaseAgent):
         else:
             raise ValueError(f"Invalid sche_order: {self.sche_order}")
 
+        if self.transaction_callbacks:
+            self.notify_transaction(results["dut_result"])
+
         return results["dut_result"]
 
 
@@ -201,6 +250,7 @@ class Monitor(BaseAgent):
         self.get_queue = Queue()
 
         self.agent = agent
+        self.component = f"{type(agent).__name__}.{self.name}"
 
         self.monitor_task = create_task(self.__monitor_forever())
         self.compare_task = create_task(self.__compare_forever())
@@ -218,6 +268,7 @@ class Monitor(BaseAgent):
     async def __compare_forever(self):
         """Compare the result forever."""
 
+        current_component.set(self.component)
         while True:
             dut_item = await self.compare_queue.get()
             for model_info in self.model_infos.values():
@@ -227,9 +278,15 @@ class Monitor(BaseAgent):
     async def __monitor_forever(self):
         """Monitor the DUT forever."""
 
+        current_component.set(self.component)
         while True:
+            start = TransactionTrace.cycle()
             ret = await self.func(self.agent)
             if ret is not None:
+                if self.trace is not None:
+                    self.trace.add(KIND_MONITOR, self.component, start, None, ret)
+                if self.transaction_callbacks:
+                    self.notify_transaction(ret)
                 await self.get_queue.put(ret)
                 await self.compare_queue.put(ret)
             await self.agent.monitor_step()
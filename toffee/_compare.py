@@ -14,13 +14,17 @@ def compare_once(dut_item, std_item, compare=None, match_detail=False):
 
     if not compare(dut_item, std_item):
         error(
-            f"Mismatch\n----- STDOUT -----\n{std_item}\n----- DUTOUT -----\n{dut_item}\n------------------"
+            "Mismatch\n----- STDOUT -----\n%s\n----- DUTOUT -----\n%s\n------------------",
+            std_item,
+            dut_item,
         )
         assert False, f"mismatch: {dut_item} != {std_item}"
     else:
         if match_detail:
             info(
-                f"Match\n----- STDOUT -----\n{std_item}\n----- DUTOUT -----\n{dut_item}\n------------------"
+                "Match\n----- STDOUT -----\n%s\n----- DUTOUT -----\n%s\n------------------",
+                std_item,
+                dut_item,
             )
         else:
             info("Match")
@@ -0,0 +1,315 @@
+__all__ = [
+    "Sequence",
+    "Property",
+    "assert_property",
+    "cover_property",
+]
+
+import asyncio
+import math
+
+from . import history  # noqa: F401, the signal history is sampled before the checks
+from ._base import MObject
+from .asynchronous import add_callback
+from .logger import error
+
+"""Temporal properties
+
+A property is checked on the values sampled at each clock cycle. Its sequences are compiled
+into small nondeterministic state machines, a state (i, k) means that step i of the sequence
+is waited for and k cycles passed since the previous step matched. An attempt of a property
+is the set of states it is in, attempts with the same set of states behave the same from then
+on, so they are kept together and advanced once per cycle whatever their number.
+"""
+
+
+class Sequence(MObject):
+    """
+    A sequence of boolean expressions separated by delays, like "a ##[1:3] b ##1 c" in SVA.
+
+    An expression is a signal, which holds when its value is non-zero, or a function without
+    arguments that returns a boolean.
+
+    Args:
+        expr: The first expression.
+        lo: The minimum delay before the first expression, 0 means the cycle the sequence
+            starts in.
+        hi: The maximum delay before the first expression, the same as lo if None, and no
+            limit if math.inf.
+    """
+
+    def __init__(self, expr, lo=0, hi=None):
+        self.steps = []
+        self.then(expr, lo, hi)
+
+    def then(self, expr, lo=1, hi=None):
+        """
+        Append an expression that holds lo to hi cycles after the previous one.
+        """
+
+        hi = lo if hi is None else hi
+        assert 0 <= lo <= hi, f"Invalid delay range [{lo}:{hi}]."
+        self.steps.append((lo, None if hi == math.inf else hi, expr))
+        return self
+
+    @staticmethod
+    def of(item):
+        """
+        Get a Sequence from a Sequence or an expression.
+        """
+
+        return item if isinstance(item, Sequence) else Sequence(item)
+
+
+def _advance(steps, states, value):
+    """
+    Advance the states of a sequence by one cycle.
+
+    Returns:
+        The states for the next cycle, and whether the sequence matched in this cycle.
+    """
+
+    last = len(steps) - 1
+    nxt = set()
+    matched = False
+    stack = list(states)
+    while stack:
+        i, k = stack.pop()
+        lo, hi, expr = steps[i]
+        if k >= lo and value(expr):
+            if i == last:
+                matched = True
+            elif steps[i + 1][0] == 0:
+                stack.append((i + 1, 0))
+            else:
+                nxt.add((i + 1, 1))
+        if hi is None:
+            nxt.add((i, min(k + 1, lo)))
+        elif k < hi:
+            nxt.add((i, k + 1))
+    return frozenset(nxt), matched
+
+
+_START = frozenset([(0, 0)])
+
+
+class Property(MObject):
+    """
+    A temporal property "antecedent |-> consequent" checked at each clock cycle.
+
+    An attempt starts at each cycle. It is vacuous if the antecedent does not match, otherwise
+    the consequent is checked from the cycle the antecedent matched in, or from the next cycle
+    if next_cycle is True, as "|=>" in SVA. Each match of the antecedent is checked separately.
+    Without a consequent the property is a cover property that counts the matches of the
+    antecedent.
+
+    Args:
+        name: The name of the property.
+        antecedent: A Sequence or an expression.
+        consequent: A Sequence or an expression, None for a cover property.
+        next_cycle: Whether the consequent starts one cycle after the antecedent matched.
+        disable: An expression, all attempts are dropped in the cycles it holds.
+        max_failures: The number of failures kept in the failures list.
+    """
+
+    def __init__(
+        self,
+        name,
+        antecedent,
+        consequent=None,
+        next_cycle=False,
+        disable=None,
+        max_failures=16,
+    ):
+        self.name = name
+        self.antecedent = Sequence.of(antecedent).steps
+        self.consequent = None
+        if consequent is not None:
+            steps = list(Sequence.of(consequent).steps)
+            if next_cycle:
+                lo, hi, expr = steps[0]
+                steps[0] = (lo + 1, None if hi is None else hi + 1, expr)
+            self.consequent = steps
+        self.disable = disable
+        self.max_failures = max_failures
+
+        self.enabled = True
+        self.attempts = 0
+        self.matches = 0
+        self.vacuous = 0
+        self.passes = 0
+        self.fails = 0
+        self.disabled = 0
+        self.failures = []  # (start cycle, fail cycle)
+
+        # (states, matched) -> start cycles of the attempts in the antecedent
+        self.__pending = {}
+        # states -> start cycles of the attempts in the consequent
+        self.__checking = {}
+
+    @property
+    def pending(self):
+        """
+        The number of attempts not finished yet.
+        """
+
+        return sum(map(len, self.__pending.values())) + sum(
+            map(len, self.__checking.values())
+        )
+
+    def reset(self):
+        """
+        Drop the attempts in flight and clear the counters.
+        """
+
+        self.__pending.clear()
+        self.__checking.clear()
+        self.attempts = self.matches = self.vacuous = 0
+        self.passes = self.fails = self.disabled = 0
+        self.failures.clear()
+
+    def __fail(self, starts, cycle):
+        self.fails += len(starts)
+        room = self.max_failures - len(self.failures)
+        self.failures.extend((start, cycle) for start in starts[:room])
+        error(
+            f"Property {self.name} failed at cycle {cycle}, "
+            f"{len(starts)} attempt(s) started at cycle {starts[0]}"
+        )
+
+    def __check(self, checking, states, starts, value, cycle):
+        states, matched = _advance(self.consequent, states, value)
+        if matched:
+            self.passes += len(starts)
+        elif not states:
+            self.__fail(starts, cycle)
+        else:
+            checking.setdefault(states, []).extend(starts)
+
+    def step(self, value, cycle):
+        """
+        Start an attempt and advance all attempts by one cycle.
+
+        Args:
+            value: The function that evaluates an expression in this cycle.
+            cycle: The number of the cycle.
+        """
+
+        if not self.enabled:
+            return
+        if self.disable is not None and value(self.disable):
+            self.disabled += self.pending
+            self.__pending.clear()
+            self.__checking.clear()
+            return
+
+        self.attempts += 1
+        pending = self.__pending
+        pending.setdefault((_START, False), []).append(cycle)
+
+        checking = {}
+        for states, starts in self.__checking.items():
+            self.__check(checking, states, starts, value, cycle)
+
+        self.__pending = {}
+        for (states, was_matched), starts in pending.items():
+            states, matched = _advance(self.antecedent, states, value)
+            if matched:
+                self.matches += len(starts)
+                if self.consequent is not None:
+                    self.__check(checking, _START, starts, value, cycle)
+            if states:
+                key = (states, was_matched or matched)
+                self.__pending.setdefault(key, []).extend(starts)
+            elif not (was_matched or matched):
+                self.vacuous += len(starts)
+        self.__checking = checking
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "attempts": self.attempts,
+            "matches": self.matches,
+            "vacuous": self.vacuous,
+            "passes": self.passes,
+            "fails": self.fails,
+            "disabled": self.disabled,
+            "pending": self.pending,
+            "failures": list(self.failures),
+        }
+
+
+class PropertyChecker(MObject):
+    """
+    The properties of an event loop, checked together in one clock callback. An expression
+    is evaluated at most once per cycle whatever the number of properties and attempts that
+    use it.
+    """
+
+    def __init__(self):
+        self.properties = []
+        self.cycle = 0
+
+    @staticmethod
+    def of_loop():
+        """
+        Get the property checker of the running event loop.
+        """
+
+        loop = asyncio.get_event_loop()
+        checker = getattr(loop, "property_checker", None)
+        if checker is None:
+            checker = loop.property_checker = PropertyChecker()
+        return checker
+
+    def step(self):
+        cache = {}
+
+        def value(expr):
+            key = id(expr)
+            ret = cache.get(key)
+            if ret is None:
+                ret = cache[key] = bool(
+                    expr.value if hasattr(expr, "value") else expr()
+                )
+            return ret
+
+        for prop in self.properties:
+            prop.step(value, self.cycle)
+        self.cycle += 1
+
+
+async def __process_properties():
+    checker = getattr(asyncio.get_event_loop(), "property_checker", None)
+    if checker is not None:
+        checker.step()
+
+
+add_callback(__process_properties)
+
+
+def assert_property(name, antecedent, consequent, next_cycle=False, **kwargs):
+    """
+    Check "antecedent |-> consequent", or "antecedent |=> consequent" if next_cycle is True,
+    at each clock cycle of the running event loop.
+
+    Returns:
+        The Property, its counters are updated as the clock runs.
+    """
+
+    prop = Property(name, antecedent, consequent, next_cycle, **kwargs)
+    PropertyChecker.of_loop().properties.append(prop)
+    return prop
+
+
+def cover_property(name, sequence, **kwargs):
+    """
+    Count the matches of a sequence at each clock cycle of the running event loop.
+
+    Returns:
+        The Property, its matches counter is updated as the clock runs.
+    """
+
+    prop = Property(name, sequence, **kwargs)
+    PropertyChecker.of_loop().properties.append(prop)
+    return prop
@@ -137,10 +137,12 @@ async def __clock_loop(dut):
     The clock loop function, which is the main loop of the asynchronous event.
     """
 
+    loop = asyncio.get_event_loop()
     while True:
         await __other_tasks_done()
         await __execute_callback()
         dut.Step(1)
+        loop.cycle += 1
         dut.event.set()
         dut.event.clear()
 
@@ -155,6 +157,7 @@ def start_clock(dut):
     # When start_clock is called, global_clock_event points to the clock event in the dut
     loop = asyncio.get_event_loop()
     loop.global_clock_event = dut.event
+    loop.cycle = 0
 
     task = create_task(__clock_loop(dut))
     task.set_name("__clock_loop")
@@ -193,7 +196,10 @@ async def main_coro(coro):
     loop = asyncio.get_event_loop()
     loop.set_exception_handler(handle_exception)
     loop.new_task_run = False
-    loop.delayer_list = []
+    loop.signal_history = None
+    loop.property_checker = None
+    loop.trigger_watcher = None
+    loop.waveform_controller = None
 
     ret = await coro
 
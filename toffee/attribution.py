@@ -0,0 +1,314 @@
+__all__ = ["CovAttribution"]
+
+import fnmatch
+import heapq
+from contextlib import contextmanager
+
+from ._base import MObject
+from .funcov import CovGroup
+
+if hasattr(int, "bit_count"):
+    _popcount = int.bit_count
+else:  # python < 3.10
+
+    def _popcount(bits):
+        return bin(bits).count("1")
+
+
+def _bit_indexes(bits):
+    """
+    Get the indexes of the set bits of an int, from the lowest one
+    """
+    digits = bin(bits)[:1:-1]
+    ret = []
+    idx = digits.find("1")
+    while idx >= 0:
+        ret.append(idx)
+        idx = digits.find("1", idx + 1)
+    return ret
+
+
+class CovAttribution(MObject):
+    """
+    A bidirectional index between testcases and coverage bins.
+
+    Bins and testcases are interned to integer ids, and the bins of a testcase are stored as
+    the bits of one python int, so unions and differences over tens of thousands of bins are
+    single operations. The index keeps the bins each testcase actually hit at run time, and the
+    bins each function is marked for with CovGroup.mark_function. Wildcard bin names of the
+    marks are resolved once, when the group is added.
+    """
+
+    def __init__(self) -> None:
+        self.bins = []  # bin id -> (group name, point name, bin name)
+        self.bin_ids = {}
+        self.tests = []  # test id -> test name
+        self.test_ids = {}
+        self.hits = {}  # test id -> bits of the bins hit by the test
+        self.marks = {}  # test id -> bits of the bins the test is marked for
+        self.__bin_tests = {}  # cache of the inverted index, keyed by "hits" or "marks"
+        self.__snapshots = {}  # test name -> [(group, {point name: {bin name: hints}})]
+
+    def bin_id(self, group: str, point: str, bin: str) -> int:
+        """
+        Get the id of a bin, a new id is allocated for an unknown bin
+        """
+        key = (group, point, bin)
+        idx = self.bin_ids.get(key)
+        if idx is None:
+            idx = self.bin_ids[key] = len(self.bins)
+            self.bins.append(key)
+        return idx
+
+    def test_id(self, test: str) -> int:
+        """
+        Get the id of a testcase, a new id is allocated for an unknown testcase
+        """
+        idx = self.test_ids.get(test)
+        if idx is None:
+            idx = self.test_ids[test] = len(self.tests)
+            self.tests.append(test)
+        return idx
+
+    def __add_bits(self, table, test, bits):
+        if bits == 0:
+            return
+        tid = self.test_id(test)
+        table[tid] = table.get(tid, 0) | bits
+        self.__bin_tests.clear()
+
+    def add_hits(self, test: str, group: str, point: str, bin_names):
+        """
+        Record that a testcase hit some bins of a point
+        """
+        bits = 0
+        for name in bin_names:
+            bits |= 1 << self.bin_id(group, point, name)
+        self.__add_bits(self.hits, test, bits)
+        return self
+
+    def add_dict(self, group: dict, test: str):
+        """
+        Record the bins hit in a group in the format of CovGroup.as_dict as hit by a testcase,
+        eg. the coverage of a run that executed only this testcase
+        """
+        bits = 0
+        for point in group["points"]:
+            for b in point["bins"]:
+                if b["hints"] > 0:
+                    bits |= 1 << self.bin_id(group["name"], point["name"], b["name"])
+        self.__add_bits(self.hits, test, bits)
+        return self
+
+    @staticmethod
+    def __snapshot(group: CovGroup):
+        group.flush()
+        return {
+            name: dict(point["hints"].items())
+            for name, point in group.cov_points.items()
+        }
+
+    def begin_test(self, test: str, groups):
+        """
+        Start recording the bins hit by a testcase, the hints of the groups are saved
+
+        Args:
+            test: The name of the testcase.
+            groups: A CovGroup or a list of CovGroups.
+        """
+        if isinstance(groups, CovGroup):
+            groups = [groups]
+        self.__snapshots[test] = [(g, CovAttribution.__snapshot(g)) for g in groups]
+        return self
+
+    def end_test(self, test: str):
+        """
+        Stop recording a testcase, the bins whose hints grew since begin_test are hit by it
+        """
+        bits = 0
+        for group, before in self.__snapshots.pop(test):
+            for name, hints in CovAttribution.__snapshot(group).items():
+                old = before.get(name, {})
+                for bin_name, count in hints.items():
+                    if count > old.get(bin_name, 0):
+                        bits |= 1 << self.bin_id(group.name, name, bin_name)
+        self.__add_bits(self.hits, test, bits)
+        return self
+
+    @contextmanager
+    def testcase(self, test: str, groups):
+        """
+        Record the bins hit by the code in the with block as hit by a testcase
+        """
+        self.begin_test(test, groups)
+        try:
+            yield self
+        finally:
+            self.end_test(test)
+
+    @staticmethod
+    def __resolve(point: dict, bin_name: str):
+        """
+        Get the bin names a mark refers to
+        """
+        names = list(point["bins"].keys())
+        if bin_name == "anonymous" and bin_name not in point["bins"]:
+            return names
+        if bin_name.endswith("(not fond)"):
+            return []
+        if "*" in bin_name or "?" in bin_name:
+            return fnmatch.filter(names, bin_name)
+        return [bin_name] if bin_name in point["bins"] else []
+
+    def add_marks(self, group: CovGroup):
+        """
+        Add the functions marked on the bins of a group with mark_function
+        """
+        tests = {}
+        for point_name, point in group.cov_points.items():
+            for bin_name, functions in point["functions"].items():
+                bits = 0
+                for name in CovAttribution.__resolve(point, bin_name):
+                    bits |= 1 << self.bin_id(group.name, point_name, name)
+                for test in functions:
+                    tests[test] = tests.get(test, 0) | bits
+        for test, bits in tests.items():
+            self.__add_bits(self.marks, test, bits)
+        return self
+
+    def __keys(self, bits):
+        return [self.bins[idx] for idx in _bit_indexes(bits)]
+
+    def bins_of(self, test: str, marked=False):
+        """
+        Get the bins hit by a testcase, or the bins it is marked for
+
+        Returns:
+            A list of (group name, point name, bin name) tuples
+        """
+        table = self.marks if marked else self.hits
+        tid = self.test_ids.get(test)
+        return self.__keys(table.get(tid, 0)) if tid is not None else []
+
+    def tests_of(self, group: str, point: str, bin: str, marked=False):
+        """
+        Get the testcases that hit a bin, or that are marked for it
+        """
+        key = "marks" if marked else "hits"
+        index = self.__bin_tests.get(key)
+        if index is None:
+            index = self.__bin_tests[key] = {}
+            for tid, bits in (self.marks if marked else self.hits).items():
+                test = self.tests[tid]
+                for idx in _bit_indexes(bits):
+                    index.setdefault(idx, []).append(test)
+        bid = self.bin_ids.get((group, point, bin))
+        return list(index.get(bid, [])) if bid is not None else []
+
+    def covered(self):
+        """
+        Get the bins hit by any testcase
+        """
+        bits = 0
+        for test_bits in self.hits.values():
+            bits |= test_bits
+        return self.__keys(bits)
+
+    def unhit_marks(self):
+        """
+        Get the bins that a testcase is marked for but did not hit
+
+        Returns:
+            A dict that maps a testcase to a list of bins
+        """
+        ret = {}
+        for tid, bits in self.marks.items():
+            missing = bits & ~self.hits.get(tid, 0)
+            if missing:
+                ret[self.tests[tid]] = self.__keys(missing)
+        return ret
+
+    def minimize(self, tests=None):
+        """
+        Choose a small set of testcases that hits the same bins as all of them, with the greedy
+        set cover. The gain of a testcase only decreases, so the gains in the heap are updated
+        lazily and most testcases are evaluated once.
+
+        Args:
+            tests: The names of the candidate testcases, all testcases if None.
+
+        Returns:
+            A list of test names, in the order they were chosen
+        """
+        if tests is None:
+            candidates = list(self.hits.items())
+        else:
+            candidates = [
+                (self.test_ids[t], self.hits.get(self.test_ids[t], 0))
+                for t in tests
+                if t in self.test_ids
+            ]
+        heap = [(-_popcount(bits), tid, bits) for tid, bits in candidates if bits]
+        heapq.heapify(heap)
+        covered, chosen = 0, []
+        while heap:
+            _, tid, bits = heapq.heappop(heap)
+            new_gain = _popcount(bits & ~covered)
+            if new_gain == 0:
+                continue
+            if heap and -new_gain > heap[0][0]:
+                heapq.heappush(heap, (-new_gain, tid, bits))
+                continue
+            covered |= bits
+            chosen.append(self.tests[tid])
+        return chosen
+
+    def merge(self, other: "CovAttribution"):
+        """
+        Merge another index into this one
+        """
+        remap = [self.bin_id(*key) for key in other.bins]
+
+        def convert(bits):
+            ret = 0
+            for idx in _bit_indexes(bits):
+                ret |= 1 << remap[idx]
+            return ret
+
+        for mine, theirs in ((self.hits, other.hits), (self.marks, other.marks)):
+            for tid, bits in theirs.items():
+                self.__add_bits(mine, other.tests[tid], convert(bits))
+        return self
+
+    def as_dict(self):
+        """
+        Export the index, the bins of a testcase are given by their indexes in "bins"
+        """
+        return {
+            "bins": [list(key) for key in self.bins],
+            "tests": {
+                name: {
+                    "hits": _bit_indexes(self.hits.get(tid, 0)),
+                    "marks": _bit_indexes(self.marks.get(tid, 0)),
+                }
+                for tid, name in enumerate(self.tests)
+            },
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> "CovAttribution":
+        """
+        Build an index from the output of as_dict
+        """
+        ret = CovAttribution()
+        for key in data["bins"]:
+            ret.bin_id(*key)
+        for name, info in data["tests"].items():
+            tid = ret.test_id(name)
+            for table, key in ((ret.hits, "hits"), (ret.marks, "marks")):
+                bits = 0
+                for idx in info[key]:
+                    bits |= 1 << idx
+                if bits:
+                    table[tid] = bits
+        return ret
@@ -19,6 +19,7 @@ from typing import Union
 
 from ._base import MObject
 from .logger import *
+from .randomizer import Randomizer
 
 class DummySignal:
     """
@@ -53,7 +54,27 @@ class UnconnectedSignal:
         return "UnconnectedSignal()"
 
 
-class Signal(UnconnectedSignal): ...
+class Signal(UnconnectedSignal):
+    def __set_name__(self, owner, name):
+        object.__setattr__(self, "_Signal__name", name)
+
+    def __get__(self, instance, owner):
+        """
+        Return the placeholder itself, unless the owner bundle is waiting for a lazy
+        bind. In that case the bundle is resolved and the connected signal is returned.
+        """
+
+        if instance is None or not isinstance(instance, Bundle):
+            return self
+
+        if not instance._Bundle__lazy_bind_pending():
+            return self
+
+        instance._Bundle__resolve_lazy_bind()
+        name = object.__getattribute__(self, "__dict__").get("_Signal__name")
+        if name is None:
+            return self
+        return instance.__dict__.get(name, self)
 
 
 def Signals(num: int):
@@ -63,17 +84,46 @@ def Signals(num: int):
 
 
 class SignalList:
+    __slots__ = ("format", "names", "signals", "lazy_owner", "attr_name")
+
     def __init__(self, format: str, limit: int, rule=None):
         assert limit > 0, "limit must be greater than 0"
         assert "#" in format, "format must contain at least one #"
 
-        self.format = format
-        self.signals = [Signal() for _ in range(limit)]
-        self.names = []
         if rule is None:
             rule = lambda num: str(num)
-        for i in range(limit):
-            self.names.append(format.replace("#", rule(i)))
+
+        self.format = format
+        self.signals = [Signal()] * limit
+        self.names = tuple(format.replace("#", rule(i)) for i in range(limit))
+        self.lazy_owner = None  # The bundle to resolve before accessing signals
+        self.attr_name = None  # The attribute name in the class body of a bundle
+
+    def __set_name__(self, owner, name):
+        if self.attr_name is None:
+            self.attr_name = name
+        else:
+            # The template is already declared under another name, this name gets its own copy
+            template = SignalList.from_signallist(self)
+            template.attr_name = name
+            setattr(owner, name, template)
+
+    def __get__(self, instance, owner):
+        """
+        A signal list declared in the class body of a bundle is a template, the signal
+        list of a bundle instance is created the first time it is accessed.
+        """
+
+        if (
+            instance is None
+            or not isinstance(instance, Bundle)
+            or self.attr_name is None
+        ):
+            return self
+
+        return instance._Bundle__adopt_member(
+            self.attr_name, SignalList.from_signallist(self)
+        )
 
     def bind_signal(self, bundle, signal_name: str, signal, info_bundle_name, info_dut_name):
         assert signal_name in self.names, f"signal name {signal_name} not in signal list"
@@ -83,15 +133,30 @@ class SignalList:
         bundle.update_signal_info(signal)
         info(f'dut\'s signal "{info_dut_name}" is connected to "{info_bundle_name}[{index}]"')
 
+    def resolve_lazy_bind(self):
+        """
+        Resolve the lazy bind of the bundle that owns this signal list.
+        """
+
+        if self.lazy_owner is not None:
+            self.lazy_owner._Bundle__resolve_lazy_bind()
+
     def assign(self, value):
+        self.resolve_lazy_bind()
         assert len(value) == len(self.signals), "value length must match signal list length"
         for i, signal in enumerate(self.signals):
             signal.value = value[i]
 
     def __getitem__(self, key):
+        if self.lazy_owner is not None:
+            self.resolve_lazy_bind()
         return self.signals[key]
 
+    def __len__(self):
+        return len(self.signals)
+
     def __str__(self):
+        self.resolve_lazy_bind()
         signal_str = ", ".join(
             f"{idx}: {signal}" for idx, signal in enumerate(self.signals)
         )
@@ -99,47 +164,131 @@ class SignalList:
 
     @classmethod
     def from_signallist(cls, old_signal_list: "SignalList"):
-        signal_list = cls("#", 1)
+        signal_list = cls.__new__(cls)
         signal_list.format = old_signal_list.format
         signal_list.signals = old_signal_list.signals[:]
-        signal_list.names = old_signal_list.names[:]
+        signal_list.names = old_signal_list.names
+        signal_list.lazy_owner = None
+        signal_list.attr_name = None
         return signal_list
 
+
 class BundleList:
+    __slots__ = (
+        "format",
+        "names",
+        "bundle_class",
+        "bundles",
+        "lazy_owner",
+        "lazy_plan",
+        "attr_name",
+    )
+
     def __init__(self, bundle, format: str, limit: int, rule=None):
         assert limit > 0, "limit must be greater than 0"
         assert "#" in format, "format must contain at least one #"
 
-        self.format = format
-        self.names = []
-        self.bundles = []
-
         if rule is None:
             rule = lambda num: str(num)
-        for i in range(limit):
-            name = format.replace("#", rule(i))
-            self.names.append(name)
-            self.bundles.append(bundle.from_prefix(name))
+
+        self.format = format
+        self.names = tuple(format.replace("#", rule(i)) for i in range(limit))
+        self.bundle_class = bundle if isinstance(bundle, type) else type(bundle)
+        self.bundles = [
+            None
+        ] * limit  # Bundles are created the first time they are accessed
+        self.lazy_owner = None  # The bundle to resolve before creating bundles
+        self.lazy_plan = None  # The lazy bind plan for the bundles to be created
+        self.attr_name = None  # The attribute name in the class body of a bundle
+
+    def __set_name__(self, owner, name):
+        if self.attr_name is None:
+            self.attr_name = name
+        else:
+            # The template is already declared under another name, this name gets its own copy
+            template = BundleList.from_bundlelist(self)
+            template.attr_name = name
+            setattr(owner, name, template)
+
+    def __get__(self, instance, owner):
+        """
+        A bundle list declared in the class body of a bundle is a template, the bundle
+        list of a bundle instance is created the first time it is accessed.
+        """
+
+        if (
+            instance is None
+            or not isinstance(instance, Bundle)
+            or self.attr_name is None
+        ):
+            return self
+
+        return instance._Bundle__adopt_member(
+            self.attr_name, BundleList.from_bundlelist(self)
+        )
+
+    def created_bundles(self):
+        """
+        Yield the bundles that have already been created.
+
+        Returns:
+            A generator of tuples (index, bundle).
+        """
+
+        for idx, bundle in enumerate(self.bundles):
+            if bundle is not None:
+                yield (idx, bundle)
+
+    def __create_bundle(self, idx):
+        """
+        Create the bundle at the index, and pass it the lazy bind plan if there is one.
+
+        Args:
+            idx: The index of the bundle.
+
+        Returns:
+            The created bundle.
+        """
+
+        if self.lazy_owner is not None:
+            self.lazy_owner._Bundle__resolve_lazy_bind()
+
+        bundle = self.bundle_class.from_prefix(self.names[idx])
+        if self.lazy_plan is not None:
+            bundle._Bundle__set_lazy_bind_plan(self.lazy_plan, f"[{idx}]")
+        self.bundles[idx] = bundle
+        return bundle
 
     def assign(self, value, multilevel=True):
-        for i, bundle in enumerate(self.bundles):
+        for i, bundle in enumerate(self):
             bundle.assign(value[i], multilevel)
 
     def __getitem__(self, key):
-        return self.bundles[key]
+        if isinstance(key, slice):
+            return [self[idx] for idx in range(*key.indices(len(self.bundles)))]
+
+        bundle = self.bundles[key]
+        if bundle is None:
+            bundle = self.__create_bundle(range(len(self.bundles))[key])
+        return bundle
+
+    def __len__(self):
+        return len(self.bundles)
 
     def __str__(self):
-        bundle_str = ", ".join(
-            f"{idx}: {bundle}" for idx, bundle in enumerate(self.bundles)
-        )
+        bundle_str = ", ".join(f"{idx}: {bundle}" for idx, bundle in enumerate(self))
         return f"BundleList({bundle_str})"
 
     @classmethod
     def from_bundlelist(cls, old_bundle_list: "BundleList"):
-        bundle_list = cls(old_bundle_list.bundles[0], "#", 1)
+        bundle_list = cls.__new__(cls)
         bundle_list.format = old_bundle_list.format
-        bundle_list.names = old_bundle_list.names[:]
-        bundle_list.bundles = old_bundle_list.bundles[:]
+        bundle_list.names = old_bundle_list.names
+        bundle_list.bundle_class = old_bundle_list.bundle_class
+        bundle_list.bundles = [None] * len(old_bundle_list.names)
+        bundle_list.lazy_owner = None
+        bundle_list.lazy_plan = None
+        bundle_list.attr_name = None
         return bundle_list
 
 
@@ -365,51 +514,244 @@ class DictBindMethod(BindMethod):
 
         return (connected_signals, matching_signals, remain_signals)
 
+
+class BundleMeta:
+    """
+    The names of the members of a bundle class. It is computed once for each class and
+    shared by all its instances.
+    """
+
+    __slots__ = (
+        "signal_names",
+        "sub_bundle_names",
+        "signal_list_names",
+        "bundle_list_names",
+    )
+
+    def __init__(
+        self, signal_names, sub_bundle_names, signal_list_names, bundle_list_names
+    ):
+        self.signal_names = signal_names
+        self.sub_bundle_names = sub_bundle_names
+        self.signal_list_names = signal_list_names
+        self.bundle_list_names = bundle_list_names
+
+    @classmethod
+    def from_class(cls, bundle_class):
+        """
+        Collect the member names declared in the bundle class.
+
+        Args:
+            bundle_class: The bundle class.
+
+        Returns:
+            The meta of the bundle class.
+        """
+
+        signal_names = list(bundle_class.signals)
+        sub_bundle_names, signal_list_names, bundle_list_names = [], [], []
+        for attr in dir(bundle_class):
+            value = getattr(bundle_class, attr, None)
+            if isinstance(value, Signal):
+                signal_names.append(attr)
+            elif isinstance(value, Bundle):
+                sub_bundle_names.append(attr)
+            elif isinstance(value, SignalList):
+                signal_list_names.append(attr)
+            elif isinstance(value, BundleList):
+                bundle_list_names.append(attr)
+
+        return cls(
+            tuple(signal_names),
+            tuple(sub_bundle_names),
+            tuple(signal_list_names),
+            tuple(bundle_list_names),
+        )
+
+    def with_instance_members(self, instance_dict):
+        """
+        Add the sub-bundles, signal lists and bundle lists that are set as instance
+        attributes, such as the ones created in __init__.
+
+        Args:
+            instance_dict: The __dict__ of the bundle instance.
+
+        Returns:
+            The meta itself if there is no instance member, otherwise a new meta.
+        """
+
+        names = ([], [], [])
+        for attr, value in instance_dict.items():
+            for idx, (kind, class_names) in enumerate(
+                (
+                    (Bundle, self.sub_bundle_names),
+                    (SignalList, self.signal_list_names),
+                    (BundleList, self.bundle_list_names),
+                )
+            ):
+                if isinstance(value, kind) and attr not in class_names:
+                    names[idx].append(attr)
+
+        if not any(names):
+            return self
+
+        return BundleMeta(
+            self.signal_names,
+            tuple(sorted(self.sub_bundle_names + tuple(names[0]))),
+            tuple(sorted(self.signal_list_names + tuple(names[1]))),
+            tuple(sorted(self.bundle_list_names + tuple(names[2]))),
+        )
+
+
+_default_connect_method = PrefixBindMethod("")
+_dummy_signal = DummySignal()
+
+
 class Bundle(MObject):
     """
     A bundle is a collection of signals in a DUT.
     """
 
+    __slots__ = (
+        "name",
+        "bound",
+        "write_mode",
+        "current_level_signals",
+        "attr_name",
+        "__meta",
+        "__clock_event",
+        "__connect_method",
+        "__dut_requests__",
+        "__dut_instance__",
+        "__blocked_request__",
+        "__lazy_bind_plan",
+        "__lazy_bind_parent",
+        "__lazy_child_plan",
+        "__randomizer",
+        "__random_seed",
+    )
+
     signals = []
+    _dummy_signal = _dummy_signal
 
     def __init__(self):
         """
         Create a bundle.
         Instances created using this method are matched directly in bind. The create
         instance method provided by from_dict, from_prefix and from_regex enable easier connections.
+
+        Only the connected signals are stored in the instance, the member names are shared
+        by all instances of the class. Sub-bundles, signal lists and bundle lists declared
+        in the class body are created the first time they are accessed.
         """
 
         self.name = ""  # The name of the bundle
         self.bound = False  # Whether the bundle is bound to a DUT
         self.write_mode = None  # The write mode of the bundle
-        self.current_level_signals = []  # The signal names in the current level
+        self.attr_name = None  # The attribute name in the class body of a bundle
 
+        self.__meta = None
         self.__clock_event = None
-        self.__connect_method = PrefixBindMethod("")
-        self.__dut_requests__ = Queue()
+        self.__connect_method = _default_connect_method
+        self.__dut_requests__ = None  # Created when process_requests is first used
         self.__dut_instance__ = None
         self.__blocked_request__ = None
+        self.__lazy_bind_plan = None
+        self.__lazy_bind_parent = None
+        self.__lazy_child_plan = None
+        self.__randomizer = None  # Created when randomize_all is first used
+        self.__random_seed = None
 
         self.set_current_level_signal()
 
-        # Recreate subbundles and signal lists for each instance
-        for sub_bundle_name, sub_bundle in self.__all_sub_bundles():
-            new_sub_bundle = sub_bundle.__class__()
-            new_sub_bundle.current_level_signals = (
-                sub_bundle.current_level_signals
-            )
-            new_sub_bundle.__connect_method = sub_bundle.__connect_method
-            setattr(self, sub_bundle_name, new_sub_bundle)
+    def __set_name__(self, owner, name):
+        if self.attr_name is None:
+            self.attr_name = name
+        else:
+            # The template is already declared under another name, this name gets its own copy
+            template = self.__from_template()
+            template.attr_name = name
+            setattr(owner, name, template)
 
-        # Recreate signal lists for each instance
-        for signal_list_name, signal_list in self.__all_signal_lists():
-            new_signal_list = SignalList.from_signallist(signal_list)
-            setattr(self, signal_list_name, new_signal_list)
+    def __get__(self, instance, owner):
+        """
+        A sub-bundle declared in the class body of a bundle is a template, the sub-bundle
+        of a bundle instance is created the first time it is accessed.
+        """
 
-        # Recreate bundle lists for each instance
-        for bundle_list_name, bundle_list in self.__all_bundle_lists():
-            new_bundle_list = BundleList.from_bundlelist(bundle_list)
-            setattr(self, bundle_list_name, new_bundle_list)
+        if (
+            instance is None
+            or not isinstance(instance, Bundle)
+            or self.attr_name is None
+        ):
+            return self
+
+        return instance.__adopt_member(self.attr_name, self.__from_template())
+
+    def __from_template(self):
+        """
+        Create a bundle with the signals and the connect method of this template.
+        """
+
+        bundle = self.__class__()
+        bundle.current_level_signals = self.current_level_signals
+        bundle.__connect_method = self.__connect_method
+        return bundle
+
+    @classmethod
+    def __class_meta(cls):
+        """
+        Get the meta shared by all instances of the class.
+        """
+
+        meta = cls.__dict__.get("_Bundle__class_meta_cache")
+        if meta is None:
+            meta = BundleMeta.from_class(cls)
+            cls.__class_meta_cache = meta
+        return meta
+
+    def __member_meta(self):
+        """
+        Get the meta of the bundle instance, including the members set as instance attributes.
+        """
+
+        if self.__meta is None:
+            self.__meta = Bundle.__class_meta.__func__(
+                type(self)
+            ).with_instance_members(self.__dict__)
+        return self.__meta
+
+    def __adopt_member(self, name, member):
+        """
+        Store a member created from a template of the class body in the instance, and pass
+        the lazy bind state of the bundle to it.
+
+        Args:
+            name: The attribute name of the member.
+            member: The sub-bundle, signal list or bundle list.
+
+        Returns:
+            The member itself.
+        """
+
+        self.__dict__[name] = member
+        child_plan = self.__lazy_child_plan
+
+        if isinstance(member, Bundle):
+            if child_plan is not None:
+                member.__set_lazy_bind_plan(child_plan, name)
+            elif self.__lazy_bind_pending():
+                member.__lazy_bind_parent = self
+        elif isinstance(member, SignalList):
+            if self.__lazy_bind_pending():
+                member.lazy_owner = self
+        elif isinstance(member, BundleList):
+            if child_plan is not None:
+                member.lazy_plan = self.__child_lazy_bind_plan(child_plan, name)
+            elif self.__lazy_bind_pending():
+                member.lazy_owner = self
+
+        return member
 
     def ___dut_call_on_rise__(self, cycle):
         """
@@ -430,7 +772,7 @@ class Bundle(MObject):
             else:
                 return
         if request is None:
-            if self.__dut_requests__.empty():
+            if self.__dut_requests__ is None or self.__dut_requests__.empty():
                 return
             request = self.__dut_requests__.get()
             if request is None:
@@ -506,6 +848,8 @@ class Bundle(MObject):
         ]:
             if hasattr(self, key):
                 error(f"bundule can not with name: {key}")
+        if self.__dut_requests__ is None:
+            self.__dut_requests__ = Queue()
         assert self.__dut_requests__.empty(), "The request queue is not empty"
         if self.__dut_instance__ is None:
             error(
@@ -611,7 +955,34 @@ class Bundle(MObject):
             write_mode: The write mode to set.
         """
 
-        for _, signal in self.all_signals():
+        Bundle.__set_signals_write_mode(
+            (signal for _, signal in self.all_signals()), write_mode
+        )
+
+    def __set_current_level_signals_write_mode(self, write_mode: WriteMode):
+        """
+        Set the write mode of the signals in the current level and in the signal lists.
+
+        Args:
+            write_mode: The write mode to set.
+        """
+
+        signals = [getattr(self, signal, None) for signal in self.current_level_signals]
+        for _, signal_list in self.__all_signal_lists():
+            signals.extend(signal_list.signals)
+        Bundle.__set_signals_write_mode(signals, write_mode)
+
+    @staticmethod
+    def __set_signals_write_mode(signals, write_mode: WriteMode):
+        """
+        Set the write mode of the given signals.
+
+        Args:
+            signals: An iterable of signals.
+            write_mode: The write mode to set.
+        """
+
+        for signal in signals:
             if Bundle.__is_instance_of_xpin(signal) and not signal.IsOutIO():
                 if write_mode == WriteMode.Imme:
                     signal.AsImmWrite()
@@ -661,19 +1032,25 @@ class Bundle(MObject):
             ncycles: The number of cycles to wait.
         """
 
+        self.__resolve_lazy_bind()
         if self.__clock_event is None:
             critical("cannot use step in bundle without a connected signal")
 
         for _ in range(ncycles):
             await self.__clock_event.wait()
 
-    def bind(self, dut, unconnected_signal_access=True):
+    def bind(self, dut, unconnected_signal_access=True, lazy=False):
         """
         Bind the dut's signal to this bundle. it will overwrites the previous bind.
 
         Args:
             dut: The dut to bind the bundle to.
             unconnected_signal_access: Whether unconnected signals could be accessed.
+            lazy: Whether to bind lazily. If it is, only the bind plan is recorded here, and
+                  each sub-bundle, signal list and bundle list is connected the first time
+                  it is accessed. In lazy mode, every sub-bundle is matched against all the
+                  signals its parent has not connected, so sibling bundles must not match
+                  the same signals.
 
         Returns:
             The bundle itself.
@@ -681,28 +1058,209 @@ class Bundle(MObject):
 
         if self.bound:
             warning("bundle is already bound, the previous bind will be overwritten")
+            self.__drop_lazy_bind()
             self.__unbind_all()
         else:
             # When first bind, set all sub-bundles' name
             for sub_bundle_name, sub_bundle in self.__all_sub_bundles():
                 sub_bundle.set_name(sub_bundle_name)
 
-        self.__bind_from_signal_list(
-            list(self.dut_all_signals(dut)),
-            self.name,
-            [],
-            unconnected_signal_access,
-            False,
-            None,
-            None,
-        )
+        self.__randomizer = None
+        all_signals = list(self.dut_all_signals(dut))
+        if lazy:
+            self.__lazy_bind_plan = (
+                all_signals,
+                self.name,
+                [],
+                unconnected_signal_access,
+                self.write_mode,
+                None,
+            )
+            self.__mark_lazy_bind()
+            if len(all_signals) > 0:
+                self.__clock_event = all_signals[0]["signal"].event
+        else:
+            self.__bind_from_signal_list(
+                all_signals,
+                self.name,
+                [],
+                unconnected_signal_access,
+                False,
+                None,
+                None,
+            )
 
         self.bound = True
-        if self.write_mode is not None:
+        if self.write_mode is not None and not lazy:
             self.__set_all_signals_write_mode(self.write_mode)
         self.make_requset_response_for(dut)
         return self
 
+    def __lazy_bind_pending(self):
+        """
+        Check whether the bundle is waiting for a lazy bind.
+        """
+
+        return self.__lazy_bind_plan is not None or self.__lazy_bind_parent is not None
+
+    @staticmethod
+    def __child_lazy_bind_plan(plan, name):
+        """
+        Get the lazy bind plan of a member from the plan passed to its children.
+
+        Args:
+            plan: The plan passed to the children.
+            name: The name of the member, or "[idx]" for a bundle in a bundle list.
+
+        Returns:
+            The lazy bind plan of the member.
+        """
+
+        all_signals, level_string, *others = plan
+        if name.startswith("["):
+            level_string = f"{level_string}{name}"
+        else:
+            level_string = Bundle.appended_level_string(level_string, name)
+        return (all_signals, level_string, *others)
+
+    def __set_lazy_bind_plan(self, plan, name):
+        """
+        Set the lazy bind plan of the bundle from the plan passed by its parent.
+
+        Args:
+            plan: The plan passed by the parent.
+            name: The name of the bundle in its parent, or "[idx]" for a bundle in a bundle list.
+        """
+
+        self.__lazy_bind_plan = Bundle.__child_lazy_bind_plan(plan, name)
+        self.__lazy_bind_parent = None
+        if self.__clock_event is None:
+            self.__clock_event = plan[5]
+
+    def __mark_lazy_bind(self):
+        """
+        Mark all created sub-bundles, signal lists and bundle lists as waiting for the lazy
+        bind of this bundle. Members that are not created yet are marked when created.
+        """
+
+        for value in list(self.__dict__.values()):
+            if isinstance(value, SignalList):
+                value.lazy_owner = self
+            elif isinstance(value, Bundle):
+                value.__lazy_bind_parent = self
+                value.__mark_lazy_bind()
+            elif isinstance(value, BundleList):
+                value.lazy_owner = self
+                for _, bundle in value.created_bundles():
+                    bundle.__lazy_bind_parent = self
+                    bundle.__mark_lazy_bind()
+
+    def __resolve_lazy_bind(self):
+        """
+        Connect the signals of the current level according to the recorded lazy bind plan,
+        and pass the remaining signals to the sub-bundles as their plans.
+        """
+
+        parent = self.__lazy_bind_parent
+        if parent is not None:
+            self.__lazy_bind_parent = None
+            try:
+                parent.__resolve_lazy_bind()
+            except BaseException:
+                self.__lazy_bind_parent = parent
+                raise
+
+        plan = self.__lazy_bind_plan
+        if plan is None:
+            return
+        (
+            all_signals,
+            level_string,
+            rule_stack,
+            unconnected_signal_access,
+            write_mode,
+            _,
+        ) = plan
+
+        # The plan is restored if the connection fails, so the error is reported again on the
+        # next access instead of leaving the bundle half bound
+        self.__lazy_bind_plan = None
+        try:
+            rule_stack = rule_stack + [self]
+            connected_signals, matching_signals, _ = self.__connect_method.bind(
+                self, all_signals, level_string, False
+            )
+            self.__detect_missing_signals(
+                connected_signals, level_string, rule_stack, unconnected_signal_access
+            )
+            if write_mode is not None:
+                self.__set_current_level_signals_write_mode(write_mode)
+        except BaseException:
+            for signal in self.current_level_signals:
+                self.__dict__.pop(signal, None)
+            self.__lazy_bind_plan = plan
+            raise
+
+        child_plan = (
+            matching_signals,
+            level_string,
+            rule_stack,
+            unconnected_signal_access,
+            write_mode,
+            self.__clock_event,
+        )
+        self.__lazy_child_plan = child_plan
+
+        for name, value in list(self.__dict__.items()):
+            if isinstance(value, SignalList):
+                value.lazy_owner = None
+            elif isinstance(value, Bundle):
+                value.__set_lazy_bind_plan(child_plan, name)
+            elif isinstance(value, BundleList):
+                value.lazy_owner = None
+                value.lazy_plan = Bundle.__child_lazy_bind_plan(child_plan, name)
+                for idx, bundle in value.created_bundles():
+                    bundle.__set_lazy_bind_plan(value.lazy_plan, f"[{idx}]")
+
+    def __drop_lazy_bind(self):
+        """
+        Discard the lazy bind plans of the bundle and all its created sub-bundles.
+        """
+
+        self.__lazy_bind_plan = None
+        self.__lazy_bind_parent = None
+        self.__lazy_child_plan = None
+        for value in list(self.__dict__.values()):
+            if isinstance(value, SignalList):
+                value.lazy_owner = None
+            elif isinstance(value, Bundle):
+                value.__drop_lazy_bind()
+            elif isinstance(value, BundleList):
+                value.lazy_owner = None
+                value.lazy_plan = None
+                for _, bundle in value.created_bundles():
+                    bundle.__drop_lazy_bind()
+
+    def __getattr__(self, name):
+        """
+        Resolve the lazy bind when a signal that is not yet connected is accessed.
+        """
+
+        if not name.startswith(("__", "_Bundle__")) and self.__lazy_bind_pending():
+            # An AttributeError raised here would be reported as a missing attribute
+            try:
+                self.__resolve_lazy_bind()
+            except AttributeError as e:
+                raise RuntimeError(
+                    f"Failed to resolve the lazy bind of '{type(self).__name__}' "
+                    f"when accessing '{name}': {e}"
+                ) from e
+            return getattr(self, name)
+
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
     def as_dict(self, multilevel=True):
         """
         Collect all signals values into a dictionary.
@@ -717,6 +1275,7 @@ class Bundle(MObject):
             A dictionary of all signals values in the bundle.
         """
 
+        self.__resolve_lazy_bind()
         if multilevel:
             signals = {
                 signal: getattr(self, signal).value
@@ -776,12 +1335,63 @@ class Bundle(MObject):
                 signal.value = value
         return self
 
+    def randomizer(self):
+        """
+        Get the randomizer of the bundle. It collects the writable signals of the bundle
+        when first used, and can be used to set constraints on them before randomize_all.
+
+        Returns:
+            The randomizer of the bundle.
+        """
+
+        if self.__randomizer is None:
+            self.__randomizer = Randomizer(
+                (
+                    (signal_name, signal)
+                    for signal_name, signal in self.all_signals()
+                    if Bundle.__is_instance_of_xpin(signal) and not signal.IsOutIO()
+                ),
+                self.__default_random_seed(),
+            )
+        return self.__randomizer
+
+    def __default_random_seed(self):
+        """
+        Get the seed set by set_random_seed. Without it, the seed is drawn from the random
+        module, so that random.seed still makes randomize_all reproducible.
+        """
+
+        if self.__random_seed is None:
+            return random.getrandbits(64)
+        return self.__random_seed
+
+    def set_random_seed(self, seed):
+        """
+        Set the seed used by randomize_all, so that the random values are reproducible.
+
+        Args:
+            seed: The seed of the random generator. If None, the seed is drawn from the random
+                  module.
+
+        Returns:
+            The bundle itself.
+        """
+
+        self.__random_seed = seed
+        if self.__randomizer is not None:
+            self.__randomizer.seed(self.__default_random_seed())
+        return self
+
     def randomize_all(
         self, value_range=None, exclude_signals=[], random_func=random.randint
     ):
         """
         Randomize all signals values in the bundle.
 
+        Unless a random_func is given, the values are drawn in a batch by the randomizer of
+        the bundle, which also applies the constraints set on it. The randomizer is seeded
+        with set_random_seed, or from the random module when it is first used.
+
         Args:
             value_range: The range of the random values, eg. (0, 100), both values are inclusive. If None, the range
                          of random values will be the range of each signal value.
@@ -789,6 +1399,10 @@ class Bundle(MObject):
             random_func: The random function to use, default is random.randint.
         """
 
+        if random_func is random.randint:
+            self.randomizer().randomize(value_range, exclude_signals)
+            return
+
         for signal_name, signal in self.all_signals():
             if (
                 signal_name not in exclude_signals
@@ -818,6 +1432,8 @@ class Bundle(MObject):
                         only one level, with the sub-bundles separated by dots in keys.
         """
 
+        self.__resolve_lazy_bind()
+
         # Case 1: Item is an object with __bundle_assign__ method
 
         if not isinstance(item, dict):
@@ -958,13 +1574,17 @@ class Bundle(MObject):
         """
         new_bundle = cls()
         if dut is not None:
+            dut_signals = []
             for attr_key in dir(dut):
                 if not attr_key.startswith(prefix):
                     continue
                 attr_value = getattr(dut, attr_key)
                 if "XData" not in attr_value.__class__.__name__:
                     continue
-                new_bundle.current_level_signals.append(attr_key[len(prefix) :])
+                dut_signals.append(attr_key[len(prefix) :])
+            new_bundle.current_level_signals = new_bundle.current_level_signals + tuple(
+                dut_signals
+            )
             # new_bundle.set_current_level_signal()
         new_bundle.__connect_method = PrefixBindMethod(prefix)
         return new_bundle
@@ -1062,11 +1682,7 @@ class Bundle(MObject):
         Collect all signals in the current level and save them in the current_level_signals.
         """
 
-        self.current_level_signals = [signal for signal in self.signals]
-
-        for signal in dir(self):
-            if isinstance(getattr(self, signal), Signal):
-                self.current_level_signals.append(signal)
+        self.current_level_signals = type(self).__class_meta().signal_names
 
     def all_signals(self, level_string=""):
         """
@@ -1076,6 +1692,7 @@ class Bundle(MObject):
             A generator of signal names and signals.
         """
 
+        self.__resolve_lazy_bind()
         for signal in self.current_level_signals:
             yield (Bundle.appended_level_string(level_string, signal)), getattr(
                 self, signal, None
@@ -1091,7 +1708,7 @@ class Bundle(MObject):
                 Bundle.appended_level_string(level_string, sub_bundle_name)
             )
         for bundle_list_name, bundle_list in self.__all_bundle_lists():
-            for idx, bundle in enumerate(bundle_list.bundles):
+            for idx, bundle in enumerate(bundle_list):
                 yield from bundle.all_signals(
                     Bundle.appended_level_string(level_string, f"{bundle_list_name}[{idx}]")
                 )
@@ -1138,6 +1755,7 @@ class Bundle(MObject):
             signal.xdata.number_of_bundles_connected_to = 1
 
     def __str__(self):
+        self.__resolve_lazy_bind()
         item_str = ""
 
         signals = ", ".join(
@@ -1184,9 +1802,8 @@ class Bundle(MObject):
             sub-bundle and sub_bundle is the sub-bundle itself.
         """
 
-        for attr in dir(self):
-            if isinstance(getattr(self, attr), Bundle):
-                yield (attr, getattr(self, attr))
+        for attr in self.__member_meta().sub_bundle_names:
+            yield (attr, getattr(self, attr))
 
     def __all_signal_lists(self):
         """
@@ -1197,9 +1814,8 @@ class Bundle(MObject):
             signal list and signal_list is the signal list itself.
         """
 
-        for attr in dir(self):
-            if isinstance(getattr(self, attr), SignalList):
-                yield (attr, getattr(self, attr))
+        for attr in self.__member_meta().signal_list_names:
+            yield (attr, getattr(self, attr))
 
     def __all_bundle_lists(self):
         """
@@ -1210,9 +1826,8 @@ class Bundle(MObject):
             bundle list and bundle_list is the bundle list itself.
         """
 
-        for attr in dir(self):
-            if isinstance(getattr(self, attr), BundleList):
-                yield (attr, getattr(self, attr))
+        for attr in self.__member_meta().bundle_list_names:
+            yield (attr, getattr(self, attr))
 
     def __detect_missing_signals(
         self, connected_signals, level_string, rule_stack, unconnected_signal_access
@@ -1228,8 +1843,6 @@ class Bundle(MObject):
             unconnected_signal_access: Whether unconnected signals could be accessed.
         """
 
-        self._dummy_signal = DummySignal()
-
         for signal in self.current_level_signals:
             if signal not in connected_signals:
                 rule_string = Bundle.__get_rule_string(rule_stack, signal)
@@ -1239,7 +1852,7 @@ class Bundle(MObject):
                 )
 
                 if unconnected_signal_access:
-                    setattr(self, signal, self._dummy_signal)
+                    setattr(self, signal, _dummy_signal)
 
         for signal_list_name, signal_list in self.__all_signal_lists():
             for idx, signal in enumerate(signal_list.names):
@@ -1252,7 +1865,7 @@ class Bundle(MObject):
                     )
 
                     if unconnected_signal_access:
-                        signal_list.signals[idx] = self._dummy_signal
+                        signal_list.signals[idx] = _dummy_signal
 
     def __remove_signal_attr(self, signal_name):
         """
@@ -1275,7 +1888,7 @@ class Bundle(MObject):
         """
 
         for signal_name in self.current_level_signals:
-            if hasattr(self, signal_name):
+            if signal_name in self.__dict__:
                 self.__remove_signal_attr(signal_name)
         for _, sub_bundle in self.__all_sub_bundles():
             sub_bundle.__unbind_all()
@@ -1315,6 +1928,9 @@ class Bundle(MObject):
         )
 
         if not detection_mode:
+            self.__lazy_bind_plan = None
+            self.__lazy_bind_parent = None
+            self.__lazy_child_plan = None
             self.__detect_missing_signals(
                 connected_signals, level_string, rule_stack, unconnected_signal_access
             )
@@ -1365,7 +1981,7 @@ class Bundle(MObject):
                 self.__clock_event = sub_bundle.__clock_event
 
         for bundle_list_name, bundle_list in self.__all_bundle_lists():
-            for idx, bundle in enumerate(bundle_list.bundles):
+            for idx, bundle in enumerate(bundle_list):
                 matching_signals = bundle.__bind_from_signal_list(
                     matching_signals,
                     Bundle.appended_level_string(level_string, f"{bundle_list_name}[{idx}]"),
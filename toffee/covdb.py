@@ -0,0 +1,387 @@
+__all__ = ["CovDB"]
+
+import hashlib
+import json
+import struct
+from array import array
+from collections import OrderedDict
+
+from ._base import _from_le
+from ._base import _to_le
+from ._base import MObject
+from .funcov import CovGroup
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, counters are merged with a python loop
+    np = None
+
+
+MAGIC = b"TOFCOVDB"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sIQI")  # magic, version, runs, number of strings
+# name, digest, filename, lineno, flags, number of bins, sample count, calls, skips, points
+_GROUP = struct.Struct("<I16sIqBQQQQI")
+_POINT = struct.Struct(
+    "<IBIII"
+)  # name, flags, kind, number of crossed points, number of bins
+_U32 = struct.Struct("<I")
+
+
+class _GroupRecord(object):
+    """
+    A group in the database: its definition, the hit counter of every bin in one array, and the
+    functions marked on its bins
+    """
+
+    def __init__(self, name, digest, points, info, counters, functions) -> None:
+        self.name = name
+        self.digest = digest
+        self.points = points  # [(name, once, dynamic_bin, kind, cross, bin names)]
+        self.info = info
+        self.counters = counters
+        self.functions = functions  # [{bin name: set of function names}] for each point
+
+    def copy(self):
+        return _GroupRecord(
+            self.name,
+            self.digest,
+            self.points,
+            dict(self.info),
+            array("Q", self.counters),
+            [{k: set(v) for k, v in f.items()} for f in self.functions],
+        )
+
+    @staticmethod
+    def definition_digest(name, points) -> bytes:
+        definition = [name] + [[p[0], p[3], p[4], p[5]] for p in points]
+        return hashlib.blake2b(json.dumps(definition).encode(), digest_size=16).digest()
+
+    def add_counters(self, counters):
+        if np is not None:
+            acc = np.frombuffer(self.counters, dtype=np.uint64)
+            np.add(acc, np.frombuffer(counters, dtype=np.uint64), out=acc)
+        else:
+            for i, value in enumerate(counters):
+                self.counters[i] += value
+
+    def add_functions(self, functions):
+        for mine, other in zip(self.functions, functions):
+            for bin_name, names in other.items():
+                mine.setdefault(bin_name, set()).update(names)
+
+    def add_info(self, info):
+        self.info["__sample_count__"] += info["__sample_count__"]
+        self.info["__sample_calln__"] += info["__sample_calln__"]
+        self.info["__skip_count__"] += info["__skip_count__"]
+
+
+class CovDB(MObject):
+    """
+    A coverage database that merges the coverage groups of many runs.
+
+    Groups are keyed by their name and a hash of their definition (point names, kinds and bin
+    names), so runs with a changed definition do not mix. In the file, strings are interned in
+    one table and the hit counters of each group are stored as one block of uint64 values.
+    Files are merged one by one into the database, so merging many runs does not take more
+    memory than one run.
+    """
+
+    def __init__(self) -> None:
+        self.runs = 0
+        self.groups = OrderedDict()  # (name, digest) -> _GroupRecord
+
+    def __add_record(self, record: _GroupRecord):
+        key = (record.name, record.digest)
+        mine = self.groups.get(key)
+        if mine is None:
+            self.groups[key] = record
+            return
+        mine.add_counters(record.counters)
+        mine.add_functions(record.functions)
+        mine.add_info(record.info)
+
+    def add_dict(self, group: dict):
+        """
+        Add a group in the format of CovGroup.as_dict
+        """
+        points = [
+            (
+                p["name"],
+                bool(p["once"]),
+                bool(p["dynamic_bin"]),
+                p.get("kind", ""),
+                list(p.get("cross", [])),
+                [b["name"] for b in p["bins"]],
+            )
+            for p in group["points"]
+        ]
+        info = {
+            "__filename__": group["__filename__"],
+            "__lineno__": group["__lineno__"],
+            "__disable_sample_when_point_hinted__": group[
+                "__disable_sample_when_point_hinted__"
+            ],
+            "__sample_count__": group["__sample_count__"],
+            "__sample_calln__": group["__sample_calln__"],
+            "__skip_count__": group.get("__skip_count__", 0),
+            "__stop_sample__": group["__stop_sample__"],
+        }
+        digest = _GroupRecord.definition_digest(group["name"], points)
+        counters = array("Q", [b["hints"] for p in group["points"] for b in p["bins"]])
+        functions = [
+            {k: set(v) for k, v in p["functions"].items()} for p in group["points"]
+        ]
+        self.__add_record(
+            _GroupRecord(group["name"], digest, points, info, counters, functions)
+        )
+        return self
+
+    def add_group(self, group: CovGroup):
+        """
+        Add a CovGroup
+        """
+        return self.add_dict(group.as_dict())
+
+    def add_run(self, groups):
+        """
+        Add the groups of one run
+
+        Args:
+            groups: A list of CovGroups or dicts in the format of CovGroup.as_dict.
+        """
+        for group in groups:
+            if isinstance(group, CovGroup):
+                self.add_group(group)
+            else:
+                self.add_dict(group)
+        self.runs += 1
+        return self
+
+    def merge(self, other: "CovDB"):
+        """
+        Merge another database into this one
+        """
+        for record in other.groups.values():
+            self.__add_record(record.copy())
+        self.runs += other.runs
+        return self
+
+    def merge_file(self, path):
+        """
+        Merge a database file into this one
+        """
+        with open(path, "rb") as f:
+            self.runs += CovDB.__read(f, self.__add_record)
+        return self
+
+    @staticmethod
+    def merge_files(paths) -> "CovDB":
+        """
+        Merge database files one by one into a new database
+        """
+        db = CovDB()
+        for path in paths:
+            db.merge_file(path)
+        return db
+
+    @staticmethod
+    def load(path) -> "CovDB":
+        """
+        Load a database file
+        """
+        return CovDB.merge_files([path])
+
+    def save(self, path):
+        """
+        Save the database to a file
+        """
+        strings = {}
+
+        def intern(s):
+            idx = strings.get(s)
+            if idx is None:
+                idx = strings[s] = len(strings)
+            return idx
+
+        def u32_list(values):
+            return _U32.pack(len(values)) + _to_le(array("I", values))
+
+        body = [_U32.pack(len(self.groups))]
+        for record in self.groups.values():
+            info = record.info
+            flags = bool(info["__disable_sample_when_point_hinted__"]) | (
+                bool(info["__stop_sample__"]) << 1
+            )
+            body.append(
+                _GROUP.pack(
+                    intern(record.name),
+                    record.digest,
+                    intern(info["__filename__"]),
+                    info["__lineno__"],
+                    flags,
+                    len(record.counters),
+                    info["__sample_count__"],
+                    info["__sample_calln__"],
+                    info["__skip_count__"],
+                    len(record.points),
+                )
+            )
+            for (name, once, dynamic_bin, kind, cross, bins), functions in zip(
+                record.points, record.functions
+            ):
+                flags = once | (dynamic_bin << 1)
+                body.append(
+                    _POINT.pack(
+                        intern(name), flags, intern(kind), len(cross), len(bins)
+                    )
+                )
+                body.append(_to_le(array("I", [intern(n) for n in cross + bins])))
+                body.append(_U32.pack(len(functions)))
+                for bin_name, names in functions.items():
+                    body.append(_U32.pack(intern(bin_name)))
+                    body.append(u32_list([intern(n) for n in sorted(names)]))
+            body.append(_to_le(record.counters))
+
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, self.runs, len(strings)))
+            for s in strings:
+                data = s.encode()
+                f.write(_U32.pack(len(data)))
+                f.write(data)
+            for chunk in body:
+                f.write(chunk)
+        return self
+
+    @staticmethod
+    def __read(f, add_record) -> int:
+        """
+        Read a database file and pass each group to add_record
+
+        Returns:
+            The number of runs in the file
+        """
+
+        def read(n):
+            data = f.read(n)
+            if len(data) != n:
+                raise ValueError("Truncated coverage database")
+            return data
+
+        def read_u32():
+            return _U32.unpack(read(4))[0]
+
+        def read_u32_array(n):
+            return _from_le("I", read(4 * n))
+
+        magic, version, runs, nstrings = _HEADER.unpack(read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError("Not a coverage database")
+        if version != VERSION:
+            raise ValueError("Unsupported coverage database version %d" % version)
+        strings = [read(read_u32()).decode() for _ in range(nstrings)]
+
+        for _ in range(read_u32()):
+            header = _GROUP.unpack(read(_GROUP.size))
+            name, digest, filename, lineno, flags, ncounters = header[:6]
+            count, calln, skip, npoints = header[6:]
+            points, functions = [], []
+            for _ in range(npoints):
+                pname, pflags, kind, ncross, nbins = _POINT.unpack(read(_POINT.size))
+                names = [strings[i] for i in read_u32_array(ncross + nbins)]
+                points.append(
+                    (
+                        strings[pname],
+                        bool(pflags & 1),
+                        bool(pflags & 2),
+                        strings[kind],
+                        names[:ncross],
+                        names[ncross:],
+                    )
+                )
+                point_functions = {}
+                for _ in range(read_u32()):
+                    bin_name = strings[read_u32()]
+                    point_functions[bin_name] = {
+                        strings[i] for i in read_u32_array(read_u32())
+                    }
+                functions.append(point_functions)
+
+            info = {
+                "__filename__": strings[filename],
+                "__lineno__": lineno,
+                "__disable_sample_when_point_hinted__": bool(flags & 1),
+                "__sample_count__": count,
+                "__sample_calln__": calln,
+                "__skip_count__": skip,
+                "__stop_sample__": bool(flags & 2),
+            }
+            if ncounters != sum(len(p[5]) for p in points):
+                raise ValueError("Corrupted coverage database")
+            counters = _from_le("Q", read(8 * ncounters))
+            add_record(
+                _GroupRecord(strings[name], digest, points, info, counters, functions)
+            )
+        return runs
+
+    def unhit_bins(self):
+        """
+        Get the bins that are not hit in any run
+
+        Returns:
+            A list of (group name, point name, bin name) tuples
+        """
+        ret = []
+        for record in self.groups.values():
+            offset = 0
+            for name, _, _, _, _, bins in record.points:
+                for i, bin_name in enumerate(bins):
+                    if record.counters[offset + i] == 0:
+                        ret.append((record.name, name, bin_name))
+                offset += len(bins)
+        return ret
+
+    def as_dicts(self):
+        """
+        Export the groups in the format of CovGroup.as_dict, with the hints of all runs
+        """
+        ret = []
+        for record in self.groups.values():
+            group = OrderedDict()
+            group["points"] = []
+            bins_hints = bins_total = points_hints = 0
+            offset = 0
+            for (name, once, dynamic_bin, kind, cross, bins), functions in zip(
+                record.points, record.functions
+            ):
+                hints = record.counters[offset : offset + len(bins)]
+                offset += len(bins)
+                hinted = all(h > 0 for h in hints)
+                point = {
+                    "once": once,
+                    "hinted": hinted,
+                    "bins": [{"name": b, "hints": h} for b, h in zip(bins, hints)],
+                    "name": name,
+                    "functions": {k: sorted(v) for k, v in functions.items()},
+                    "dynamic_bin": dynamic_bin,
+                }
+                if kind:
+                    point["kind"] = kind
+                if kind == "cross":
+                    point["cross"] = list(cross)
+                group["points"].append(point)
+                bins_total += len(bins)
+                bins_hints += sum(1 for h in hints if h > 0)
+                points_hints += hinted
+
+            group["name"] = record.name
+            group["hinted"] = points_hints == len(record.points)
+            group["bin_num_total"] = bins_total
+            group["bin_num_hints"] = bins_hints
+            group["point_num_total"] = len(record.points)
+            group["point_num_hints"] = points_hints
+            group["has_once"] = any(p[1] for p in record.points)
+            group.update(record.info)
+            ret.append(group)
+        return ret
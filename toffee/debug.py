@@ -1,8 +1,12 @@
 #coding: utf-8
 
 
+import asyncio
 import pdb
 
+from .waveform import WaveformController
+
+
 def info(*args, **kwargs):
     print("***", end=" ")
     print(*args, **kwargs)
@@ -17,10 +21,16 @@ def error(*args, **kwargs):
 
 
 class PdbToffee(pdb.Pdb):
-    def __init__(self, dut, *args, **kwargs):
+    def __init__(self, dut, *args, waveform=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.dut = dut
         self.prompt = "toffee> "
+        if waveform is None:
+            waveform = getattr(asyncio.get_event_loop(), "waveform_controller", None)
+        if waveform is None:
+            waveform = WaveformController(dut)
+        self.waveform = waveform
+        self.auto_flush = True
 
     def do_tstep(self, arg):
         if not arg:
@@ -31,8 +41,15 @@ class PdbToffee(pdb.Pdb):
             except Exception as e:
                 info("parse cycles from '%s' fail: " % arg, e)
                 return
-        self.dut.Step(arg)
-        self.dut.FlushWaveform()
+        if self.waveform.static:
+            self.waveform.step(arg)
+            self.dut.Step(arg)
+        else:
+            for _ in range(arg):
+                self.waveform.step()
+                self.dut.Step(1)
+        if self.auto_flush:
+            self.waveform.flush()
 
     def do_tflush(self, arg):
         if arg:
@@ -40,6 +57,45 @@ class PdbToffee(pdb.Pdb):
             return
         self.dut.FlushWaveform()
 
+    def do_twave(self, arg):
+        args = arg.split()
+        if not args:
+            for k, v in self.waveform.status().items():
+                info("%s:" % k, v)
+            info("autoflush:", self.auto_flush)
+            return
+        cmd = args[0]
+        if cmd == "on":
+            self.waveform.enable()
+        elif cmd == "off":
+            self.waveform.disable()
+        elif cmd == "window":
+            if len(args) != 3:
+                error("usage: twave window start_cycle end_cycle")
+                return
+            try:
+                start, end = int(args[1]), int(args[2])
+            except Exception as e:
+                error("parse window from '%s' fail: " % arg, e)
+                return
+            self.waveform.add_window(start, end)
+        elif cmd == "clear":
+            self.waveform.clear_windows()
+        elif cmd == "scope":
+            self.waveform.select_scopes(args[1:])
+        elif cmd == "trigger":
+            self.waveform.trigger()
+        elif cmd == "autoflush":
+            if len(args) != 2 or args[1] not in ["on", "off"]:
+                error("usage: twave autoflush on|off")
+                return
+            self.auto_flush = args[1] == "on"
+        else:
+            error(
+                "invalid twave command '%s', usage: "
+                "twave [on|off|window s e|clear|scope names|trigger|autoflush on|off]" % cmd
+            )
+
     def do_tlist(self, arg):
         prefix = ""
         deep = 99
@@ -1,21 +1,14 @@
 __all__ = ["Delayer"]
 
-import asyncio
-from .asynchronous import add_callback
 from ._base import MObject
-
-
-async def __process_delayer():
-    for delayer in asyncio.get_event_loop().delayer_list:
-        delayer.sample()
-
-
-add_callback(__process_delayer)
+from .history import History
 
 
 class Delayer(MObject):
     """
     A Delayer class is used to delay the signal value.
+
+    The values are kept by a History of the signal, see toffee.history.
     """
 
     def __init__(self, signal, delay):
@@ -25,27 +18,26 @@ class Delayer(MObject):
 
         self.signal = signal
         self.delay = delay
-        self.value_list = []
-
-        asyncio.get_event_loop().delayer_list.append(self)
+        self.history = History(signal, delay + 1)
 
     def sample(self):
         """
-        Sample the signal value once and store it in the value list.
+        Does nothing, the signal is sampled by the clock loop once per cycle for all its
+        Delayers.
         """
 
-        if len(self.value_list) >= self.delay + 1:
-            self.value_list.pop(0)
-
-        self.value_list.append(self.signal.value)
-
     @property
     def value(self):
         """
-        Get the value of the signal after the delay.
+        Get the value of the signal after the delay, None until delay + 1 values are sampled.
         """
 
-        if len(self.value_list) != self.delay + 1:
-            return None
+        return self.history.past(self.delay)
+
+    @property
+    def value_list(self):
+        """
+        Get the sampled values kept for the delay, from the oldest to the newest.
+        """
 
-        return self.value_list[0]
+        return self.history.values()
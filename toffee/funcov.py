@@ -22,14 +22,28 @@ __all__ = [
 ]
 
 
-import inspect
 import json
-from typing import Union
+import math
+import numbers
+import sys
+from array import array
+from bisect import bisect_left
+from bisect import bisect_right
 from collections import OrderedDict
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from itertools import product
 from typing import Callable
 from typing import Union
 from ._base import MObject
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, deferred sampling falls back to python
+    np = None
+
 
 class CovCondition(MObject):
     """
@@ -165,6 +179,1158 @@ NotIn = CovNotIn
 IsInRange = CovIsInRange
 
 
+class CovHints(Mapping):
+    """
+    Hit counters of the bins of a point, a view of the counter array of a CovSampler
+    """
+
+    __slots__ = ("counters", "slots")
+
+    def __init__(self, counters, slots: dict) -> None:
+        self.counters = counters
+        self.slots = slots
+
+    def __getitem__(self, key):
+        return self.counters[self.slots[key]]
+
+    def __setitem__(self, key, value):
+        self.counters[self.slots[key]] = value
+
+    def __iter__(self):
+        return iter(self.slots)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class CovTargetTable(object):
+    """
+    Lowered conditions of one target. Equality conditions become hash tables and comparisons
+    become sorted threshold tables, so all of them are checked with a few lookups per sample.
+    """
+
+    def __init__(self, target) -> None:
+        self.target = target
+        self.eq = {}  # value -> [cid]
+        self.ne = {}  # value -> set(cid)
+        self.ne_cids = []
+        self.thresholds = {"gt": [], "ge": [], "lt": [], "le": []}  # [(threshold, cid)]
+        self.ranges = []  # [(low, high, cid)]
+
+    @staticmethod
+    def __is_number(value):
+        return isinstance(value, numbers.Real)
+
+    @staticmethod
+    def __values_of(value):
+        if isinstance(value, (list, tuple, set, frozenset)):
+            try:
+                for v in value:
+                    hash(v)
+            except TypeError:
+                return None
+            return value
+        return None
+
+    @staticmethod
+    def lowerable(condition) -> bool:
+        """
+        Check if a condition can be lowered into a table
+        """
+        kind = type(condition)
+        if kind in (CovGt, CovGe, CovLt, CovLe):
+            return CovTargetTable.__is_number(condition.value)
+        if kind is CovIsInRange:
+            return CovTargetTable.__is_number(
+                condition.low
+            ) and CovTargetTable.__is_number(condition.high)
+        if kind in (CovEq, CovNe):
+            try:
+                hash(condition.value)
+            except TypeError:
+                return False
+            return True
+        if kind in (CovIn, CovNotIn):
+            if isinstance(condition.value, range) and condition.value.step == 1:
+                return kind is CovIn
+            return CovTargetTable.__values_of(condition.value) is not None
+        return False
+
+    def add(self, condition, cid):
+        """
+        Add a lowerable condition with its condition id
+        """
+        kind = type(condition)
+        if kind is CovEq:
+            self.eq.setdefault(condition.value, []).append(cid)
+        elif kind is CovIn and isinstance(condition.value, range):
+            if len(condition.value) > 0:
+                self.ranges.append(
+                    (condition.value.start, condition.value.stop - 1, cid)
+                )
+        elif kind is CovIn:
+            for v in set(condition.value):
+                self.eq.setdefault(v, []).append(cid)
+        elif kind is CovNe:
+            self.ne.setdefault(condition.value, set()).add(cid)
+            self.ne_cids.append(cid)
+        elif kind is CovNotIn:
+            for v in condition.value:
+                self.ne.setdefault(v, set()).add(cid)
+            self.ne_cids.append(cid)
+        elif kind is CovIsInRange:
+            self.ranges.append((condition.low, condition.high, cid))
+        else:
+            key = {CovGt: "gt", CovGe: "ge", CovLt: "lt", CovLe: "le"}[kind]
+            self.thresholds[key].append((condition.value, cid))
+
+    def build(self):
+        """
+        Sort the tables, called after all conditions are added
+        """
+        self.threshold_keys = {}
+        self.threshold_cids = {}
+        for key, items in self.thresholds.items():
+            items.sort(key=lambda x: x[0])
+            self.threshold_keys[key] = [t for t, _ in items]
+            self.threshold_cids[key] = [cid for _, cid in items]
+        self.ranges.sort(key=lambda x: x[0])
+        self.range_lows = [low for low, _, _ in self.ranges]
+        self.eq_items = list(self.eq.items())
+        self.ne_items = list(self.ne.items())
+        return self
+
+    def check(self, hits: list):
+        """
+        Read the target once and append the ids of all satisfied conditions to hits
+        """
+        self.check_value(getattr(self.target, "value", self.target), hits)
+
+    def check_value(self, value, hits: list):
+        """
+        Append the ids of all conditions satisfied by value to hits
+        """
+        if self.eq:
+            try:
+                hits.extend(self.eq.get(value, ()))
+            except TypeError:
+                for v, cids in self.eq_items:
+                    if value == v:
+                        hits.extend(cids)
+        if self.ne_cids:
+            try:
+                excluded = self.ne.get(value, ())
+            except TypeError:
+                excluded = set()
+                for v, cids in self.ne_items:
+                    if value == v:
+                        excluded |= cids
+            hits.extend(cid for cid in self.ne_cids if cid not in excluded)
+
+        keys, cids = self.threshold_keys, self.threshold_cids
+        if keys["gt"]:
+            hits.extend(cids["gt"][: bisect_left(keys["gt"], value)])
+        if keys["ge"]:
+            hits.extend(cids["ge"][: bisect_right(keys["ge"], value)])
+        if keys["lt"]:
+            hits.extend(cids["lt"][bisect_right(keys["lt"], value) :])
+        if keys["le"]:
+            hits.extend(cids["le"][bisect_left(keys["le"], value) :])
+        if self.ranges:
+            for i in range(bisect_right(self.range_lows, value)):
+                _, high, cid = self.ranges[i]
+                if value <= high:
+                    hits.append(cid)
+
+    def masks(self, values) -> dict:
+        """
+        Evaluate all conditions over a NumPy array of recorded values
+
+        Returns:
+            A dict that maps each condition id to a boolean array
+        """
+        ret = {}
+        objects = []
+
+        def operand(v):
+            # an int column is compared with an operand it cannot hold exactly as python objects,
+            # instead of letting NumPy convert both sides to float64
+            if values.dtype.kind not in "iu":
+                return values
+            if isinstance(v, int):
+                info = np.iinfo(values.dtype)
+                if info.min <= v <= info.max:
+                    return values
+            elif isinstance(v, float) and v.is_integer() and abs(v) < (1 << 53):
+                return values
+            if not objects:
+                objects.append(values.astype(object))
+            return objects[0]
+
+        def equal(v):
+            try:
+                return np.asarray(operand(v) == v, dtype=bool)
+            except (TypeError, OverflowError):
+                return np.array([x == v for x in values.tolist()], dtype=bool)
+
+        for v, cids in self.eq_items:
+            mask = equal(v)
+            for cid in cids:
+                ret[cid] = ret[cid] | mask if cid in ret else mask
+        excluded = {}
+        for v, cids in self.ne_items:
+            mask = equal(v)
+            for cid in cids:
+                excluded[cid] = excluded[cid] | mask if cid in excluded else mask
+        for cid in self.ne_cids:
+            # NotIn([]) excludes no value
+            if cid in excluded:
+                ret[cid] = ~excluded[cid]
+            else:
+                ret[cid] = np.ones(len(values), dtype=bool)
+        for key, items in self.thresholds.items():
+            for t, cid in items:
+                if key == "gt":
+                    mask = operand(t) > t
+                elif key == "ge":
+                    mask = operand(t) >= t
+                elif key == "lt":
+                    mask = operand(t) < t
+                else:
+                    mask = operand(t) <= t
+                ret[cid] = np.asarray(mask, dtype=bool)
+        for low, high, cid in self.ranges:
+            ret[cid] = np.asarray(
+                (operand(low) >= low) & (operand(high) <= high), dtype=bool
+            )
+        return ret
+
+
+class CovCross(object):
+    """
+    Sparse hit table of a cross point. A cross bin is a tuple with the index of one bin of each
+    crossed point, only the bins that are hit are stored.
+    """
+
+    SEPARATOR = ","
+
+    def __init__(self, points, bin_names) -> None:
+        self.points = list(points)
+        self.bin_names = [list(names) for names in bin_names]
+        self.bin_index = [
+            {n: i for i, n in enumerate(names)} for names in self.bin_names
+        ]
+        self.total = 1
+        for names in self.bin_names:
+            self.total *= len(names)
+        self.table = {}
+        self.first_hits = {}
+
+    def name_of(self, combo) -> str:
+        return self.SEPARATOR.join(self.bin_names[i][b] for i, b in enumerate(combo))
+
+    def combo_of(self, name: str) -> tuple:
+        parts = name.split(self.SEPARATOR)
+        if len(parts) == len(self.points):
+            try:
+                return tuple(index[part] for index, part in zip(self.bin_index, parts))
+            except KeyError:
+                pass
+        # Bin names with the separator, match the names of each point as prefixes
+        combo = self.__match(name, 0)
+        if combo is None:
+            raise KeyError(name)
+        return combo
+
+    def __match(self, name, i):
+        if i == len(self.points) - 1:
+            idx = self.bin_index[i].get(name)
+            return None if idx is None else (idx,)
+        for bin_name, idx in self.bin_index[i].items():
+            prefix = bin_name + self.SEPARATOR
+            if name.startswith(prefix):
+                rest = self.__match(name[len(prefix) :], i + 1)
+                if rest is not None:
+                    return (idx,) + rest
+        return None
+
+    def combos(self):
+        return product(*(range(len(names)) for names in self.bin_names))
+
+
+class CovCrossBins(Mapping):
+    """
+    Bins of a cross point, map the name of a cross bin to the names of its crossed bins
+    """
+
+    __slots__ = ("cross",)
+
+    def __init__(self, cross: CovCross) -> None:
+        self.cross = cross
+
+    def __getitem__(self, key):
+        combo = self.cross.combo_of(key)
+        return tuple(self.cross.bin_names[i][b] for i, b in enumerate(combo))
+
+    def __iter__(self):
+        return map(self.cross.name_of, self.cross.combos())
+
+    def __len__(self):
+        return self.cross.total
+
+
+class CovCrossHints(CovCrossBins):
+    """
+    Hit counters of a cross point, unhit bins are not stored
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        return self.cross.table.get(self.cross.combo_of(key), 0)
+
+    def items(self):
+        table = self.cross.table
+        for combo in self.cross.combos():
+            yield self.cross.name_of(combo), table.get(combo, 0)
+
+    def values(self):
+        table = self.cross.table
+        for combo in self.cross.combos():
+            yield table.get(combo, 0)
+
+
+class CovCrossFirstHits(CovCrossBins):
+    """
+    First hit stamps of a cross point, -1 for unhit bins
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        return self.cross.first_hits.get(self.cross.combo_of(key), -1)
+
+    def items(self):
+        first_hits = self.cross.first_hits
+        for combo in self.cross.combos():
+            yield self.cross.name_of(combo), first_hits.get(combo, -1)
+
+
+class CovAutoBins(object):
+    """
+    Automatic value-range bins of a point. The bin of a value is found with one arithmetic
+    operation (uniform), one bit_length (log2) or one bisect (edges).
+    """
+
+    def __init__(self, low, high, mode="uniform", bin_num=16, edges=None) -> None:
+        if edges is not None:
+            mode = "edges"
+            edges = sorted(edges)
+            if len(edges) < 2:
+                raise ValueError("At least two edges are needed")
+            low, high = edges[0], edges[-1] - 1
+        if high < low:
+            raise ValueError("Invalid range [%s, %s]" % (low, high))
+
+        self.mode = mode
+        self.low = low
+        self.high = high
+        self.span = high - low + 1
+        if mode == "uniform":
+            self.bin_num = min(bin_num, self.span)
+            # bin i covers the values v that (v - low) * bin_num // span == i
+            self.edges = [
+                low + (i * self.span + self.bin_num - 1) // self.bin_num
+                for i in range(self.bin_num)
+            ]
+        elif mode == "log2":
+            if low < 0:
+                raise ValueError("log2 bins need a non-negative range")
+            self.low_bits = low.bit_length()
+            self.edges = [low] + [
+                1 << (bits - 1)
+                for bits in range(self.low_bits + 1, high.bit_length() + 1)
+            ]
+            self.bin_num = len(self.edges)
+        elif mode == "edges":
+            self.edges = edges[:-1]
+            self.bin_num = len(self.edges)
+        else:
+            raise ValueError("Invalid mode %s" % mode)
+        self.edges.append(high + 1)
+
+    def bins(self) -> dict:
+        """
+        Get the bins as CovIsInRange conditions
+        """
+        return {
+            "[%s, %s]" % (lo, hi - 1): CovIsInRange(lo, hi - 1)
+            for lo, hi in zip(self.edges, self.edges[1:])
+        }
+
+    def index_of(self, value):
+        """
+        Get the index of the bin of a value, None if it is out of range. A float is placed
+        in the bin of its floor
+        """
+        if not self.low <= value <= self.high:
+            return None
+        if not isinstance(value, int):
+            value = math.floor(value)
+        if self.mode == "uniform":
+            return (value - self.low) * self.bin_num // self.span
+        if self.mode == "log2":
+            return value.bit_length() - self.low_bits
+        return bisect_right(self.edges, value) - 1
+
+    def indexes_of(self, values):
+        """
+        Get the indexes of the bins of a NumPy array of values, -1 if a value is out of range
+        """
+        edges = self.edges[:-1]
+        info = np.iinfo(values.dtype) if values.dtype.kind in "iu" else None
+        if info is not None and info.min <= edges[0] and self.high <= info.max:
+            edges = np.asarray(edges, dtype=values.dtype)
+        else:
+            values = values.astype(object)
+            edges = np.asarray(edges, dtype=object)
+        indexes = np.searchsorted(edges, values, side="right") - 1
+        indexes[values > self.high] = -1
+        return indexes
+
+
+class CovTransition(object):
+    """
+    State of a transition point, the recent values of its target
+    """
+
+    def __init__(self, sequences: dict, on_change=False) -> None:
+        self.on_change = on_change
+        self.history = deque(maxlen=max(len(seq) for seq in sequences.values()))
+
+
+class CovTimeline(object):
+    """
+    Coverage timeline of a CovGroup. The first hit of each bin is stamped with the sample index,
+    or with the cycle returned by a callable, and the coverage ratio is recorded every interval
+    samples into compact arrays.
+    """
+
+    def __init__(
+        self, interval=1000, cycle=None, flat_window=None, min_growth=0.0
+    ) -> None:
+        self.interval = interval
+        self.cycle = cycle
+        self.flat_window = flat_window
+        self.min_growth = min_growth
+        self.clear()
+
+    def clear(self):
+        self.stamps = array("q")
+        self.coverage = array("d")
+        self.pending = (
+            []
+        )  # stamps of the snapshots waiting for a flush in deferred mode
+
+    def stamp(self, sample_index) -> int:
+        return self.cycle() if self.cycle is not None else sample_index
+
+    def snapshot(self, stamp, coverage):
+        self.stamps.append(stamp)
+        self.coverage.append(coverage)
+
+    def growth(self, window=None) -> float:
+        """
+        Get the coverage growth over the last window snapshots
+        """
+        window = window or self.flat_window or 1
+        if len(self.coverage) <= window:
+            return float("inf")
+        return self.coverage[-1] - self.coverage[-1 - window]
+
+    def flattened(self) -> bool:
+        """
+        Check if the coverage growth over the last flat_window snapshots is not more than
+        min_growth
+        """
+        return self.flat_window is not None and self.growth() <= self.min_growth
+
+    def efficiency(self) -> float:
+        """
+        Get the coverage ratio per stamp unit (sample or cycle)
+        """
+        if len(self.stamps) == 0 or self.stamps[-1] <= 0:
+            return 0.0
+        return self.coverage[-1] / self.stamps[-1]
+
+    def as_dict(self):
+        return {
+            "interval": self.interval,
+            "stamps": list(self.stamps),
+            "coverage": list(self.coverage),
+        }
+
+
+class CovSampler(object):
+    """
+    Compiled sampling engine of a CovGroup.
+
+    Built-in conditions are lowered into per-target tables, each distinct target is read once per
+    sample, and the hit counters of all bins live in one array. Bins with custom callables are
+    still checked in Python, and points with dynamic bins use the original check. Transition
+    points look up their recent values in a table per sequence length, auto-bin points compute
+    the index of their bin, and cross points combine the bins hit by the crossed points in the
+    same sample.
+
+    A bin of a once point is retired after its first hit, and a once point after all its bins
+    are hit, unless an active cross point needs them. A retired bin keeps the count of its
+    first hit, and is left out of the evaluation lists when they are compiled again, so the
+    cost of a sample shrinks as the coverage grows.
+    """
+
+    def __init__(self, cov_points: OrderedDict) -> None:
+        self.counters = array("q")
+        self.tables = {}  # id(target) -> CovTargetTable
+        self.cid_slot = (
+            []
+        )  # cid -> slot of a single condition bin, None for a part of a list
+        self.and_bins = []  # [(slot, cids)]
+        self.python_bins = []  # [(slot, target, bin)]
+        self.slot_point = []  # slot -> index of the point
+        self.slot_bin = []  # slot -> index of the bin in its point
+        self.points = []
+        self.point_index = {}  # name -> index of the point
+        self.point_slots = []  # index of the point -> slots of its bins
+        self.missing = []  # index of the point -> number of unhit bins
+        self.dynamic_points = []
+        self.transitions = (
+            []
+        )  # [(target, CovTransition, [(length, {sequence: [slot]})])]
+        self.crosses = (
+            []
+        )  # [(CovCross, index of the point, indexes of the crossed points)]
+        self.autos = []  # [(target, CovAutoBins, slots)]
+        self.lowered_points = set()  # points that only have lowered bins
+        self.first_hits = array("q")  # slot -> stamp of the first hit, -1 if unknown
+        self.stamp = -1  # stamp of the current sample
+        self.timed = False  # record the stamps of deferred samples
+        self.stamps = None
+        self.bins_total = 0
+        self.bins_hit = 0
+        self.unhinted = 0
+        self.all_once = True
+        self.deferrable = True
+        self.sample_slots = None
+        self.columns = None
+        self.executor = None
+        self.pending = []
+
+        self.retired_points = set()  # points that are no longer evaluated
+        self.retired_slots = set()  # bins that are no longer evaluated
+        self.cross_refs = []  # index of the point -> number of active crosses over it
+        self.active_bins = 0
+        self.retire_pending = 0  # bins retired since the last compile
+        self.dirty = False  # the evaluation lists need to be compiled again
+
+        crosses = []
+        for name, point in cov_points.items():
+            kind = point.get("kind")
+            if kind == "cross":
+                crosses.append((name, point))
+            elif kind == "transition" or kind == "auto":
+                pidx = self.__new_point(name, point)
+                self.__add_slots(pidx, point)
+                if kind == "auto":
+                    self.lowered_points.add(pidx)
+            elif point["dynamic_bin"]:
+                self.dynamic_points.append(point)
+                self.all_once = self.all_once and point["once"] == True
+            else:
+                self.__add_point(name, point)
+        for name, point in crosses:
+            self.__add_cross(name, point)
+
+        for pidx, point in enumerate(self.points):
+            if point["once"] == True:
+                self.__retire_covered(pidx)
+        self.__compile()
+
+    def __add_cid(self, slot):
+        self.cid_slot.append(slot)
+        return len(self.cid_slot) - 1
+
+    def __new_point(self, name, point):
+        pidx = len(self.points)
+        self.points.append(point)
+        self.point_index[name] = pidx
+        self.point_slots.append([])
+        self.cross_refs.append(0)
+        self.all_once = self.all_once and point["once"] == True
+        return pidx
+
+    def __add_slots(self, pidx, point):
+        """
+        Allocate a counter for each bin of a point, keep the current hints
+        """
+        old_hints = dict(point["hints"])
+        old_first_hits = dict(point.get("first_hits", {}))
+        slots = {}
+        for bidx, bin_name in enumerate(point["bins"].keys()):
+            slot = len(self.counters)
+            slots[bin_name] = slot
+            self.counters.append(old_hints.get(bin_name, 0))
+            self.first_hits.append(old_first_hits.get(bin_name, -1))
+            self.slot_point.append(pidx)
+            self.slot_bin.append(bidx)
+            self.point_slots[pidx].append(slot)
+
+        point["hints"] = CovHints(self.counters, slots)
+        point["first_hits"] = CovHints(self.first_hits, slots)
+        missing = sum(1 for v in point["hints"].values() if v == 0)
+        self.bins_total += len(slots)
+        self.bins_hit += len(slots) - missing
+        self.__set_missing(pidx, missing)
+        return slots
+
+    def __set_missing(self, pidx, missing):
+        self.missing.append(missing)
+        self.points[pidx]["hinted"] = missing == 0
+        if missing > 0:
+            self.unhinted += 1
+
+    def __add_point(self, name, point):
+        pidx = self.__new_point(name, point)
+        self.__add_slots(pidx, point)
+        if all(
+            len(conditions) > 0 and all(CovTargetTable.lowerable(c) for c in conditions)
+            for conditions in (
+                list(bin) if isinstance(bin, (list, tuple)) else [bin]
+                for bin in point["bins"].values()
+            )
+        ):
+            self.lowered_points.add(pidx)
+
+    def __add_cross(self, name, point):
+        cross = point["cross"]
+        pidx = self.__new_point(name, point)
+        refs = [self.point_index[name] for name in cross.points]
+        self.crosses.append((cross, pidx, refs))
+        self.bins_total += cross.total
+        self.bins_hit += len(cross.table)
+        self.__set_missing(pidx, cross.total - len(cross.table))
+        for ref in refs:
+            self.cross_refs[ref] += 1
+        if not all(ref in self.lowered_points for ref in refs):
+            self.deferrable = False
+
+    def __compile(self):
+        """
+        Build the evaluation lists from the points and bins that are not retired
+        """
+        self.tables = {}
+        self.cid_slot = []
+        self.and_bins = []
+        self.python_bins = []
+        self.transitions = []
+        self.autos = []
+        retired = self.retired_slots
+        for pidx, point in enumerate(self.points):
+            if pidx in self.retired_points:
+                continue
+            kind = point.get("kind")
+            slots = [
+                (bin_name, bin, slot)
+                for (bin_name, bin), slot in zip(
+                    point["bins"].items(), self.point_slots[pidx]
+                )
+                if slot not in retired
+            ]
+            if kind == "cross":
+                continue
+            if kind == "auto":
+                self.autos.append(
+                    (point["taget"], point["auto"], self.point_slots[pidx])
+                )
+            elif kind == "transition":
+                self.__compile_transition(point, slots)
+            else:
+                self.__compile_point(point, slots)
+        for table in self.tables.values():
+            table.build()
+        self.active_bins = len(self.cid_slot) + len(self.python_bins)
+        self.retire_pending = 0
+        self.dirty = False
+
+    def __compile_point(self, point, slots):
+        target = point["taget"]
+        for _, bin, slot in slots:
+            conditions = list(bin) if isinstance(bin, (list, tuple)) else [bin]
+            if len(conditions) == 0 or not all(
+                CovTargetTable.lowerable(c) for c in conditions
+            ):
+                self.python_bins.append((slot, target, bin))
+                continue
+
+            table = self.tables.get(id(target))
+            if table is None:
+                table = self.tables[id(target)] = CovTargetTable(target)
+            if len(conditions) == 1:
+                table.add(conditions[0], self.__add_cid(slot))
+            else:
+                cids = [self.__add_cid(None) for _ in conditions]
+                for c, cid in zip(conditions, cids):
+                    table.add(c, cid)
+                self.and_bins.append((slot, cids))
+
+    def __compile_transition(self, point, slots):
+        lengths = {}
+        for _, sequence, slot in slots:
+            table = lengths.setdefault(len(sequence), {})
+            table.setdefault(tuple(sequence), []).append(slot)
+        if lengths:
+            self.transitions.append(
+                (point["taget"], point["transition"], sorted(lengths.items()))
+            )
+
+    def __retire_slot(self, slot):
+        """
+        Stop evaluating a hit bin of a once point, unless a cross point needs it
+        """
+        if self.cross_refs[self.slot_point[slot]] > 0 or slot in self.retired_slots:
+            return
+        self.retired_slots.add(slot)
+        self.retire_pending += 1
+        if self.retire_pending >= max(32, self.active_bins // 8):
+            self.dirty = True
+
+    def __retire_point(self, pidx):
+        """
+        Stop evaluating a covered once point, unless a cross point needs it
+        """
+        if self.cross_refs[pidx] > 0 or pidx in self.retired_points:
+            return
+        self.retired_points.add(pidx)
+        self.retired_slots.update(self.point_slots[pidx])
+        self.dirty = True
+        if self.points[pidx].get("kind") != "cross":
+            return
+        for cross, cidx, refs in self.crosses:
+            if cidx != pidx:
+                continue
+            for ref in refs:
+                self.cross_refs[ref] -= 1
+                if self.points[ref]["once"] == True:
+                    self.__retire_covered(ref)
+
+    def __retire_covered(self, pidx):
+        if self.missing[pidx] == 0:
+            self.__retire_point(pidx)
+            return
+        for slot in self.point_slots[pidx]:
+            if self.counters[slot] > 0:
+                self.__retire_slot(slot)
+
+    def reactivate(self):
+        """
+        Evaluate all retired points and bins again
+        """
+        self.retired_points.clear()
+        self.retired_slots.clear()
+        self.cross_refs = [0] * len(self.points)
+        for _, _, refs in self.crosses:
+            for ref in refs:
+                self.cross_refs[ref] += 1
+        self.dirty = True
+
+    def retired(self) -> int:
+        """
+        Get the number of retired points
+        """
+        return len(self.retired_points)
+
+    def __bin_hinted(self, pidx):
+        self.bins_hit += 1
+        self.missing[pidx] -= 1
+        if self.missing[pidx] == 0:
+            self.points[pidx]["hinted"] = True
+            self.unhinted -= 1
+            if self.points[pidx]["once"] == True:
+                self.__retire_point(pidx)
+
+    def __hit(self, slot, count=1, stamp=None):
+        # a retired bin is still evaluated until the lists are compiled again, but its
+        # count stays at its first hit
+        if slot in self.retired_slots:
+            return
+        old = self.counters[slot]
+        self.counters[slot] = old + count
+        if old == 0:
+            self.first_hits[slot] = self.stamp if stamp is None else stamp
+            pidx = self.slot_point[slot]
+            if self.points[pidx]["once"] == True:
+                self.__retire_slot(slot)
+                if slot in self.retired_slots:
+                    self.counters[slot] = 1
+            self.__bin_hinted(pidx)
+        if self.sample_slots is not None:
+            self.sample_slots.append(slot)
+
+    def __cross_hit(self, cidx, combo, count=1, stamp=None):
+        cross, pidx, _ = self.crosses[cidx]
+        old = cross.table.get(combo, 0)
+        cross.table[combo] = old + count
+        if old == 0:
+            cross.first_hits[combo] = self.stamp if stamp is None else stamp
+            self.__bin_hinted(pidx)
+
+    def __cross_combos(self, slots):
+        """
+        Get the cross bins hit by the bins hit in one sample
+        """
+        buckets = {}
+        for slot in slots:
+            buckets.setdefault(self.slot_point[slot], []).append(self.slot_bin[slot])
+        for cidx, (_, pidx, refs) in enumerate(self.crosses):
+            if pidx in self.retired_points:
+                continue
+            lists = [buckets.get(ref) for ref in refs]
+            if all(lists):
+                for combo in product(*lists):
+                    yield cidx, combo
+
+    def __hit_slots(self, hits):
+        cid_slot = self.cid_slot
+        slots = [cid_slot[cid] for cid in hits if cid_slot[cid] is not None]
+        if self.and_bins:
+            hit_set = set(hits)
+            for slot, cids in self.and_bins:
+                if all(cid in hit_set for cid in cids):
+                    slots.append(slot)
+        return slots
+
+    def __sample_python(self) -> bool:
+        for slot, target, bin in self.python_bins:
+            if isinstance(bin, (list, tuple)):
+                checked = all(c(target) for c in bin)
+            elif callable(bin):
+                checked = bin(target)
+            else:
+                raise ValueError("Invalid value %s, Need callable bin/bins" % bin)
+            if checked:
+                self.__hit(slot)
+
+        for target, state, lengths in self.transitions:
+            value = getattr(target, "value", target)
+            history = state.history
+            if state.on_change and history and history[-1] == value:
+                continue
+            history.append(value)
+            n = len(history)
+            for length, table in lengths:
+                if length > n:
+                    break
+                key = (
+                    tuple(history)
+                    if length == n
+                    else tuple(islice(history, n - length, n))
+                )
+                for slot in table.get(key, ()):
+                    self.__hit(slot)
+
+        hinted = True
+        for point in self.dynamic_points:
+            if point["hinted"] and point["once"] == True:
+                continue
+            point_hinted, _ = CovGroup.__check__(point)
+            hinted = hinted and point_hinted
+        return hinted
+
+    def sample(self) -> bool:
+        """
+        Sample all points once
+
+        Returns:
+            True if all points are hinted
+        """
+        if self.dirty and not self.pending:
+            self.__compile()
+        if self.crosses:
+            self.sample_slots = []
+
+        hits = []
+        for table in self.tables.values():
+            table.check(hits)
+        for slot in self.__hit_slots(hits):
+            self.__hit(slot)
+        for target, auto, slots in self.autos:
+            idx = auto.index_of(getattr(target, "value", target))
+            if idx is not None:
+                self.__hit(slots[idx])
+        hinted = self.__sample_python()
+
+        if self.crosses:
+            slots, self.sample_slots = self.sample_slots, None
+            for cidx, combo in self.__cross_combos(slots):
+                self.__cross_hit(cidx, combo)
+        return hinted and self.unhinted == 0
+
+    def record(self) -> bool:
+        """
+        Record the values of the targets of the lowered conditions into the column buffer, they
+        are evaluated later by flush. Custom callables, transitions and dynamic bins are still
+        checked now.
+
+        Returns:
+            True if all points are hinted, as far as the evaluated samples tell
+        """
+        if self.columns is None:
+            if self.dirty and not self.pending:
+                self.__compile()
+            self.columns = [[] for _ in range(len(self.tables) + len(self.autos))]
+        for table, column in zip(self.tables.values(), self.columns):
+            column.append(getattr(table.target, "value", table.target))
+        for (target, _, _), column in zip(self.autos, self.columns[len(self.tables) :]):
+            column.append(getattr(target, "value", target))
+        if self.timed:
+            if self.stamps is None:
+                self.stamps = []
+            self.stamps.append(self.stamp)
+        return self.__sample_python() and self.unhinted == 0
+
+    def recorded(self) -> int:
+        """
+        Get the number of samples in the column buffer
+        """
+        if not self.columns:
+            return 0
+        return len(self.columns[0])
+
+    def __count_cross_masks(self, slot_masks, cross_counts, cross_firsts):
+        n = len(next(iter(slot_masks.values())))
+        for cidx, (cross, _, refs) in enumerate(self.crosses):
+            stacks = [
+                np.stack([slot_masks[slot] for slot in self.point_slots[ref]])
+                for ref in refs
+            ]
+            hit_num = [stack.sum(axis=0) for stack in stacks]
+            counts, firsts = cross_counts[cidx], cross_firsts[cidx]
+            if cross.total < (1 << 62) and all(h.max() <= 1 for h in hit_num):
+                # At most one bin of each crossed point is hit in a sample, so each sample hits
+                # at most one cross bin and the bins can be counted with one np.unique
+                valid = np.ones(n, dtype=bool)
+                code = np.zeros(n, dtype=np.int64)
+                for stack, hits, names in zip(stacks, hit_num, cross.bin_names):
+                    valid &= hits == 1
+                    code = code * len(names) + stack.argmax(axis=0)
+                codes, first, nums = np.unique(
+                    code[valid], return_index=True, return_counts=True
+                )
+                first = np.flatnonzero(valid)[first]
+                for code, i, num in zip(codes.tolist(), first.tolist(), nums.tolist()):
+                    combo = []
+                    for names in reversed(cross.bin_names):
+                        code, idx = divmod(code, len(names))
+                        combo.append(idx)
+                    combo = tuple(reversed(combo))
+                    counts[combo] = num
+                    firsts[combo] = i
+                continue
+            for i in range(n):
+                lists = [np.flatnonzero(stack[:, i]).tolist() for stack in stacks]
+                if all(lists):
+                    for combo in product(*lists):
+                        counts[combo] = counts.get(combo, 0) + 1
+                        firsts.setdefault(combo, i)
+
+    @staticmethod
+    def __column_array(column):
+        """
+        Convert a recorded column to a NumPy array without losing precision: python ints are
+        stored as int64 or uint64, floats as float64, and anything else as objects
+        """
+        types = set(map(type, column))
+        if types <= {int, bool}:
+            low, high = min(column), max(column)
+            if -(1 << 63) <= low and high < (1 << 63):
+                return np.asarray(column, dtype=np.int64)
+            if 0 <= low and high < (1 << 64):
+                return np.asarray(column, dtype=np.uint64)
+            return np.asarray(column, dtype=object)
+        if types == {float}:
+            return np.asarray(column, dtype=np.float64)
+        try:
+            values = np.asarray(column)
+        except (TypeError, OverflowError, ValueError):
+            values = None
+        if values is None or values.dtype.kind not in "iu":
+            values = np.asarray(column, dtype=object)
+        return values
+
+    def count_columns(self, columns):
+        """
+        Count the hits of each bin over recorded columns, the columns are evaluated with NumPy
+        when it is installed
+
+        Returns:
+            A dict that maps a slot to its number of hits, a list with a dict that maps each hit
+            cross bin to its number of hits for each cross point, and the same structures with
+            the index of the first hit in the columns
+        """
+        counts, firsts = {}, {}
+        cross_counts = [{} for _ in self.crosses]
+        cross_firsts = [{} for _ in self.crosses]
+        result = (counts, cross_counts, firsts, cross_firsts)
+        if len(columns) == 0 or len(columns[0]) == 0:
+            return result
+
+        tables = list(self.tables.values())
+        auto_columns = columns[len(tables) :]
+        if np is None:
+            for i, values in enumerate(zip(*columns)):
+                hits = []
+                for table, value in zip(tables, values):
+                    table.check_value(value, hits)
+                slots = self.__hit_slots(hits)
+                for (_, auto, auto_slots), value in zip(
+                    self.autos, values[len(tables) :]
+                ):
+                    idx = auto.index_of(value)
+                    if idx is not None:
+                        slots.append(auto_slots[idx])
+                for slot in slots:
+                    counts[slot] = counts.get(slot, 0) + 1
+                    firsts.setdefault(slot, i)
+                for cidx, combo in self.__cross_combos(slots):
+                    cross_counts[cidx][combo] = cross_counts[cidx].get(combo, 0) + 1
+                    cross_firsts[cidx].setdefault(combo, i)
+            return result
+
+        masks = {}
+        for table, column in zip(tables, columns):
+            masks.update(table.masks(CovSampler.__column_array(column)))
+
+        slot_masks = {}
+        for cid, slot in enumerate(self.cid_slot):
+            if slot is not None:
+                slot_masks[slot] = masks[cid]
+        for slot, cids in self.and_bins:
+            mask = masks[cids[0]]
+            for cid in cids[1:]:
+                mask = mask & masks[cid]
+            slot_masks[slot] = mask
+        for slot, mask in slot_masks.items():
+            counts[slot] = int(np.count_nonzero(mask))
+            if counts[slot] > 0:
+                firsts[slot] = int(mask.argmax())
+        for (_, auto, slots), column in zip(self.autos, auto_columns):
+            indexes = auto.indexes_of(CovSampler.__column_array(column))
+            nums = np.bincount(indexes[indexes >= 0], minlength=auto.bin_num).tolist()
+            for slot, num in zip(slots, nums):
+                counts[slot] = num
+            bins, first = np.unique(indexes, return_index=True)
+            for idx, i in zip(bins.tolist(), first.tolist()):
+                if idx >= 0:
+                    firsts[slots[idx]] = i
+            if self.crosses:
+                for i, slot in enumerate(slots):
+                    slot_masks[slot] = indexes == i
+        if self.crosses:
+            self.__count_cross_masks(slot_masks, cross_counts, cross_firsts)
+        return result
+
+    def apply_counts(self, result, stamps=None):
+        """
+        Add the hits counted by count_columns to the counters
+
+        Args:
+            result: The result of count_columns.
+            stamps: The stamps of the samples in the columns.
+        """
+        counts, cross_counts, firsts, cross_firsts = result
+        for slot, count in counts.items():
+            if count > 0:
+                stamp = stamps[firsts[slot]] if stamps else -1
+                self.__hit(slot, count, stamp)
+        for cidx, combos in enumerate(cross_counts):
+            for combo, count in combos.items():
+                stamp = stamps[cross_firsts[cidx][combo]] if stamps else -1
+                self.__cross_hit(cidx, combo, count, stamp)
+
+    def flush(self, background=False) -> bool:
+        """
+        Evaluate the column buffer
+
+        Args:
+            background: If True, the buffer is evaluated by a worker thread and its result is
+                        applied at the next flush without background
+
+        Returns:
+            True if all points are hinted, as far as the evaluated samples tell
+        """
+        columns, self.columns = self.columns, None
+        stamps, self.stamps = self.stamps, None
+        if background:
+            if columns:
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(max_workers=1)
+                future = self.executor.submit(self.count_columns, columns)
+                self.pending.append((future, stamps))
+            while self.pending and self.pending[0][0].done():
+                future, pending_stamps = self.pending.pop(0)
+                self.apply_counts(future.result(), pending_stamps)
+        else:
+            while self.pending:
+                future, pending_stamps = self.pending.pop(0)
+                self.apply_counts(future.result(), pending_stamps)
+            if columns:
+                self.apply_counts(self.count_columns(columns), stamps)
+        return self.unhinted == 0 and all(p["hinted"] for p in self.dynamic_points)
+
+    def unapplied_stamp(self):
+        """
+        Get the stamp of the first sample whose counts are not applied yet, None if the
+        background batches are all applied
+        """
+        if not self.pending:
+            return None
+        stamps = self.pending[0][1]
+        return stamps[0] if stamps else None
+
+    def coverage(self) -> float:
+        """
+        Get the ratio of hit bins
+        """
+        hit, total = self.bins_hit, self.bins_total
+        for point in self.dynamic_points:
+            total += len(point["hints"])
+            hit += sum(1 for v in point["hints"].values() if v > 0)
+        return hit / total if total > 0 else 1.0
+
+    def coverage_at(self, stamps):
+        """
+        Get the ratio of hit bins at each stamp from the first hits of the bins. Bins hit before
+        the stamps were recorded count as hit at any stamp.
+        """
+        first_hits = [f for f, c in zip(self.first_hits, self.counters) if c > 0]
+        for cross, _, _ in self.crosses:
+            first_hits.extend(cross.first_hits.get(combo, -1) for combo in cross.table)
+        first_hits.sort()
+        total = max(self.bins_total, 1)
+        return [bisect_right(first_hits, stamp) / total for stamp in stamps]
+
+    def close(self):
+        """
+        Evaluate all recorded samples and stop the worker thread
+        """
+        self.flush()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
 class CovGroup(object):
     """
     functional coverage group
@@ -176,20 +1342,29 @@ class CovGroup(object):
         @param name: name of the group
         @param disable_sample_when_point_hinted: if True, the group will stop sampling when all points are hinted
         """
-        frame = inspect.stack()[1]
-        self.filename = frame.filename
-        self.lineno = frame.lineno
+        # sys._getframe only reads the caller frame, inspect.stack() would also load the source
+        # context of every frame in the stack
+        frame = sys._getframe(1)
+        self.filename = frame.f_code.co_filename
+        self.lineno = frame.f_lineno
+        del frame
         self.name = name if name else "%s:%s" % (self.filename, self.lineno)
         self.disable_sample_when_point_hinted = disable_sample_when_point_hinted
+        self.defer_buffer_size = 0
+        self.defer_background = False
+        self.timeline = None
+        self.guard = None
         self.init()
 
     def init(self):
         self.cov_points = OrderedDict()
         self.hinted = False
         self.all_once = False
-        self.stop_sample = False
+        self.stopped = False
         self.sample_count = 0
         self.sample_calln = 0
+        self.skip_count = 0
+        self.sampler = None
         return self
 
     def add_watch_point(
@@ -211,6 +1386,7 @@ class CovGroup(object):
             key = "%s:%s" % (target, bins.keys())
         if key in self.cov_points:
             raise ValueError("Duplicated key %s" % key)
+        self.__drop_sampler()
         if not isinstance(bins, dict):
             if not callable(bins):
                 raise ValueError("Invalid value %s for key %s" % (bins, key))
@@ -237,6 +1413,137 @@ class CovGroup(object):
 
     add_cover_point = add_watch_point
 
+    def add_auto_bin_point(
+        self,
+        target: object,
+        low=0,
+        high=None,
+        width=None,
+        mode="uniform",
+        bin_num=16,
+        edges=None,
+        name: str = "",
+        once=None,
+    ):
+        """
+        Add a point with automatic value-range bins, the bin of a value is computed instead of
+        checking every bin
+        @param target: the object to be watched, need to have a value attribute. eg target.value is available
+        @param low: the lower bound of the range, inclusive
+        @param high: the upper bound of the range, inclusive. If None, it is 2**width - 1
+        @param width: the bit width of the target, used when high is None
+        @param mode: "uniform" for bin_num bins of equal size, "log2" for a bin per bit length
+        @param bin_num: the number of bins in uniform mode
+        @param edges: the sorted edges of the bins, bin i is [edges[i], edges[i + 1] - 1]. If set, mode is ignored
+        @param name: the name of the point
+        """
+        if high is None and edges is None:
+            if width is None:
+                raise ValueError("Either high, width or edges is needed")
+            high = (1 << width) - 1
+        auto = CovAutoBins(low, high, mode, bin_num, edges)
+        key = name
+        if not key:
+            key = "%s:%s" % (target, auto.mode)
+        if key in self.cov_points:
+            raise ValueError("Duplicated key %s" % key)
+        self.__drop_sampler()
+        bins = auto.bins()
+        self.cov_points[key] = {
+            "taget": target,
+            "bins": bins,
+            "dynamic_bin": False,
+            "hints": {k: 0 for k in bins.keys()},
+            "hinted": False,
+            "once": self.disable_sample_when_point_hinted if once == None else once,
+            "functions": {},
+            "kind": "auto",
+            "auto": auto,
+        }
+        self.hinted = False
+        return self
+
+    def add_transition_point(
+        self,
+        target: object,
+        transitions: dict,
+        name: str = "",
+        once=None,
+        on_change=False,
+    ):
+        """
+        Add a transition point to the group, a bin is hit when the target takes a sequence of values
+        in consecutive samples
+        @param target: the object to be watched, need to have a value attribute. eg target.value is available
+        @param transitions: a dict that maps a bin name to a sequence of hashable values, eg. {"0->1->2": [0, 1, 2]}
+        @param name: the name of the point
+        @param on_change: if True, repeated values are ignored, so a sequence is a sequence of value changes
+        """
+        key = name
+        if not key:
+            key = "%s:%s" % (target, transitions.keys())
+        if key in self.cov_points:
+            raise ValueError("Duplicated key %s" % key)
+        if len(transitions) == 0:
+            raise ValueError("Empty transitions for key %s" % key)
+        for k, v in transitions.items():
+            if not isinstance(v, (list, tuple)) or len(v) == 0:
+                raise ValueError("Invalid transition %s for key %s" % (v, k))
+        self.__drop_sampler()
+        self.cov_points[key] = {
+            "taget": target,
+            "bins": {k: tuple(v) for k, v in transitions.items()},
+            "dynamic_bin": False,
+            "hints": {k: 0 for k in transitions.keys()},
+            "hinted": False,
+            "once": self.disable_sample_when_point_hinted if once == None else once,
+            "functions": {},
+            "kind": "transition",
+            "transition": CovTransition(transitions, on_change),
+        }
+        self.hinted = False
+        return self
+
+    def add_cross_point(self, points: list, name: str = "", once=None):
+        """
+        Add a cross point to the group, its bins are the Cartesian product of the bins of other
+        points. A cross bin is hit when each of its bins is hit in the same sample. Only hit cross
+        bins are stored, the bin names are the names of the crossed bins joined by ","
+        @param points: the names of the points to cross
+        @param name: the name of the point
+        """
+        key = name
+        if not key:
+            key = "cross(%s)" % ",".join(points)
+        if key in self.cov_points:
+            raise ValueError("Duplicated key %s" % key)
+        if len(points) < 2:
+            raise ValueError("A cross point needs at least two points")
+        for p in points:
+            if p not in self.cov_points:
+                raise ValueError("Invalid key %s" % p)
+            point = self.cov_points[p]
+            if point["dynamic_bin"] or point.get("kind") == "cross":
+                raise ValueError(
+                    "Point %s with dynamic bins or a cross can not be crossed" % p
+                )
+        self.__drop_sampler()
+        cross = CovCross(points, [self.cov_points[p]["bins"].keys() for p in points])
+        self.cov_points[key] = {
+            "taget": None,
+            "bins": CovCrossBins(cross),
+            "dynamic_bin": False,
+            "hints": CovCrossHints(cross),
+            "first_hits": CovCrossFirstHits(cross),
+            "hinted": False,
+            "once": self.disable_sample_when_point_hinted if once == None else once,
+            "functions": {},
+            "kind": "cross",
+            "cross": cross,
+        }
+        self.hinted = False
+        return self
+
     def del_point(self, name: str):
         """
         delete a point with name
@@ -244,6 +1551,10 @@ class CovGroup(object):
         """
         if name not in self.cov_points:
             raise ValueError("Invalid key %s" % name)
+        for k, v in self.cov_points.items():
+            if v.get("kind") == "cross" and name in v["cross"].points:
+                raise ValueError("Point %s is crossed by %s" % (name, k))
+        self.__drop_sampler()
         del self.cov_points[name]
         return self
 
@@ -254,10 +1565,17 @@ class CovGroup(object):
         """
         if name not in self.cov_points:
             raise ValueError("Invalid key %s" % name)
-        self.cov_points[name]["hints"] = {
-            k: 0 for k in self.cov_points[name]["bins"].keys()
-        }
-        self.cov_points[name]["hinted"] = False
+        self.__drop_sampler()
+        point = self.cov_points[name]
+        if point.get("kind") == "cross":
+            point["cross"].table.clear()
+            point["cross"].first_hits.clear()
+        else:
+            point["hints"] = {k: 0 for k in point["bins"].keys()}
+            point.pop("first_hits", None)
+        if point.get("kind") == "transition":
+            point["transition"].history.clear()
+        point["hinted"] = False
         self.hinted = False
         return self
 
@@ -311,11 +1629,173 @@ class CovGroup(object):
                     point["functions"][b_name].add("%s.%s"%(f.__module__, f.__name__))
         return self
 
+    def __drop_sampler(self):
+        if self.sampler is not None:
+            self.sampler.close()
+            self.sampler = None
+
+    def defer_sample(self, buffer_size=4096, background=False):
+        """
+        Defer the evaluation of the bins
+
+        Description:
+            In deferred mode, sample only records the values of the targets into a column buffer.
+            The bins with built-in conditions are evaluated in bulk when the buffer is full, or
+            when the coverage is read (as_dict, is_all_covered, ...). Bins with custom callables
+            are still checked at each sample. Since the group only knows that all points are
+            hinted after a flush, a few more samples than in inline mode may be counted.
+
+        Args:
+            buffer_size (int): number of samples in the buffer, 0 to sample inline.
+            background (bool): if True, full buffers are evaluated by a worker thread.
+
+        Returns:
+            CovGroup: this covgroup object
+        """
+        self.flush()
+        self.defer_buffer_size = buffer_size
+        self.defer_background = background
+        return self
+
+    def flush(self):
+        """
+        Evaluate all deferred samples
+        """
+        if self.sampler is not None:
+            self.hinted = self.sampler.flush()
+            self.all_once = self.hinted and self.sampler.all_once
+            self.__update_timeline()
+        return self
+
+    def enable_timeline(
+        self, interval=1000, cycle=None, flat_window=None, min_growth=0.0
+    ):
+        """
+        Record when each bin is first hit and the coverage ratio every interval samples
+
+        Description:
+            The first hit of each bin is stamped with the sample index, or with cycle() if a
+            callable is given, eg. lambda: dut.xclock.clk. The stamps are reported as "first_hit"
+            in the bins of as_dict, and the snapshots as "timeline". If flat_window is set, the
+            group stops sampling once the coverage grows by no more than min_growth over the
+            last flat_window snapshots.
+
+        Args:
+            interval (int): number of samples between two snapshots.
+            cycle (Callable): returns the current cycle, the sample index is used if None.
+            flat_window (int): number of snapshots to check the growth over, None to never stop.
+            min_growth (float): the coverage ratio growth under which the coverage is flat.
+
+        Returns:
+            CovGroup: this covgroup object
+        """
+        self.flush()
+        self.timeline = CovTimeline(interval, cycle, flat_window, min_growth)
+        if self.sampler is not None:
+            self.sampler.timed = True
+        return self
+
+    def set_guard(self, guard, condition=None):
+        """
+        Sample the group only when a guard holds
+
+        Description:
+            The guard is checked at the start of each sample, before any bin is evaluated. The
+            samples on which it does not hold are counted in skip_count ("__skip_count__" in
+            as_dict) instead of sample_count. A guard on a target with an Eq condition is
+            compiled to a single comparison.
+
+        Args:
+            guard: a callable without arguments, or an object with a value attribute, eg.
+                dut.io_valid. None to remove the guard.
+            condition (CovCondition or Callable): checked on the guard object, call(guard) -> bool.
+                If None, the value of the guard object must not be 0.
+
+        Returns:
+            CovGroup: this covgroup object
+        """
+        if guard is None:
+            self.guard = None
+        elif condition is None and not hasattr(guard, "value"):
+            if not callable(guard):
+                raise ValueError("Guard %s is neither callable nor has a value" % guard)
+            self.guard = guard
+        elif condition is None:
+            self.guard = lambda: guard.value != 0
+        elif type(condition) is CovEq and hasattr(guard, "value"):
+            value = condition.value
+            self.guard = lambda: guard.value == value
+        else:
+            self.guard = lambda: condition(guard)
+        return self
+
+    async def sample_on(self, trigger, *args, **kwargs):
+        """
+        Sample the group each time a trigger fires, until the group stops sampling
+
+        Args:
+            trigger: an async trigger function, eg. toffee.triggers.ClockCycles or RisingEdge
+            args, kwargs: the arguments of the trigger, eg. the dut or the pin
+
+        Example:
+            create_task(group.set_guard(dut.io_valid).sample_on(ClockCycles, dut))
+        """
+        while not self.stopped and not (self.hinted and self.all_once):
+            await trigger(*args, **kwargs)
+            self.sample()
+
+    def sample_on_transaction(self, method):
+        """
+        Sample the group at each transaction of a driver or monitor method of an agent
+
+        Args:
+            method: a method decorated with driver_method or monitor_method, eg. agent.exec_add
+
+        Returns:
+            CovGroup: this covgroup object
+        """
+        agent = getattr(method, "__self__", None)
+        name = getattr(method, "__name__", "")
+        if hasattr(method, "__is_driver_decorated__"):
+            component = agent.drivers[name]
+        elif hasattr(method, "__is_monitor_decorated__"):
+            component = agent.monitors[name]
+        else:
+            raise ValueError(
+                "%s is not a driver or monitor method of an agent" % method
+            )
+        component.add_transaction_callback(lambda _: self.sample())
+        return self
+
+    def __update_timeline(self):
+        """
+        Resolve the snapshots taken in deferred mode and check if the coverage is flat
+        """
+        timeline = self.timeline
+        if timeline is None or self.sampler is None:
+            return
+        if timeline.pending:
+            # the snapshots after a batch still counted by the worker are resolved later,
+            # the first hits of its bins are not known yet
+            limit = self.sampler.unapplied_stamp()
+            ready = len(timeline.pending)
+            if limit is not None:
+                ready = bisect_left(timeline.pending, limit)
+            stamps = timeline.pending[:ready]
+            for stamp, coverage in zip(stamps, self.sampler.coverage_at(stamps)):
+                timeline.snapshot(stamp, coverage)
+            del timeline.pending[:ready]
+        if timeline.flattened():
+            self.stopped = True
+
     def clear(self):
         """
         clear all points
         """
+        self.__drop_sampler()
         self.init()
+        if self.timeline is not None:
+            self.timeline.clear()
         return self
 
     @staticmethod
@@ -357,6 +1837,7 @@ class CovGroup(object):
         return the point with key
         @param key: the key of the point
         """
+        self.flush()
         if key not in self.cov_points:
             raise ValueError("Invalid key %s" % key)
         return self.cov_points[key]
@@ -366,6 +1847,7 @@ class CovGroup(object):
         check if the point with key is covered
         @param key: the key of the point
         """
+        self.flush()
         if key not in self.cov_points:
             raise ValueError("Invalid key %s" % key)
         return self.cov_points[key]["hinted"]
@@ -374,6 +1856,7 @@ class CovGroup(object):
         """
         check if all points are covered
         """
+        self.flush()
         if self.hinted:
             return True
         for _, v in self.cov_points.items():
@@ -386,27 +1869,42 @@ class CovGroup(object):
         sample the group
         """
         self.sample_calln += 1
-        if self.stop_sample:
+        if self.stopped:
             return
         if self.hinted and self.all_once:
             return
+        if self.guard is not None and not self.guard():
+            self.skip_count += 1
+            return
         self.sample_count += 1
-        all_hinted = True
-        self.all_once = True
-        for _, v in self.cov_points.items():
-            hinted, onece = self.__check__(v)
-            if not hinted:
-                all_hinted = False
-            if not onece:
-                self.all_once = False
-        self.hinted = all_hinted
+        if self.sampler is None:
+            self.sampler = CovSampler(self.cov_points)
+            self.sampler.timed = self.timeline is not None
+        timeline = self.timeline
+        if timeline is not None:
+            self.sampler.stamp = timeline.stamp(self.sample_count)
+        if self.defer_buffer_size > 0 and self.sampler.deferrable:
+            self.hinted = self.sampler.record()
+            if timeline is not None and self.sample_count % timeline.interval == 0:
+                timeline.pending.append(self.sampler.stamp)
+            if self.sampler.recorded() >= self.defer_buffer_size:
+                self.hinted = self.sampler.flush(self.defer_background)
+                self.__update_timeline()
+        else:
+            self.hinted = self.sampler.sample()
+            if timeline is not None and self.sample_count % timeline.interval == 0:
+                timeline.snapshot(self.sampler.stamp, self.sampler.coverage())
+                if timeline.flattened():
+                    self.stopped = True
+        self.all_once = self.hinted and self.sampler.all_once
         return self
 
     def sample_stoped(self):
         """
         check if the group is stoped
         """
-        if self.stop_sample:
+        self.flush()
+        if self.stopped:
             return True
         return self.hinted and self.all_once
 
@@ -414,21 +1912,25 @@ class CovGroup(object):
         """
         stop sampling
         """
-        self.stop_sample = True
+        self.stopped = True
         return self
 
     def resume_sample(self):
         """
-        resume sampling
+        resume sampling, the points and bins retired after they were covered are evaluated again
         """
-        self.stop_sample = False
+        self.stopped = False
         self.all_once = False
+        if self.sampler is not None:
+            self.sampler.flush()
+            self.sampler.reactivate()
         return self
 
     def as_dict(self):
         """
         return the group as a dict
         """
+        self.flush()
         ret = OrderedDict()
         bins_hints = 0
         bins_total = 0
@@ -471,6 +1973,15 @@ class CovGroup(object):
             }
             for k, v in self.cov_points.items()
         ]
+        for point, v in zip(ret["points"], self.cov_points.values()):
+            if self.timeline is not None:
+                first_hits = dict(v.get("first_hits", {}).items())
+                for b in point["bins"]:
+                    b["first_hit"] = first_hits.get(b["name"], -1)
+            if "kind" in v:
+                point["kind"] = v["kind"]
+            if v.get("kind") == "cross":
+                point["cross"] = list(v["cross"].points)
         ret["name"] = self.name
         ret["hinted"] = self.hinted
         ret["bin_num_total"] = bins_total
@@ -486,7 +1997,10 @@ class CovGroup(object):
         )
         ret["__sample_count__"] = self.sample_count
         ret["__sample_calln__"] = self.sample_calln
-        ret["__stop_sample__"] = self.stop_sample
+        ret["__skip_count__"] = self.skip_count
+        ret["__stop_sample__"] = self.stopped
+        if self.timeline is not None:
+            ret["timeline"] = self.timeline.as_dict()
         return ret
 
     def __str__(self) -> str:
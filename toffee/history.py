@@ -0,0 +1,307 @@
+__all__ = [
+    "History",
+    "track",
+    "past",
+    "rose",
+    "fell",
+    "stable",
+    "past_any",
+    "past_all",
+    "past_count",
+]
+
+import asyncio
+
+from ._base import MObject
+from .asynchronous import add_callback
+
+
+class HistoryRing(MObject):
+    """
+    The recent values of a signal, stored in a circular buffer as deep as the deepest history
+    of the signal. All the histories of the signal share the ring, so its value is read once
+    per cycle whatever their number.
+    """
+
+    def __init__(self, signal, depth):
+        self.signal = signal
+        self.depth = depth
+        self.buffer = [None] * depth
+        self.count = 0  # number of values written
+
+    def grow(self, depth):
+        """
+        Make the ring keep at least depth values, the values kept so far are preserved.
+        """
+
+        if depth <= self.depth:
+            return
+        kept = [self.value(n) for n in range(min(self.count, self.depth))]
+        self.depth = depth
+        self.buffer = [None] * depth
+        for n, value in enumerate(kept):
+            self.buffer[(self.count - 1 - n) % depth] = value
+
+    def value(self, n):
+        """
+        Get the value sampled n cycles ago. The caller makes sure that it was sampled.
+        """
+
+        return self.buffer[(self.count - 1 - n) % self.depth]
+
+    def values(self, num):
+        """
+        Get the values of the last num cycles, from the oldest to the newest.
+        """
+
+        buffer, depth, last = self.buffer, self.depth, self.count - 1
+        return [buffer[(last - n) % depth] for n in range(num - 1, -1, -1)]
+
+
+class SignalHistory(MObject):
+    """
+    The history rings of an event loop, one for each recorded signal. The rings are sampled
+    together in one pass each cycle.
+    """
+
+    def __init__(self):
+        self.rings = {}  # id(signal) -> HistoryRing
+        self.tracked = {}  # id(signal) -> the deepest History of the signal
+
+    @staticmethod
+    def of_loop():
+        """
+        Get the signal history of the running event loop.
+        """
+
+        loop = asyncio.get_event_loop()
+        history = getattr(loop, "signal_history", None)
+        if history is None:
+            history = loop.signal_history = SignalHistory()
+        return history
+
+    def ring(self, signal, length):
+        """
+        Get the ring of a signal, grown to keep at least length values.
+        """
+
+        ring = self.rings.get(id(signal))
+        if ring is None:
+            ring = self.rings[id(signal)] = HistoryRing(signal, length)
+        else:
+            ring.grow(length)
+        return ring
+
+    def track(self, signal, length):
+        """
+        Get a History of the signal that keeps at least length values. The existing History
+        of the signal is reused when it is deep enough.
+        """
+
+        history = self.tracked.get(id(signal))
+        if history is None or history.depth < length:
+            history = History(signal, length)
+        return history
+
+    def sample(self):
+        for ring in self.rings.values():
+            ring.buffer[ring.count % ring.depth] = ring.signal.value
+            ring.count += 1
+
+
+async def __process_signal_history():
+    history = getattr(asyncio.get_event_loop(), "signal_history", None)
+    if history is not None:
+        history.sample()
+
+
+add_callback(__process_signal_history)
+
+
+def _truth(value):
+    return bool(value)
+
+
+class History(MObject):
+    """
+    The values of a signal in the last depth clock cycles.
+
+    The value is sampled at each clock cycle before the DUT steps, so in a coroutine resumed
+    by the clock the latest sample is the current value of the signal. The history starts
+    when the History is created; values not sampled yet are None, and the window queries
+    only look at the samples that exist.
+
+    Args:
+        signal: The signal to record, any object with a value attribute.
+        depth: The number of values to keep, at least 1.
+    """
+
+    def __init__(self, signal, depth):
+        super().__init__()
+
+        assert depth >= 1, "Depth should be greater than or equal to 1."
+
+        registry = SignalHistory.of_loop()
+        self.signal = signal
+        self.depth = depth
+
+        self.__ring = registry.ring(signal, depth)
+        self.__start = self.__ring.count
+
+        deepest = registry.tracked.get(id(signal))
+        if deepest is None or deepest.depth < depth:
+            registry.tracked[id(signal)] = self
+
+    @property
+    def size(self):
+        """
+        The number of values available.
+        """
+
+        return min(self.__ring.count - self.__start, self.depth)
+
+    def __window(self, window):
+        if window is None:
+            return self.size
+        assert window <= self.depth, f"Window {window} exceeds the depth {self.depth}."
+        return min(window, self.__ring.count - self.__start)
+
+    def past(self, n=1):
+        """
+        Get the value sampled n cycles ago, 0 gives the latest sample.
+        """
+
+        assert 0 <= n < self.depth, f"{n} cycles exceed the depth {self.depth}."
+        if self.__ring.count - self.__start <= n:
+            return None
+        return self.__ring.value(n)
+
+    def values(self, window=None):
+        """
+        Get the values of the last window cycles, from the oldest to the newest.
+        """
+
+        return self.__ring.values(self.__window(window))
+
+    def rose(self):
+        """
+        Whether the signal changed from zero to non-zero in the latest sample.
+        """
+
+        if self.__ring.count - self.__start < 2:
+            return False
+        ring = self.__ring
+        return bool(ring.value(0)) and not ring.value(1)
+
+    def fell(self):
+        """
+        Whether the signal changed from non-zero to zero in the latest sample.
+        """
+
+        if self.__ring.count - self.__start < 2:
+            return False
+        ring = self.__ring
+        return not ring.value(0) and bool(ring.value(1))
+
+    def stable(self, n=1):
+        """
+        Whether the signal kept the same value in the last n + 1 samples. False when less
+        than n + 1 values are sampled.
+        """
+
+        assert 0 <= n < self.depth, f"{n} cycles exceed the depth {self.depth}."
+        if self.__ring.count - self.__start <= n:
+            return False
+        ring = self.__ring
+        value = ring.value(0)
+        return all(ring.value(i) == value for i in range(1, n + 1))
+
+    def any(self, window=None, pred=_truth):
+        """
+        Whether pred holds on any value of the last window cycles, by default whether any
+        of them is non-zero.
+        """
+
+        return any(map(pred, self.values(window)))
+
+    def all(self, window=None, pred=_truth):
+        """
+        Whether pred holds on all values of the last window cycles, by default whether all
+        of them are non-zero.
+        """
+
+        return all(map(pred, self.values(window)))
+
+    def count(self, window=None, pred=_truth):
+        """
+        The number of values of the last window cycles on which pred holds, by default the
+        number of cycles in which the signal is non-zero.
+        """
+
+        return sum(map(pred, self.values(window)))
+
+
+def track(signal, depth):
+    """
+    Start to record the last depth values of a signal and return its History. The queries
+    below record a signal from their first call, call track in advance to keep the values
+    from the start.
+    """
+
+    return SignalHistory.of_loop().track(signal, depth)
+
+
+def past(signal, n=1):
+    """
+    Get the value of a signal sampled n cycles ago, None if it is not sampled yet.
+    """
+
+    return track(signal, n + 1).past(n)
+
+
+def rose(signal):
+    """
+    Whether a signal changed from zero to non-zero in the latest sample.
+    """
+
+    return track(signal, 2).rose()
+
+
+def fell(signal):
+    """
+    Whether a signal changed from non-zero to zero in the latest sample.
+    """
+
+    return track(signal, 2).fell()
+
+
+def stable(signal, n=1):
+    """
+    Whether a signal kept the same value in the last n + 1 samples.
+    """
+
+    return track(signal, n + 1).stable(n)
+
+
+def past_any(signal, window, pred=_truth):
+    """
+    Whether pred holds on any value of a signal in the last window cycles.
+    """
+
+    return track(signal, window).any(window, pred)
+
+
+def past_all(signal, window, pred=_truth):
+    """
+    Whether pred holds on all values of a signal in the last window cycles.
+    """
+
+    return track(signal, window).all(window, pred)
+
+
+def past_count(signal, window, pred=_truth):
+    """
+    The number of values of a signal in the last window cycles on which pred holds.
+    """
+
+    return track(signal, window).count(window, pred)
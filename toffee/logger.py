@@ -1,8 +1,22 @@
+import asyncio
+import atexit
+import contextvars
+import copy
 import logging
+import queue
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+
+from .tracelog import TraceHandler
 
 __all__ = [
     "get_logger",
     "setup_logging",
+    "flush_logging",
+    "set_rate_limit",
+    "get_stats",
+    "set_stats_window",
     "INFO",
     "DEBUG",
     "WARNING",
@@ -19,30 +33,158 @@ __all__ = [
 ]
 
 
+_LEVELS = [
+    logging.DEBUG,
+    logging.INFO,
+    logging.WARNING,
+    logging.ERROR,
+    logging.CRITICAL,
+]
+_LEVEL_NAMES = [logging.getLevelName(level) for level in _LEVELS]
+
+# The component the running coroutine logs for, e.g. the driver or monitor of an agent
+current_component = contextvars.ContextVar("toffee_component", default="")
+
+
 class StatsHandler(logging.Handler):
-    """Provides quantity statistics based on severity and id"""
+    """
+    Provides quantity statistics based on severity, id, component and cycle window.
 
-    def __init__(self):
+    Each id, component and window has a list of counters, one for each severity, allocated
+    when it is first seen. The statistics can be read with get_stats while the simulation is
+    running, also from another thread.
+
+    Args:
+        window: The number of cycles in a window.
+        max_windows: The number of the latest windows kept.
+    """
+
+    def __init__(self, window=1000, max_windows=64):
         logging.Handler.__init__(self)
-        self.serverity_stats = {}
-        self.id_stats = {}
+        self.window = window
+        self.max_windows = max_windows
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.severity = [0] * len(_LEVELS)
+            self.ids = {}
+            self.components = {}
+            self.windows = OrderedDict()  # first cycle of the window -> counters
+
+    @staticmethod
+    def __counters(table, key):
+        counters = table.get(key)
+        if counters is None:
+            counters = table[key] = [0] * len(_LEVELS)
+        return counters
 
     def emit(self, record):
-        # Count the number of logs based on severity and id
+        # Count the number of logs based on severity, id, component and cycle window
+        slot = max(bisect_right(_LEVELS, record.levelno) - 1, 0)
+        self.severity[slot] += 1
+
+        log_id = record.__dict__.get("log_id", "")
+        StatsHandler.__counters(self.ids, log_id or "default")[slot] += 1
+
+        component = getattr(record, "component", "")
+        if component:
+            StatsHandler.__counters(self.components, component)[slot] += 1
+
+        cycle = getattr(record, "cycle", -1)
+        if cycle >= 0:
+            start = cycle - cycle % self.window
+            if start not in self.windows:
+                self.windows[start] = [0] * len(_LEVELS)
+                while len(self.windows) > self.max_windows:
+                    self.windows.popitem(last=False)
+            self.windows[start][slot] += 1
+
+    @staticmethod
+    def __by_severity(counters):
+        return {name: n for name, n in zip(_LEVEL_NAMES, counters) if n}
+
+    @property
+    def serverity_stats(self):
+        return StatsHandler.__by_severity(self.severity)
+
+    @property
+    def id_stats(self):
+        return {k: sum(v) for k, v in self.ids.items()}
+
+    @property
+    def component_stats(self):
+        return {k: sum(v) for k, v in self.components.items()}
 
-        if record.levelname not in self.serverity_stats:
-            self.serverity_stats[record.levelname] = 0
-        self.serverity_stats[record.levelname] += 1
+    def get_stats(self):
+        """
+        Get a snapshot of the statistics.
+
+        Returns:
+            A dict with the counts by severity of all the logs ("severity"), of each id
+            ("id"), of each component ("component"), and of each of the latest cycle windows,
+            keyed by their first cycle ("window").
+        """
+
+        by_severity = StatsHandler.__by_severity
+        with self.lock:
+            return {
+                "severity": by_severity(self.severity),
+                "id": {k: by_severity(v) for k, v in self.ids.items()},
+                "component": {k: by_severity(v) for k, v in self.components.items()},
+                "window_size": self.window,
+                "window": {k: by_severity(v) for k, v in self.windows.items()},
+            }
 
-        log_id = record.__dict__.get("log_id", "default_id")
-        if log_id == "":
-            log_id = "default"
-        if log_id not in self.id_stats:
-            self.id_stats[log_id] = 0
-        self.id_stats[log_id] += 1
 
-    def get_stats(self):
-        return self.stats
+# log levels
+INFO = logging.INFO
+DEBUG = logging.DEBUG
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+CRITICAL = logging.CRITICAL
+
+
+class RecordFilter(logging.Filter):
+    """
+    Stamps the records with the current cycle of the clock loop, -1 outside of it, and the
+    current component, and limits the rate of repeated records.
+
+    A record with a log_id that has a rule is limited by the rule of its id, the other records
+    are limited by the default rule for each call site. A rule (first, every) lets the first
+    records through, then one record out of every, or none if every is 0.
+    """
+
+    def __init__(self):
+        logging.Filter.__init__(self)
+        self.rules = {}  # log_id -> (first, every)
+        self.default_rule = None
+        self.seen = {}
+        self.suppressed = {}
+
+    def filter(self, record):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        record.cycle = getattr(loop, "cycle", -1)
+        record.component = current_component.get()
+
+        log_id = record.__dict__.get("log_id", "")
+        rule = self.rules.get(log_id) if log_id != "" else None
+        if rule is not None:
+            key = log_id
+        elif self.default_rule is not None:
+            rule, key = self.default_rule, f"{record.filename}:{record.lineno}"
+        else:
+            return True
+
+        count = self.seen[key] = self.seen.get(key, 0) + 1
+        first, every = rule
+        if count <= first or (every and (count - first) % every == 0):
+            return True
+        self.suppressed[key] = self.suppressed.get(key, 0) + 1
+        return False
 
 
 # ANSI escape sequences for colors
@@ -59,25 +201,136 @@ class ToffeeFormatter(logging.Formatter):
     Custom formatter for Toffee logs. It supports log_id attribute display in the log record
     """
 
+    log_colors = {
+        "DEBUG": BLUE,
+        "INFO": WHITE,
+        "WARNING": YELLOW,
+        "ERROR": RED,
+        "CRITICAL": RED,
+    }
+
     def format(self, record):
-        if not hasattr(record, "log_id") or record.log_id == "":
-            record.log_id = ""
-        else:
-            record.log_id = f"(id: {record.log_id})"
-
-        log_colors = {
-            "DEBUG": BLUE,
-            "INFO": WHITE,
-            "WARNING": YELLOW,
-            "ERROR": RED,
-            "CRITICAL": RED,
-        }
-
-        color = log_colors.get(record.levelname, WHITE)
-        message = super().format(record)
+        # The record is shared by all handlers, so the log_id is restored after formatting
+        log_id = getattr(record, "log_id", "")
+        record.log_id = f"(id: {log_id})" if log_id != "" else ""
+        try:
+            message = super().format(record)
+        finally:
+            record.log_id = log_id
+
+        color = self.log_colors.get(record.levelname, WHITE)
         return f"{color}{message}{RESET}"
 
 
+class AsyncHandler(logging.Handler):
+    """
+    Hands the records to a background thread that formats and writes them with the target
+    handlers, so that the simulation only pays for an enqueue.
+
+    The queue is bounded. When it is full, a record below min_keep_level is dropped if the
+    drop policy is "drop", and the caller waits for room otherwise. The writer takes all the
+    queued records at once and flushes the streams once per batch.
+
+    Args:
+        handlers: The target handlers.
+        queue_size: The number of records the queue holds.
+        drop_policy: "block" or "drop".
+        min_keep_level: The records of this level and above are never dropped.
+    """
+
+    def __init__(
+        self, handlers, queue_size=10000, drop_policy="block", min_keep_level=WARNING
+    ):
+        logging.Handler.__init__(self)
+        if drop_policy not in ("block", "drop"):
+            raise ValueError(f"Invalid drop policy: {drop_policy}")
+
+        self.handlers = handlers
+        self.drop_policy = drop_policy
+        self.min_keep_level = min_keep_level
+        self.dropped = 0
+        self.queue = queue.Queue(queue_size)
+        self.thread = threading.Thread(
+            target=self.__write_forever, name="toffee-logging", daemon=True
+        )
+        self.thread.start()
+
+    def prepare(self, record):
+        """
+        Merge the arguments into the message of a copy of the record, as they may change
+        before it is written. The record itself is left intact for the other handlers, and
+        the formatting is left to the writer.
+        """
+
+        record = copy.copy(record)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def emit(self, record):
+        record = self.prepare(record)
+        if self.drop_policy == "drop" and record.levelno < self.min_keep_level:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+        else:
+            self.queue.put(record)
+
+    def flush(self):
+        """
+        Wait for the records queued so far to be written.
+        """
+
+        if self.thread.is_alive():
+            self.queue.join()
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        for handler in self.handlers:
+            handler.close()
+        logging.Handler.close(self)
+
+    def __write(self, batch):
+        for handler in self.handlers:
+            stream = getattr(handler, "stream", None)
+            with handler.lock:
+                for record in batch:
+                    if record.levelno < handler.level or not handler.filter(record):
+                        continue
+                    try:
+                        if stream is None:
+                            handler.emit(record)
+                        else:
+                            stream.write(handler.format(record) + handler.terminator)
+                    except Exception:
+                        handler.handleError(record)
+                if stream is not None:
+                    stream.flush()
+
+    def __write_forever(self):
+        while True:
+            batch = [self.queue.get()]
+            try:
+                while True:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            stop = batch[-1] is None
+            self.__write([record for record in batch if record is not None])
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                return
+
+
 #######################################
 # Toffee Global Logging Configuration #
 #######################################
@@ -91,6 +344,10 @@ def get_logger() -> logging.Logger:
     return toffee_logger
 
 
+# record_filter stamps the cycle and limits the rate of the records
+record_filter = RecordFilter()
+toffee_logger.addFilter(record_filter)
+
 # Global handlers
 # stats_handler is used to collect statistics about the logs
 stats_handler = StatsHandler()
@@ -104,16 +361,16 @@ default_format = (
 )
 default_formatter = ToffeeFormatter(default_format)
 
-# log levels
-INFO = logging.INFO
-DEBUG = logging.DEBUG
-WARNING = logging.WARNING
-ERROR = logging.ERROR
-CRITICAL = logging.CRITICAL
-
 
 def setup_logging(
-    log_level=WARNING, format=default_format, console_display=True, log_file=None
+    log_level=WARNING,
+    format=default_format,
+    console_display=True,
+    log_file=None,
+    async_mode=False,
+    queue_size=10000,
+    drop_policy="block",
+    trace_file=None,
 ):
     """
     Setup the logging configuration for Toffee
@@ -123,6 +380,12 @@ def setup_logging(
         format: The format of the log message
         console_display: Whether to display logs on the console
         log_file: The log file name to write logs, if None, logs are not written to a file
+        async_mode: Whether to format and write the logs in a background thread
+        queue_size: The number of records the queue of the background thread holds
+        drop_policy: What to do when the queue is full, "block" to wait for room, or "drop"
+                     to drop the records below WARNING
+        trace_file: The binary trace file to write logs, see toffee.tracelog, if None, no
+                    trace is written
     """
 
     logging.basicConfig(level=log_level, format=format, handlers=[])
@@ -134,16 +397,28 @@ def setup_logging(
 
     toffee_logger.addHandler(stats_handler)
 
+    handlers = []
     if console_display:
         screen_handler.setLevel(log_level)
         screen_handler.setFormatter(default_formatter)
-        toffee_logger.addHandler(screen_handler)
+        handlers.append(screen_handler)
 
     if log_file:
         fh = logging.FileHandler(log_file, mode="w")
         fh.setLevel(log_level)
         fh.setFormatter(default_formatter)
-        toffee_logger.addHandler(fh)
+        handlers.append(fh)
+
+    if async_mode and handlers:
+        handlers = [AsyncHandler(handlers, queue_size, drop_policy)]
+
+    if trace_file:
+        th = TraceHandler(trace_file)
+        th.setLevel(log_level)
+        handlers.append(th)
+
+    for handler in handlers:
+        toffee_logger.addHandler(handler)
 
 
 setup_logging()
@@ -161,16 +436,95 @@ critical = toffee_logger.critical
 exception = toffee_logger.exception
 
 
+def set_rate_limit(first, every=0, log_id=None):
+    """
+    Limit the number of repeated logs, the suppressed counts are reported in summary
+
+    Args:
+        first: The number of logs let through before limiting, None to remove the limit
+        every: After the first logs, one log out of every is let through, 0 for none
+        log_id: The log_id the limit applies to, if None, the limit applies to each call site
+                of the logs without a limit on their log_id
+    """
+
+    rule = None if first is None else (first, every)
+    if log_id is None:
+        record_filter.default_rule = rule
+    elif rule is None:
+        record_filter.rules.pop(log_id, None)
+    else:
+        record_filter.rules[log_id] = rule
+
+
+def get_stats():
+    """
+    Get the statistics of the logs, see StatsHandler.get_stats. It can be called while the
+    simulation is running.
+    """
+
+    return stats_handler.get_stats()
+
+
+def set_stats_window(cycles, max_windows=64):
+    """
+    Set the number of cycles in a window of the statistics, the window counts are cleared
+
+    Args:
+        cycles: The number of cycles in a window
+        max_windows: The number of the latest windows kept
+    """
+
+    with stats_handler.lock:
+        stats_handler.window = cycles
+        stats_handler.max_windows = max_windows
+        stats_handler.windows.clear()
+
+
+def flush_logging():
+    """Wait for the logs to be written, in async mode they are written in the background"""
+
+    for handler in toffee_logger.handlers:
+        handler.flush()
+
+
+def __close_async_handlers():
+    for handler in toffee_logger.handlers:
+        if isinstance(handler, AsyncHandler):
+            handler.close()
+
+
+atexit.register(__close_async_handlers)
+
+
 def summary():
     """Display a summary of the logs"""
 
     summary_str = "Log Summary\n"
     summary_str += "============\n"
     summary_str += "* Report counts by severity\n"
-    for k, v in stats_handler.serverity_stats.items():
+    # The counts of a trace are taken from the records written to it
+    stats = next(
+        (h for h in toffee_logger.handlers if isinstance(h, TraceHandler)),
+        stats_handler,
+    )
+    for k, v in stats.serverity_stats.items():
+        summary_str += f"{k}:\t{v}\n"
+    summary_str += "* Report counts by id\n"
+    for k, v in stats.id_stats.items():
         summary_str += f"{k}:\t{v}\n"
-    # summary_str += "* Report counts by id\n"
-    # for k, v in stats_handler.id_stats.items():
-    #     summary_str += f"{k}:\t{v}\n"
+    if stats_handler.components:
+        summary_str += "* Report counts by component\n"
+        for k, v in stats_handler.component_stats.items():
+            summary_str += f"{k}:\t{v}\n"
+    dropped = sum(
+        h.dropped for h in toffee_logger.handlers if isinstance(h, AsyncHandler)
+    )
+    if dropped:
+        summary_str += f"* Dropped logs:\t{dropped}\n"
+    if record_filter.suppressed:
+        summary_str += "* Suppressed logs by id or call site\n"
+        for k, v in record_filter.suppressed.items():
+            summary_str += f"{k}:\t{v}\n"
 
     toffee_logger.info(summary_str)
+    flush_logging()
@@ -0,0 +1,314 @@
+__all__ = ["Randomizer"]
+
+import random
+from bisect import bisect_right
+from itertools import accumulate
+
+from ._base import MObject
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, fall back to the random module
+    np = None
+
+
+class Randomizer(MObject):
+    """
+    A Randomizer draws random values for a group of signals in batches.
+
+    The signals and their widths are collected once. Each call of randomize draws the
+    values of all signals with a few calls to a NumPy Generator, including signals that
+    are wider than 64 bits. When NumPy is not installed, random.Random is used instead.
+    """
+
+    def __init__(self, signals, seed=None):
+        """
+        Args:
+            signals: An iterable of (name, signal) tuples, the signals must be writable.
+            seed: The seed of the random generator.
+        """
+
+        self.names = []
+        self.signals = []
+        self.widths = []
+        for name, signal in signals:
+            self.names.append(name)
+            self.signals.append(signal)
+            self.widths.append(max(signal.W(), 1))
+
+        self.__index = {name: idx for idx, name in enumerate(self.names)}
+        self.__ranges = {}  # index -> (low, high)
+        self.__dists = {}  # index -> (cumulative weights, items)
+        self.__excluded = set()
+        self.__plans = {}
+
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """
+        Reset the random generator with a seed.
+
+        Args:
+            seed: The seed of the random generator.
+
+        Returns:
+            The randomizer itself.
+        """
+
+        self.seed_value = seed
+        if np is not None:
+            self.generator = np.random.default_rng(seed)
+        else:
+            self.generator = random.Random(seed)
+        return self
+
+    def __get_index(self, name):
+        if name not in self.__index:
+            raise ValueError(
+                f"signal {name} is not a writable signal of the randomizer"
+            )
+        return self.__index[name]
+
+    def set_range(self, name, low, high):
+        """
+        Constrain a signal to a range.
+
+        Args:
+            name: The name of the signal.
+            low: The lower bound, inclusive.
+            high: The upper bound, inclusive.
+
+        Returns:
+            The randomizer itself.
+        """
+
+        assert low <= high, "low must be less than or equal to high"
+
+        idx = self.__get_index(name)
+        self.__ranges[idx] = (low, high)
+        self.__dists.pop(idx, None)
+        self.__plans.clear()
+        return self
+
+    def set_dist(self, name, dist: dict):
+        """
+        Constrain a signal to a weighted distribution.
+
+        Args:
+            name: The name of the signal.
+            dist: A dictionary that maps a value or a (low, high) range to its weight. A value
+                  in a range is chosen uniformly.
+
+        Returns:
+            The randomizer itself.
+        """
+
+        assert len(dist) > 0, "dist must not be empty"
+
+        idx = self.__get_index(name)
+        items = list(dist.keys())
+        cum_weights = list(accumulate(dist.values()))
+        assert cum_weights[-1] > 0, "the total weight must be greater than 0"
+        self.__dists[idx] = (cum_weights, items)
+        self.__ranges.pop(idx, None)
+        self.__plans.clear()
+        return self
+
+    def clear_constraint(self, name):
+        """
+        Remove the range and distribution constraints of a signal.
+
+        Args:
+            name: The name of the signal.
+
+        Returns:
+            The randomizer itself.
+        """
+
+        idx = self.__get_index(name)
+        self.__ranges.pop(idx, None)
+        self.__dists.pop(idx, None)
+        self.__plans.clear()
+        return self
+
+    def exclude(self, *names):
+        """
+        Exclude signals from randomization.
+
+        Returns:
+            The randomizer itself.
+        """
+
+        for name in names:
+            self.__excluded.add(self.__get_index(name))
+        self.__plans.clear()
+        return self
+
+    def include(self, *names):
+        """
+        Include signals that were excluded from randomization.
+
+        Returns:
+            The randomizer itself.
+        """
+
+        for name in names:
+            self.__excluded.discard(self.__get_index(name))
+        self.__plans.clear()
+        return self
+
+    def set_exclude_mask(self, mask):
+        """
+        Set the excluded signals with a mask.
+
+        Args:
+            mask: A sequence of booleans in the order of names, True means excluded.
+
+        Returns:
+            The randomizer itself.
+        """
+
+        assert len(mask) == len(
+            self.names
+        ), "mask length must match the number of signals"
+
+        self.__excluded = {idx for idx, excluded in enumerate(mask) if excluded}
+        self.__plans.clear()
+        return self
+
+    def __get_plan(self, value_range, exclude_signals):
+        """
+        Group the signals by the way their values are drawn. The plan is cached for each
+        combination of arguments.
+        """
+
+        key = (
+            None if value_range is None else tuple(value_range),
+            tuple(exclude_signals),
+        )
+        if key in self.__plans:
+            return self.__plans[key]
+
+        excluded = set(self.__excluded)
+        for name in exclude_signals:
+            if name in self.__index:
+                excluded.add(self.__index[name])
+
+        narrow, wide, weighted = [], [], []
+        for idx, width in enumerate(self.widths):
+            if idx in excluded:
+                continue
+            if value_range is not None:
+                low, high = value_range
+            elif idx in self.__dists:
+                weighted.append((idx, *self.__dists[idx]))
+                continue
+            else:
+                low, high = self.__ranges.get(idx, (0, (1 << width) - 1))
+
+            if 0 <= low and high < (1 << 64):
+                narrow.append((idx, low, high))
+            else:
+                wide.append((idx, low, high - low + 1))
+
+        plan = {
+            "narrow_signals": [self.signals[idx] for idx, _, _ in narrow],
+            "narrow_low": [low for _, low, _ in narrow],
+            "narrow_high": [high for _, _, high in narrow],
+            "wide_signals": [self.signals[idx] for idx, _, _ in wide],
+            "wide": [
+                (low, span, (span.bit_length() + 63) // 64 + 1) for _, low, span in wide
+            ],
+            "weighted_signals": [self.signals[idx] for idx, _, _ in weighted],
+            "weighted": [(cum_weights, items) for _, cum_weights, items in weighted],
+        }
+        if np is not None:
+            plan["narrow_low"] = np.array(plan["narrow_low"], dtype=np.uint64)
+            plan["narrow_high"] = np.array(plan["narrow_high"], dtype=np.uint64)
+        plan["wide_words"] = sum(words for _, _, words in plan["wide"])
+
+        self.__plans[key] = plan
+        return plan
+
+    def __draw_narrow(self, plan):
+        if len(plan["narrow_signals"]) == 0:
+            return []
+        if np is None:
+            return [
+                self.generator.randint(low, high)
+                for low, high in zip(plan["narrow_low"], plan["narrow_high"])
+            ]
+
+        return self.generator.integers(
+            plan["narrow_low"], plan["narrow_high"], endpoint=True, dtype=np.uint64
+        ).tolist()
+
+    def __draw_wide(self, plan):
+        if len(plan["wide_signals"]) == 0:
+            return []
+        if np is None:
+            return [
+                low + self.generator.getrandbits(words * 64) % span
+                for low, span, words in plan["wide"]
+            ]
+
+        data = self.generator.bytes(plan["wide_words"] * 8)
+        values, offset = [], 0
+        for low, span, words in plan["wide"]:
+            raw = int.from_bytes(data[offset : offset + words * 8], "little")
+            values.append(low + raw % span)
+            offset += words * 8
+        return values
+
+    def __draw_weighted(self, plan):
+        if len(plan["weighted_signals"]) == 0:
+            return []
+        if np is None:
+            uniforms = [
+                self.generator.random() for _ in range(2 * len(plan["weighted"]))
+            ]
+        else:
+            uniforms = self.generator.random(2 * len(plan["weighted"])).tolist()
+
+        values = []
+        for i, (cum_weights, items) in enumerate(plan["weighted"]):
+            choice = bisect_right(cum_weights, uniforms[2 * i] * cum_weights[-1])
+            item = items[min(choice, len(items) - 1)]
+            if isinstance(item, tuple):
+                low, high = item
+                item = min(low + int(uniforms[2 * i + 1] * (high - low + 1)), high)
+            values.append(item)
+        return values
+
+    def generate(self, value_range=None, exclude_signals=()):
+        """
+        Draw a value for each signal to be randomized.
+
+        Args:
+            value_range: The range of all random values, eg. (0, 100), both values are inclusive. If None, the
+                         range and distribution constraints of each signal are used.
+            exclude_signals: Names of the signals to exclude in this call.
+
+        Returns:
+            A list of (signal, value) tuples.
+        """
+
+        plan = self.__get_plan(value_range, exclude_signals)
+        return (
+            list(zip(plan["narrow_signals"], self.__draw_narrow(plan)))
+            + list(zip(plan["wide_signals"], self.__draw_wide(plan)))
+            + list(zip(plan["weighted_signals"], self.__draw_weighted(plan)))
+        )
+
+    def randomize(self, value_range=None, exclude_signals=()):
+        """
+        Draw a value for each signal to be randomized and assign it to the signal.
+
+        Args:
+            value_range: The range of all random values, eg. (0, 100), both values are inclusive. If None, the
+                         range and distribution constraints of each signal are used.
+            exclude_signals: Names of the signals to exclude in this call.
+        """
+
+        for signal, value in self.generate(value_range, exclude_signals):
+            signal.value = value
@@ -0,0 +1,762 @@
+__all__ = [
+    "RandField",
+    "RandTransaction",
+    "constraint",
+    "TransactionStream",
+    "CoverageFeedback",
+]
+
+import itertools
+import random
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+
+from ._base import MObject
+from .funcov import CovEq
+from .funcov import CovGe
+from .funcov import CovGroup
+from .funcov import CovGt
+from .funcov import CovIn
+from .funcov import CovIsInRange
+from .funcov import CovLe
+from .funcov import CovLt
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, fall back to the random module
+    np = None
+
+
+class RandField(MObject):
+    """
+    A random field of a transaction. The value is drawn uniformly from a range, or from a
+    weighted distribution.
+    """
+
+    def __init__(self, low=0, high=None, width=None, dist=None):
+        """
+        Args:
+            low: The lower bound of the range, inclusive.
+            high: The upper bound of the range, inclusive.
+            width: The bit width of the field, the range is [0, 2**width - 1]. Used when high is None.
+            dist: A dictionary that maps a value or a (low, high) range to its weight. A value
+                  in a range is chosen uniformly. If it is set, the range is ignored.
+        """
+
+        self.name = None
+        if dist is not None:
+            self.set_dist(dist)
+        else:
+            if high is None:
+                assert width is not None, "either high or width must be set"
+                high = (1 << width) - 1
+            self.set_range(low, high)
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def set_range(self, low, high):
+        """
+        Draw the field uniformly from a range.
+
+        Args:
+            low: The lower bound, inclusive.
+            high: The upper bound, inclusive.
+        """
+
+        assert low <= high, "low must be less than or equal to high"
+
+        self.low, self.high = low, high
+        self.dist = None
+        return self
+
+    def set_dist(self, dist: dict):
+        """
+        Draw the field from a weighted distribution.
+
+        Args:
+            dist: A dictionary that maps a value or a (low, high) range to its weight.
+        """
+
+        assert len(dist) > 0, "dist must not be empty"
+
+        self.dist = dict(dist)
+        self.items = list(self.dist.keys())
+        self.cum_weights = list(accumulate(self.dist.values()))
+        assert self.cum_weights[-1] > 0, "the total weight must be greater than 0"
+        return self
+
+    def copy(self):
+        """
+        Copy the field, so that the copy can be changed without affecting the class.
+        """
+
+        field = RandField.__new__(RandField)
+        field.__dict__.update(self.__dict__)
+        return field
+
+    def draw(self, rng, n):
+        """
+        Draw n values of the field.
+
+        Args:
+            rng: The random generator, a NumPy Generator or a random.Random.
+            n: The number of values.
+
+        Returns:
+            A list of values.
+        """
+
+        if self.dist is not None:
+            return self.__draw_dist(rng, n)
+        return RandField.draw_range(rng, self.low, self.high, n)
+
+    @staticmethod
+    def draw_range(rng, low, high, n):
+        """
+        Draw n values uniformly from [low, high].
+        """
+
+        if np is None:
+            return [rng.randint(low, high) for _ in range(n)]
+
+        if 0 <= low and high < (1 << 64):
+            return rng.integers(
+                low, high, size=n, endpoint=True, dtype=np.uint64
+            ).tolist()
+
+        span = high - low + 1
+        nbytes = ((span.bit_length() + 63) // 64 + 1) * 8
+        data = rng.bytes(nbytes * n)
+        return [
+            low + int.from_bytes(data[i * nbytes : (i + 1) * nbytes], "little") % span
+            for i in range(n)
+        ]
+
+    def __draw_dist(self, rng, n):
+        if np is None:
+            choices = [
+                bisect_right(self.cum_weights, rng.random() * self.cum_weights[-1])
+                for _ in range(n)
+            ]
+        else:
+            choices = np.searchsorted(
+                self.cum_weights, rng.random(n) * self.cum_weights[-1], side="right"
+            ).tolist()
+
+        values = []
+        last = len(self.items) - 1
+        for choice in choices:
+            item = self.items[min(choice, last)]
+            if isinstance(item, tuple):
+                item = RandField.draw_range(rng, item[0], item[1], 1)[0]
+            values.append(item)
+        return values
+
+
+def constraint(*field_names, vectorized=False):
+    """
+    Decorator for a relation between fields of a RandTransaction.
+
+    The decorated method accepts the values of the fields in order and returns whether they
+    satisfy the relation. It is checked as soon as all its fields are drawn, and the last drawn
+    field is redrawn for the transactions that do not satisfy it.
+
+    Args:
+        field_names: The names of the fields in the relation.
+        vectorized: If it is True, the method accepts NumPy arrays of the whole batch and returns
+                    a boolean array.
+    """
+
+    def decorator(func):
+        func.__constraint_fields__ = field_names
+        func.__constraint_vectorized__ = vectorized
+        return func
+
+    return decorator
+
+
+class RandTransaction(MObject):
+    """
+    A RandTransaction describes a constrained random transaction and generates batches of them.
+
+    Fields are declared with RandField as class attributes and relations with the constraint
+    decorator. Fields are drawn in declaration order, solve_before lists (first, second) pairs to
+    change the order.
+
+    >>> class AddTrans(RandTransaction):
+    ...     a = RandField(width=64)
+    ...     b = RandField(width=64)
+    ...     cin = RandField(dist={0: 1, 1: 3})
+    ...     solve_before = [("cin", "a")]
+    ...
+    ...     @constraint("a", "b")
+    ...     def no_overflow(self, a, b):
+    ...         return a + b < 2**64
+    """
+
+    solve_before = []
+    max_retries = 16
+
+    def __init__(self, seed=None):
+        """
+        Args:
+            seed: The seed of the random generator.
+        """
+
+        self.fields = {}
+        relations = []
+        for attr in dir(type(self)):
+            value = getattr(type(self), attr)
+            if isinstance(value, RandField):
+                self.fields[attr] = value.copy()
+            elif hasattr(value, "__constraint_fields__"):
+                relations.append(getattr(self, attr))
+
+        declared = []
+        for cls in reversed(type(self).__mro__):
+            declared.extend(key for key in cls.__dict__ if key not in declared)
+        order = sorted(self.fields, key=declared.index)
+        self.order = RandTransaction.__sort_solve_order(order, self.solve_before)
+
+        # Each relation is checked when its last field in the solve order is drawn
+        self.relations = {name: [] for name in self.order}
+        for relation in relations:
+            for name in relation.__constraint_fields__:
+                assert name in self.fields, f"constraint on unknown field {name}"
+            last = max(relation.__constraint_fields__, key=self.order.index)
+            self.relations[last].append(relation)
+
+        self.seed(seed)
+
+    @staticmethod
+    def __sort_solve_order(order, solve_before):
+        """
+        Sort the fields so that every (first, second) pair in solve_before is respected, and the
+        declaration order is kept otherwise. A field is moved just before the first
+        field that must be solved after it.
+        """
+
+        before = {name: [] for name in order}
+        for first, second in solve_before:
+            assert (
+                first in before and second in before
+            ), f"unknown field in {(first, second)}"
+            before[second].append(first)
+
+        sorted_order, visiting = [], set()
+
+        def visit(name):
+            if name in sorted_order:
+                return
+            if name in visiting:
+                raise ValueError(f"solve_before has a cycle: {solve_before}")
+            visiting.add(name)
+            for first in sorted(before[name], key=order.index):
+                visit(first)
+            sorted_order.append(name)
+
+        for name in order:
+            visit(name)
+        return sorted_order
+
+    def seed(self, seed=None):
+        """
+        Reset the random generator with a seed.
+
+        Returns:
+            The transaction generator itself.
+        """
+
+        self.seed_value = seed
+        self.rng = RandTransaction.new_rng(seed)
+        return self
+
+    @staticmethod
+    def new_rng(seed=None):
+        """
+        Create a random generator, a NumPy Generator if NumPy is installed.
+        """
+
+        if np is not None:
+            return np.random.default_rng(seed)
+        return random.Random(None if seed is None else str(seed))
+
+    def set_range(self, name, low, high):
+        """
+        Change the range of a field of this generator.
+
+        Returns:
+            The transaction generator itself.
+        """
+
+        self.fields[name].set_range(low, high)
+        return self
+
+    def set_dist(self, name, dist: dict):
+        """
+        Change the distribution of a field of this generator.
+
+        Returns:
+            The transaction generator itself.
+        """
+
+        self.fields[name].set_dist(dist)
+        return self
+
+    def __check_relations(self, relations, columns, rows):
+        """
+        Get the rows that do not satisfy the relations.
+        """
+
+        bad = set()
+        for relation in relations:
+            names = relation.__constraint_fields__
+            if relation.__constraint_vectorized__:
+                assert np is not None, "vectorized constraints need numpy"
+                args = [
+                    np.asarray([columns[name][row] for row in rows]) for name in names
+                ]
+                results = np.asarray(relation(*args), dtype=bool).tolist()
+                bad.update(row for row, ok in zip(rows, results) if not ok)
+            else:
+                for row in rows:
+                    if not relation(*(columns[name][row] for name in names)):
+                        bad.add(row)
+        return sorted(bad)
+
+    def __solve(self, rng, n):
+        """
+        Draw n rows and drop the rows that cannot satisfy the relations.
+        """
+
+        columns = {}
+        valid = [True] * n
+        for name in self.order:
+            field = self.fields[name]
+            columns[name] = field.draw(rng, n)
+            relations = self.relations[name]
+            if len(relations) == 0:
+                continue
+
+            rows = [row for row in range(n) if valid[row]]
+            for _ in range(self.max_retries):
+                rows = self.__check_relations(relations, columns, rows)
+                if len(rows) == 0:
+                    break
+                for row, value in zip(rows, field.draw(rng, len(rows))):
+                    columns[name][row] = value
+            else:
+                rows = self.__check_relations(relations, columns, rows)
+
+            for row in rows:
+                valid[row] = False
+
+        return {
+            name: list(itertools.compress(col, valid)) for name, col in columns.items()
+        }
+
+    def generate_columns(self, n, seed=None):
+        """
+        Generate n transactions as columns.
+
+        Args:
+            n: The number of transactions.
+            seed: If it is not None, a new generator with this seed is used for this batch.
+
+        Returns:
+            A dictionary that maps each field name to a list of n values.
+        """
+
+        rng = self.rng if seed is None else RandTransaction.new_rng(seed)
+        columns = {name: [] for name in self.order}
+        for _ in range(self.max_retries):
+            remain = n - len(columns[self.order[0]])
+            if remain == 0:
+                return columns
+            # Draw some more rows than needed, as some of them may be dropped
+            solved = self.__solve(rng, remain + remain // 4 + 1)
+            for name in self.order:
+                columns[name].extend(solved[name][:remain])
+
+        if len(columns[self.order[0]]) < n:
+            raise ValueError(
+                f"the constraints of {type(self).__name__} cannot be solved"
+            )
+        return columns
+
+    def generate(self, n, seed=None):
+        """
+        Generate n transactions.
+
+        Args:
+            n: The number of transactions.
+            seed: If it is not None, a new generator with this seed is used for this batch.
+
+        Returns:
+            A list of n dictionaries that map each field name to its value.
+        """
+
+        columns = self.generate_columns(n, seed)
+        return [dict(zip(self.order, row)) for row in zip(*columns.values())]
+
+    def stream(self, batch_size=1024, background=None):
+        """
+        Create a stream of transactions that is generated in batches.
+
+        Args:
+            batch_size: The number of transactions in each batch.
+            background: None to generate in the caller, "thread" or "process" to generate the next
+                        batch in the background while the current batch is consumed.
+
+        Returns:
+            A TransactionStream.
+        """
+
+        return TransactionStream(self, batch_size, background)
+
+
+class TransactionStream(MObject):
+    """
+    A TransactionStream yields the transactions of a RandTransaction one by one, while they are
+    generated in batches. In background mode, the next batch is generated by a thread or a
+    process while the current one is consumed.
+    """
+
+    def __init__(self, generator: RandTransaction, batch_size=1024, background=None):
+        assert batch_size > 0, "batch_size must be greater than 0"
+        assert background in (
+            None,
+            "thread",
+            "process",
+        ), f"Invalid background: {background}"
+
+        self.generator = generator
+        self.batch_size = batch_size
+        self.background = background
+
+        self.__batch = iter(())
+        self.__batch_count = 0
+        self.__executor = None
+        self.__future = None
+
+    def __next_seed(self):
+        """
+        Get the seed of the next background batch, derived from the seed of the generator so that
+        the stream is reproducible.
+        """
+
+        self.__batch_count += 1
+        if self.generator.seed_value is None:
+            return random.getrandbits(64)
+        return [self.generator.seed_value, self.__batch_count]
+
+    def __submit(self):
+        self.__future = self.__executor.submit(
+            self.generator.generate, self.batch_size, self.__next_seed()
+        )
+
+    def __next_batch(self):
+        if self.background is None:
+            return self.generator.generate(self.batch_size)
+
+        if self.__executor is None:
+            if self.background == "thread":
+                self.__executor = ThreadPoolExecutor(max_workers=1)
+            else:
+                self.__executor = ProcessPoolExecutor(max_workers=1)
+            self.__submit()
+
+        batch = self.__future.result()
+        self.__submit()
+        return batch
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self.__batch, None)
+        if item is None:
+            self.__batch = iter(self.__next_batch())
+            item = next(self.__batch)
+        return item
+
+    def take(self, n):
+        """
+        Get the next n transactions.
+        """
+
+        return list(itertools.islice(self, n))
+
+    async def drive(self, method, count):
+        """
+        Call a driver method with the next count transactions, the fields are passed as keyword
+        arguments.
+
+        Args:
+            method: The driver method, such as agent.exec_add.
+            count: The number of calls.
+
+        Returns:
+            A list of the results of the calls.
+        """
+
+        results = []
+        for item in itertools.islice(self, count):
+            results.append(await method(**item))
+        return results
+
+    def close(self):
+        """
+        Stop the background generation.
+        """
+
+        if self.__executor is not None:
+            if self.__future is not None:
+                self.__future.cancel()
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
+            self.__future = None
+
+    def __del__(self):
+        self.close()
+
+
+class CoverageFeedback(MObject):
+    """
+    A CoverageFeedback links a RandTransaction to coverage groups. Before each batch, it looks for
+    the unhit bins whose conditions can be solved for a field, and biases the distribution of the
+    field toward the values that hit them. Generation stops once the coverage saturates.
+
+    A bin can be solved when its condition is CovEq, CovIn, CovIsInRange, CovGt, CovGe, CovLt,
+    CovLe, or a list of them that reduces to one range. Other bins are left to the random
+    distribution.
+    """
+
+    def __init__(
+        self,
+        generator: RandTransaction,
+        groups,
+        targets: dict,
+        bias=0.5,
+        batch_size=64,
+        patience=16,
+    ):
+        """
+        Args:
+            generator: The transaction generator.
+            groups: A CovGroup or a list of CovGroups.
+            targets: A dictionary that maps a field name to the target it drives, the target is
+                     the object watched by the points (such as a pin), or a point name.
+            bias: The probability to draw the value of a field from its unhit bins.
+            batch_size: The number of transactions generated between two updates.
+            patience: The number of batches without new bin hits after which the coverage is
+                      considered saturated.
+        """
+
+        assert 0 <= bias <= 1, "bias must be between 0 and 1"
+
+        self.generator = generator
+        self.groups = [groups] if isinstance(groups, CovGroup) else list(groups)
+        self.targets = targets
+        self.bias = bias
+        self.batch_size = batch_size
+        self.patience = patience
+
+        for name in targets:
+            assert name in generator.fields, f"unknown field {name}"
+        self.__base_fields = {name: generator.fields[name] for name in targets}
+        self.__last_hints = -1
+        self.__stalled_batches = 0
+        self.transaction_count = 0
+
+    def __field_points(self, name):
+        target = self.targets[name]
+        for group in self.groups:
+            for point_name, point in group.cov_points.items():
+                if point["taget"] is target or point_name == target:
+                    yield point
+
+    @staticmethod
+    def solve_condition(condition, low, high):
+        """
+        Get the ranges of values in [low, high] that satisfy a bin condition.
+
+        Returns:
+            A list of (low, high) ranges, or None if the condition cannot be solved.
+        """
+
+        if isinstance(condition, (list, tuple)):
+            ranges = [(low, high)]
+            for c in condition:
+                solved = CoverageFeedback.solve_condition(c, low, high)
+                if solved is None:
+                    return None
+                ranges = [
+                    (max(l1, l2), min(h1, h2))
+                    for l1, h1 in ranges
+                    for l2, h2 in solved
+                    if max(l1, l2) <= min(h1, h2)
+                ]
+            return ranges
+
+        if isinstance(condition, CovEq):
+            ranges = [(condition.value, condition.value)]
+        elif isinstance(condition, CovIn):
+            ranges = [(value, value) for value in condition.value]
+        elif isinstance(condition, CovIsInRange):
+            ranges = [(condition.low, condition.high)]
+        elif isinstance(condition, CovGt):
+            ranges = [(condition.value + 1, high)]
+        elif isinstance(condition, CovGe):
+            ranges = [(condition.value, high)]
+        elif isinstance(condition, CovLt):
+            ranges = [(low, condition.value - 1)]
+        elif isinstance(condition, CovLe):
+            ranges = [(low, condition.value)]
+        else:
+            return None
+
+        ranges = [(max(l, low), min(h, high)) for l, h in ranges if isinstance(l, int)]
+        return [(l, h) for l, h in ranges if l <= h]
+
+    def __field_bounds(self, field):
+        if field.dist is None:
+            return field.low, field.high
+        bounds = [
+            item if isinstance(item, tuple) else (item, item) for item in field.items
+        ]
+        return min(l for l, _ in bounds), max(h for _, h in bounds)
+
+    def __flush_groups(self):
+        """
+        Evaluate the deferred samples of the groups, so that their hints are up to date.
+        """
+
+        for group in self.groups:
+            group.flush()
+
+    def unhit_targets(self, name):
+        """
+        Get the ranges of values of a field that can hit its unhit bins.
+
+        Args:
+            name: The name of the field.
+
+        Returns:
+            A list of (low, high) ranges.
+        """
+
+        self.__flush_groups()
+        low, high = self.__field_bounds(self.__base_fields[name])
+        ranges = []
+        for point in self.__field_points(name):
+            for bin_name, bin in point["bins"].items():
+                if point["hints"][bin_name] > 0:
+                    continue
+                solved = CoverageFeedback.solve_condition(bin, low, high)
+                if solved:
+                    ranges.extend(solved)
+        return ranges
+
+    def update(self):
+        """
+        Bias the fields of the generator toward their unhit bins.
+        """
+
+        for name, base in self.__base_fields.items():
+            ranges = self.unhit_targets(name)
+            if len(ranges) == 0 or self.bias == 0:
+                self.generator.fields[name] = base
+                continue
+
+            field = base.copy()
+            if base.dist is None:
+                dist = {(base.low, base.high): 1 - self.bias}
+            else:
+                total = base.cum_weights[-1]
+                dist = {k: w / total * (1 - self.bias) for k, w in base.dist.items()}
+            for low, high in ranges:
+                key = low if low == high else (low, high)
+                dist[key] = dist.get(key, 0) + self.bias / len(ranges)
+            self.generator.fields[name] = field.set_dist(dist)
+
+    def restore(self):
+        """
+        Remove the bias from the fields of the generator.
+        """
+
+        self.generator.fields.update(self.__base_fields)
+
+    def hint_count(self):
+        """
+        Get the number of hit bins of the groups.
+        """
+
+        self.__flush_groups()
+        return sum(
+            1
+            for group in self.groups
+            for point in group.cov_points.values()
+            for hints in point["hints"].values()
+            if hints > 0
+        )
+
+    def saturated(self):
+        """
+        Check whether the coverage is saturated, that is all points are covered or no new bin was
+        hit for patience batches.
+        """
+
+        if all(group.is_all_covered() for group in self.groups):
+            return True
+        return self.__stalled_batches >= self.patience
+
+    def __next_batch(self):
+        hints = self.hint_count()
+        if hints > self.__last_hints:
+            self.__last_hints = hints
+            self.__stalled_batches = 0
+        else:
+            self.__stalled_batches += 1
+
+        if self.saturated():
+            return None
+        self.update()
+        return self.generator.generate(self.batch_size)
+
+    def __iter__(self):
+        """
+        Yield the biased transactions until the coverage saturates. The groups are expected to be
+        sampled while the transactions are consumed.
+        """
+
+        while True:
+            batch = self.__next_batch()
+            if batch is None:
+                self.restore()
+                return
+            for item in batch:
+                self.transaction_count += 1
+                yield item
+
+    async def drive(self, method, max_count=None):
+        """
+        Call a driver method with biased transactions until the coverage saturates.
+
+        Args:
+            method: The driver method, such as agent.exec_add.
+            max_count: The maximum number of calls, None for no limit.
+
+        Returns:
+            The number of calls.
+        """
+
+        count = 0
+        for item in itertools.islice(self, max_count):
+            await method(**item)
+            count += 1
+        self.restore()
+        return count
@@ -0,0 +1,344 @@
+__all__ = ["TraceHandler", "TraceRecord", "read_trace", "trace_summary"]
+
+import argparse
+import fnmatch
+import logging
+import re
+import struct
+import sys
+from collections import namedtuple
+
+"""Binary trace log
+
+A trace file starts with a header, followed by a stream of entries, each led by a tag byte.
+A string entry defines an interned string, the message templates, log ids, file names and
+logger names are written once and referred to by their ids. A record entry holds the cycle,
+the level, the ids of its strings, and the arguments of the message, which is only rendered
+when the file is read.
+"""
+
+MAGIC = b"TOFTRACE"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sI")  # magic, version
+_STRING = struct.Struct("<II")  # id, length
+# cycle, level, logger, log id, template, filename, lineno, created, number of args
+_RECORD = struct.Struct("<qBIIIIIdH")
+_TAG = struct.Struct("<B")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_LEN = struct.Struct("<I")
+
+TAG_STRING = 0
+TAG_RECORD = 1
+
+ARG_NONE = 0
+ARG_INT = 1
+ARG_BIGINT = 2
+ARG_FLOAT = 3
+ARG_STR = 4
+ARG_BOOL = 5
+
+_INT_MIN = -(1 << 63)
+_INT_MAX = (1 << 63) - 1
+
+
+def _encode_arg(value):
+    if value is None:
+        return _TAG.pack(ARG_NONE)
+    if isinstance(value, bool):
+        return _TAG.pack(ARG_BOOL) + _TAG.pack(value)
+    if isinstance(value, int):
+        if _INT_MIN <= value <= _INT_MAX:
+            return _TAG.pack(ARG_INT) + _INT.pack(value)
+        data = str(value).encode()
+        return _TAG.pack(ARG_BIGINT) + _LEN.pack(len(data)) + data
+    if isinstance(value, float):
+        return _TAG.pack(ARG_FLOAT) + _FLOAT.pack(value)
+    data = str(value).encode("utf-8", "backslashreplace")
+    return _TAG.pack(ARG_STR) + _LEN.pack(len(data)) + data
+
+
+class TraceHandler(logging.Handler):
+    """
+    Writes the records as compact binary entries with buffered appends. The severity and id
+    statistics of summary() are counted from the records written here, the same counts
+    trace_summary gets from the file.
+
+    Args:
+        filename: The trace file, it is overwritten.
+        buffer_size: The size of the write buffer.
+    """
+
+    def __init__(self, filename, buffer_size=1 << 20):
+        logging.Handler.__init__(self)
+        self.filename = filename
+        self.file = open(filename, "wb", buffering=buffer_size)
+        self.file.write(_HEADER.pack(MAGIC, VERSION))
+        self.strings = {}
+        self.serverity_stats = {}
+        self.id_stats = {}
+
+    def intern(self, string) -> int:
+        """
+        Get the id of a string, its definition is written the first time it is seen.
+        """
+
+        idx = self.strings.get(string)
+        if idx is None:
+            idx = self.strings[string] = len(self.strings)
+            data = string.encode("utf-8", "backslashreplace")
+            self.file.write(_TAG.pack(TAG_STRING) + _STRING.pack(idx, len(data)) + data)
+        return idx
+
+    def emit(self, record):
+        try:
+            template, args = record.msg, record.args
+            if not isinstance(template, str) or isinstance(args, dict):
+                template, args = record.getMessage(), ()
+            elif args is None:
+                args = ()
+            if record.exc_info:
+                if not record.exc_text:
+                    record.exc_text = logging.Formatter().formatException(
+                        record.exc_info
+                    )
+            if record.exc_text:
+                template, args = record.getMessage() + "\n" + record.exc_text, ()
+
+            log_id = str(getattr(record, "log_id", ""))
+            entry = _TAG.pack(TAG_RECORD) + _RECORD.pack(
+                getattr(record, "cycle", -1),
+                record.levelno,
+                self.intern(record.name),
+                self.intern(log_id),
+                self.intern(template),
+                self.intern(record.filename),
+                record.lineno,
+                record.created,
+                len(args),
+            )
+            self.file.write(entry + b"".join(map(_encode_arg, args)))
+
+            levelname = record.levelname
+            self.serverity_stats[levelname] = self.serverity_stats.get(levelname, 0) + 1
+            log_id = log_id or "default"
+            self.id_stats[log_id] = self.id_stats.get(log_id, 0) + 1
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+        logging.Handler.close(self)
+
+
+class TraceRecord(
+    namedtuple(
+        "TraceRecord",
+        ["cycle", "levelno", "name", "log_id", "template", "args"]
+        + ["filename", "lineno", "created"],
+    )
+):
+    """
+    A record read from a trace file.
+    """
+
+    @property
+    def levelname(self):
+        return logging.getLevelName(self.levelno)
+
+    @property
+    def message(self):
+        if not self.args:
+            return self.template
+        try:
+            return self.template % self.args
+        except (TypeError, ValueError):
+            return " ".join([self.template] + [str(arg) for arg in self.args])
+
+    def format(self, color=False):
+        """
+        Render the record in the default format of toffee.logger.
+        """
+
+        log_id = f"(id: {self.log_id})" if self.log_id else ""
+        cycle = f"[{self.cycle}] " if self.cycle >= 0 else ""
+        text = (
+            f"{cycle}{self.name}_{self.levelname} @{self.filename}:{self.lineno}"
+            f"{log_id}:\t{self.message}"
+        )
+        if color:
+            from .logger import RESET
+            from .logger import ToffeeFormatter
+            from .logger import WHITE
+
+            text = (
+                f"{ToffeeFormatter.log_colors.get(self.levelname, WHITE)}{text}{RESET}"
+            )
+        return text
+
+
+class _Reader:
+    def __init__(self, file):
+        self.file = file
+
+    def read(self, size):
+        data = self.file.read(size)
+        if len(data) != size:
+            raise ValueError("Truncated trace file")
+        return data
+
+    def unpack(self, fmt):
+        return fmt.unpack(self.read(fmt.size))
+
+    def arg(self):
+        (kind,) = self.unpack(_TAG)
+        if kind == ARG_NONE:
+            return None
+        if kind == ARG_BOOL:
+            return bool(self.unpack(_TAG)[0])
+        if kind == ARG_INT:
+            return self.unpack(_INT)[0]
+        if kind == ARG_FLOAT:
+            return self.unpack(_FLOAT)[0]
+        (length,) = self.unpack(_LEN)
+        data = self.read(length).decode("utf-8")
+        return int(data) if kind == ARG_BIGINT else data
+
+
+def read_trace(filename):
+    """
+    Read the records of a trace file.
+
+    Returns:
+        An iterator of TraceRecord, in the order they were written.
+    """
+
+    with open(filename, "rb") as f:
+        reader = _Reader(f)
+        magic, version = reader.unpack(_HEADER)
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a toffee trace file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported trace file version {version}")
+
+        strings = []
+        while True:
+            tag = f.read(1)
+            if not tag:
+                return
+            if tag[0] == TAG_STRING:
+                idx, length = reader.unpack(_STRING)
+                assert idx == len(strings), "Corrupted trace file"
+                strings.append(reader.read(length).decode("utf-8"))
+            elif tag[0] == TAG_RECORD:
+                (
+                    cycle,
+                    level,
+                    name,
+                    log_id,
+                    template,
+                    filename_id,
+                    lineno,
+                    created,
+                    n,
+                ) = reader.unpack(_RECORD)
+                args = tuple(reader.arg() for _ in range(n))
+                yield TraceRecord(
+                    cycle,
+                    level,
+                    strings[name],
+                    strings[log_id],
+                    strings[template],
+                    args,
+                    strings[filename_id],
+                    lineno,
+                    created,
+                )
+            else:
+                raise ValueError(f"Unknown entry {tag[0]} in the trace file")
+
+
+def trace_summary(filename):
+    """
+    Count the records of a trace file by severity and by id, as summary() does.
+    """
+
+    serverity_stats, id_stats = {}, {}
+    for record in read_trace(filename):
+        levelname = record.levelname
+        serverity_stats[levelname] = serverity_stats.get(levelname, 0) + 1
+        log_id = record.log_id or "default"
+        id_stats[log_id] = id_stats.get(log_id, 0) + 1
+    return {"severity": serverity_stats, "id": id_stats}
+
+
+def _level(name):
+    level = logging.getLevelName(name.upper())
+    if not isinstance(level, int):
+        raise argparse.ArgumentTypeError(f"unknown level {name}")
+    return level
+
+
+def _cycles(text):
+    lo, _, hi = text.partition(":")
+    return (int(lo) if lo else None, int(hi) if hi else None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="toffee-trace", description="Render a toffee trace file"
+    )
+    parser.add_argument("file", help="the trace file")
+    parser.add_argument(
+        "-l", "--level", type=_level, default=0, help="the minimum level to show"
+    )
+    parser.add_argument(
+        "-i", "--id", action="append", help="show the records of this log id pattern"
+    )
+    parser.add_argument(
+        "-g", "--grep", type=re.compile, help="show the messages matching this regex"
+    )
+    parser.add_argument(
+        "-c", "--cycles", type=_cycles, help="show the records in the cycles LO:HI"
+    )
+    parser.add_argument("--color", action="store_true", help="colorize the output")
+    parser.add_argument(
+        "-s", "--summary", action="store_true", help="only print the counts"
+    )
+    args = parser.parse_args(argv)
+
+    if args.summary:
+        stats = trace_summary(args.file)
+        print("* Report counts by severity")
+        for k, v in stats["severity"].items():
+            print(f"{k}:\t{v}")
+        print("* Report counts by id")
+        for k, v in stats["id"].items():
+            print(f"{k}:\t{v}")
+        return 0
+
+    lo, hi = args.cycles or (None, None)
+    out = sys.stdout
+    for record in read_trace(args.file):
+        if record.levelno < args.level:
+            continue
+        if lo is not None and record.cycle < lo or hi is not None and record.cycle > hi:
+            continue
+        if args.id and not any(fnmatch.fnmatch(record.log_id, p) for p in args.id):
+            continue
+        if args.grep and not args.grep.search(record.message):
+            continue
+        out.write(record.format(args.color) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+__all__ = ["TransactionTrace", "read_transactions", "transactions_dataframe"]
+
+import asyncio
+import json
+import struct
+from array import array
+
+from ._base import _from_le
+from ._base import _to_le
+from ._base import MObject
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, the columns are read as arrays
+    np = None
+
+"""Transaction trace
+
+A trace file starts with a header, followed by entries led by a tag byte. A string entry
+defines the name of a component, a chunk entry holds a number of transactions column by
+column: the kind, the component, the start and end cycles, and the end offsets of the
+payloads, followed by the payloads, which are the arguments and the result of each
+transaction in JSON.
+"""
+
+MAGIC = b"TOFTXTRC"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sI")  # magic, version
+_TAG = struct.Struct("<B")
+_STRING = struct.Struct("<II")  # id, length
+_CHUNK = struct.Struct("<IQ")  # number of transactions, payload size
+
+TAG_STRING = 0
+TAG_CHUNK = 1
+
+KIND_DRIVER = 0
+KIND_MONITOR = 1
+
+_COLUMNS = [("kind", "B"), ("component", "I"), ("start", "q"), ("end", "q")]
+
+
+class TransactionTrace(MObject):
+    """
+    Writes the driver calls and monitor items of agents to a columnar trace file.
+
+    The transactions are appended to preallocated column arrays and written a chunk at a
+    time, a transaction only allocates its JSON payload. Use attach to trace the drivers and
+    monitors of an agent.
+
+    Args:
+        filename: The trace file, it is overwritten.
+        chunk_size: The number of transactions in a chunk.
+    """
+
+    def __init__(self, filename, chunk_size=4096):
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.file = open(filename, "wb")
+        self.file.write(_HEADER.pack(MAGIC, VERSION))
+        self.components = {}
+        self.count = 0
+
+        self.__columns = [array(typecode) for _, typecode in _COLUMNS]
+        self.__offsets = array("Q")
+        self.__payload = bytearray()
+        self.__encode = json.JSONEncoder(separators=(",", ":"), default=str).encode
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def attach(self, agent):
+        """
+        Trace all the drivers and monitors of an agent.
+        """
+
+        for component in list(agent.drivers.values()) + list(agent.monitors.values()):
+            component.trace = self
+        return self
+
+    def detach(self, agent):
+        """
+        Stop tracing the drivers and monitors of an agent.
+        """
+
+        for component in list(agent.drivers.values()) + list(agent.monitors.values()):
+            if component.trace is self:
+                component.trace = None
+        return self
+
+    @staticmethod
+    def cycle():
+        """
+        Get the current cycle of the clock loop, -1 if the clock is not started.
+        """
+
+        return getattr(asyncio.get_event_loop(), "cycle", -1)
+
+    def __intern(self, name):
+        idx = self.components.get(name)
+        if idx is None:
+            idx = self.components[name] = len(self.components)
+            data = name.encode()
+            self.file.write(_TAG.pack(TAG_STRING) + _STRING.pack(idx, len(data)) + data)
+        return idx
+
+    def add(self, kind, component, start, args, result):
+        """
+        Add a transaction that ends in the current cycle.
+
+        Args:
+            kind: KIND_DRIVER or KIND_MONITOR.
+            component: The name of the driver or monitor.
+            start: The cycle the transaction started in.
+            args: The arguments of a driver call, None for a monitor.
+            result: The result of the driver call, or the item of the monitor.
+        """
+
+        kinds, components, starts, ends = self.__columns
+        kinds.append(kind)
+        components.append(self.__intern(component))
+        starts.append(start)
+        ends.append(TransactionTrace.cycle())
+        self.__payload += self.__encode([args, result]).encode()
+        self.__offsets.append(len(self.__payload))
+
+        if len(kinds) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the pending transactions as a chunk.
+        """
+
+        nrows = len(self.__offsets)
+        if nrows == 0 or self.file.closed:
+            return
+
+        self.file.write(_TAG.pack(TAG_CHUNK) + _CHUNK.pack(nrows, len(self.__payload)))
+        for column in self.__columns + [self.__offsets]:
+            self.file.write(_to_le(column))
+            del column[:]
+        self.file.write(self.__payload)
+        self.__payload.clear()
+        self.file.flush()
+        self.count += nrows
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def read_transactions(filename):
+    """
+    Read a transaction trace.
+
+    Returns:
+        A dict of columns. "kind", "start" and "end" are NumPy arrays if NumPy is installed,
+        "component" is the list of the component names, "args" and "result" are the decoded
+        payloads.
+    """
+
+    columns = {name: array(typecode) for name, typecode in _COLUMNS}
+    args, results, names = [], [], []
+
+    with open(filename, "rb") as f:
+        magic, version = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a toffee transaction trace")
+        if version != VERSION:
+            raise ValueError(f"Unsupported transaction trace version {version}")
+
+        while True:
+            tag = f.read(1)
+            if not tag:
+                break
+            if tag[0] == TAG_STRING:
+                idx, length = _STRING.unpack(f.read(_STRING.size))
+                assert idx == len(names), "Corrupted transaction trace"
+                names.append(f.read(length).decode())
+            elif tag[0] == TAG_CHUNK:
+                nrows, size = _CHUNK.unpack(f.read(_CHUNK.size))
+                for name, typecode in _COLUMNS:
+                    itemsize = array(typecode).itemsize
+                    columns[name].extend(_from_le(typecode, f.read(itemsize * nrows)))
+                offsets = _from_le("Q", f.read(8 * nrows))
+                payload = f.read(size)
+                begin = 0
+                for end in offsets:
+                    a, r = json.loads(payload[begin:end])
+                    args.append(a)
+                    results.append(r)
+                    begin = end
+            else:
+                raise ValueError(f"Unknown entry {tag[0]} in the transaction trace")
+
+    ret = {
+        "kind": columns["kind"],
+        "component": [names[idx] for idx in columns["component"]],
+        "start": columns["start"],
+        "end": columns["end"],
+        "args": args,
+        "result": results,
+    }
+    if np is not None:
+        for name in ("kind", "start", "end"):
+            ret[name] = np.frombuffer(ret[name], dtype=ret[name].typecode).copy()
+    return ret
+
+
+def transactions_dataframe(filename):
+    """
+    Read a transaction trace into a pandas DataFrame, with a "latency" column in cycles.
+    """
+
+    import pandas as pd
+
+    df = pd.DataFrame(read_transactions(filename))
+    df["kind"] = df["kind"].map({KIND_DRIVER: "driver", KIND_MONITOR: "monitor"})
+    df["latency"] = df["end"] - df["start"]
+    return df
@@ -6,8 +6,23 @@ __all__ = [
     "Change",
     "RisingEdge",
     "FallingEdge",
+    "Trigger",
+    "Level",
+    "Rise",
+    "Fall",
+    "Edge",
+    "Predicate",
+    "Timeout",
+    "AllOf",
+    "AnyOf",
+    "Not",
+    "wait_for",
 ]
 
+import asyncio
+from operator import itemgetter
+
+from .asynchronous import task_run
 from .bundle import Bundle
 
 
@@ -123,3 +138,245 @@ async def FallingEdge(pin):
     while pin.value != 0 or pin.value == old_value:
         old_value = pin.value
         await pin.event.wait()
+
+
+"""Compound triggers
+
+Triggers are composed with &, | and ~ into one expression. Waiting on an expression adds one
+entry to the trigger watcher of the event loop, a single task that evaluates all entries after
+each clock event, so the waiting coroutine is resumed once, when the expression holds.
+"""
+
+
+class Trigger:
+    """
+    The base class of the composable triggers. Awaiting a trigger waits for it to hold at a
+    clock event, see wait_for.
+    """
+
+    def __and__(self, other):
+        return AllOf(self, other)
+
+    def __or__(self, other):
+        return AnyOf(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    def __await__(self):
+        return wait_for(self).__await__()
+
+    def probe(self):
+        """
+        Get a function that is called once per clock event while the trigger is waited for,
+        and returns whether the trigger holds. Each wait gets its own probe, so the triggers
+        with a state can be waited for concurrently.
+        """
+
+        raise NotImplementedError
+
+    def compile(self, leaves):
+        """
+        Append the leaf triggers to leaves, and return a function that computes the value of
+        the trigger from the list of the values of the leaves.
+        """
+
+        leaves.append(self)
+        return itemgetter(len(leaves) - 1)
+
+
+class Level(Trigger):
+    """
+    Holds when the value of the pin is value, or non-zero if value is None.
+    """
+
+    def __init__(self, pin, value=None):
+        self.pin = pin
+        self.value = value
+
+    def probe(self):
+        pin, value = self.pin, self.value
+        if value is None:
+            return lambda: bool(pin.value)
+        return lambda: pin.value == value
+
+
+class Predicate(Trigger):
+    """
+    Holds when func, a function without arguments, returns True.
+    """
+
+    def __init__(self, func):
+        self.func = func
+
+    def probe(self):
+        func = self.func
+        return lambda: bool(func())
+
+
+class Edge(Trigger):
+    """
+    Holds when the value of the pin differs from its value at the previous clock event, or at
+    the start of the wait.
+    """
+
+    def __init__(self, pin):
+        self.pin = pin
+
+    def fired(self, old, new):
+        return old != new
+
+    def probe(self):
+        pin, fired = self.pin, self.fired
+        old = [pin.value]
+
+        def probe():
+            new = pin.value
+            ret = fired(old[0], new)
+            old[0] = new
+            return ret
+
+        return probe
+
+
+class Rise(Edge):
+    """
+    Holds when the pin changes from 0 to non-zero.
+    """
+
+    def fired(self, old, new):
+        return old == 0 and new != 0
+
+
+class Fall(Edge):
+    """
+    Holds when the pin changes from non-zero to 0.
+    """
+
+    def fired(self, old, new):
+        return old != 0 and new == 0
+
+
+class Timeout(Trigger):
+    """
+    Holds at the ncycles-th clock event of the wait and after it.
+    """
+
+    def __init__(self, ncycles):
+        self.ncycles = ncycles
+
+    def probe(self):
+        ncycles = self.ncycles
+        count = [0]
+
+        def probe():
+            count[0] += 1
+            return count[0] >= ncycles
+
+        return probe
+
+
+class AllOf(Trigger):
+    """
+    Holds when all the triggers hold.
+    """
+
+    def __init__(self, *triggers):
+        self.triggers = triggers
+
+    def compile(self, leaves):
+        funcs = [t.compile(leaves) for t in self.triggers]
+        return lambda values: all(f(values) for f in funcs)
+
+
+class AnyOf(Trigger):
+    """
+    Holds when any of the triggers holds.
+    """
+
+    def __init__(self, *triggers):
+        self.triggers = triggers
+
+    def compile(self, leaves):
+        funcs = [t.compile(leaves) for t in self.triggers]
+        return lambda values: any(f(values) for f in funcs)
+
+
+class Not(Trigger):
+    """
+    Holds when the trigger does not hold.
+    """
+
+    def __init__(self, trigger):
+        self.trigger = trigger
+
+    def compile(self, leaves):
+        func = self.trigger.compile(leaves)
+        return lambda values: not func(values)
+
+
+class TriggerWatcher:
+    """
+    The waits on triggers of an event loop. Its task runs only while there are waits.
+    """
+
+    def __init__(self):
+        self.entries = []  # [leaves, probes, combine, future]
+        self.task = None
+
+    @staticmethod
+    def of_loop():
+        loop = asyncio.get_event_loop()
+        watcher = getattr(loop, "trigger_watcher", None)
+        if watcher is None:
+            assert hasattr(loop, "global_clock_event"), "The clock is not started."
+            watcher = loop.trigger_watcher = TriggerWatcher()
+        return watcher
+
+    def add(self, trigger):
+        leaves = []
+        combine = trigger.compile(leaves)
+        probes = [leaf.probe() for leaf in leaves]
+        future = asyncio.get_event_loop().create_future()
+        self.entries.append((leaves, probes, combine, future))
+
+        if self.task is None:
+            self.task = asyncio.create_task(self.__watch())
+        return future
+
+    def step(self):
+        remain = []
+        for entry in self.entries:
+            leaves, probes, combine, future = entry
+            if future.done():  # the waiter is cancelled
+                continue
+            values = [probe() for probe in probes]
+            if combine(values):
+                future.set_result([t for t, v in zip(leaves, values) if v])
+            else:
+                remain.append(entry)
+        self.entries = remain
+
+    async def __watch(self):
+        loop = asyncio.get_event_loop()
+        while self.entries:
+            await loop.global_clock_event.wait()
+            self.step()
+        self.task = None
+
+
+async def wait_for(trigger: Trigger):
+    """
+    Wait for a trigger to hold at a clock event. The trigger is evaluated by the watcher of
+    the event loop, so the waiting coroutine is resumed only once.
+
+    Args:
+        trigger: The trigger to be waited for.
+
+    Returns:
+        The leaf triggers that held at the clock event, e.g. to check whether a Timeout fired.
+    """
+
+    ret = await TriggerWatcher.of_loop().add(trigger)
+    task_run()
+    return ret
@@ -0,0 +1,292 @@
+__all__ = ["DutWaveform", "WaveformController"]
+
+import asyncio
+import logging
+import os
+from collections import deque
+
+from ._base import MObject
+from .asynchronous import add_callback
+from .logger import get_logger
+from .logger import warning
+
+
+class DutWaveform(MObject):
+    """
+    The waveform operations of a DUT, each one is a method of the DUT given by its name.
+    An operation whose method is None or missing in the DUT is not supported.
+
+    Args:
+        dut: The DUT.
+        flush: Write the buffered waveform to the file.
+        pause: Stop dumping the waveform.
+        resume: Start dumping the waveform again.
+        rotate: Continue the waveform in a new file, called with the file name.
+        scope: Dump only some scopes, called with the list of the scope names.
+    """
+
+    def __init__(
+        self,
+        dut,
+        flush="FlushWaveform",
+        pause="WaveformPause",
+        resume="WaveformResume",
+        rotate="SetWaveform",
+        scope=None,
+    ):
+        self.dut = dut
+        self.methods = {
+            "flush": flush,
+            "pause": pause,
+            "resume": resume,
+            "rotate": rotate,
+            "scope": scope,
+        }
+
+    def supports(self, op):
+        name = self.methods[op]
+        return name is not None and hasattr(self.dut, name)
+
+    def call(self, op, *args):
+        if not self.supports(op):
+            raise NotImplementedError(f"The DUT does not support waveform {op}")
+        return getattr(self.dut, self.methods[op])(*args)
+
+
+class _TriggerHandler(logging.Handler):
+    def __init__(self, controller):
+        logging.Handler.__init__(self, logging.ERROR)
+        self.controller = controller
+
+    def emit(self, record):
+        self.controller.trigger()
+
+
+class WaveformController(MObject):
+    """
+    Controls when the waveform of a DUT is dumped and flushed.
+
+    The waveform is dumped while the controller is enabled, and only in the cycle windows
+    if some are added. In the failure mode, the waveform is written into segment files of
+    pre cycles and only the last two segments are kept, a trigger, e.g. an error log, keeps
+    the segments that hold the pre cycles before it and the post cycles after it. The
+    waveform is flushed every flush_interval cycles, and when dumping is paused.
+
+    The controller steps with the clock loop once attached, or with step, which is called
+    before each step of the DUT.
+
+    Args:
+        dut: The DUT, or a DutWaveform.
+        flush_interval: The number of cycles between flushes, 0 to flush only on pause.
+    """
+
+    def __init__(self, dut, flush_interval=0):
+        self.backend = dut if isinstance(dut, DutWaveform) else DutWaveform(dut)
+        self.flush_interval = flush_interval
+        self.enabled = True
+        self.windows = []  # (start, end) cycles, the end is excluded
+        self.scopes = None
+        self.cycle = 0
+        self.dumping = True
+        self.triggers = 0
+
+        self.__ring = None
+        self.__handler = None
+        self.__warned = set()
+
+    def __call(self, op, *args):
+        try:
+            self.backend.call(op, *args)
+            return True
+        except NotImplementedError as e:
+            if op not in self.__warned:
+                self.__warned.add(op)
+                warning(str(e))
+            return False
+
+    @property
+    def static(self):
+        """
+        Whether the dumping state does not depend on the cycle.
+        """
+
+        return not self.windows and self.__ring is None and not self.flush_interval
+
+    def attach(self):
+        """
+        Step the controller with the clock loop of the running event loop, the cycles of
+        the windows are then the cycles of the clock loop.
+        """
+
+        loop = asyncio.get_event_loop()
+        self.cycle = getattr(loop, "cycle", 0)
+        loop.waveform_controller = self
+        return self
+
+    def enable(self):
+        self.enabled = True
+        self.__update()
+
+    def disable(self):
+        self.enabled = False
+        self.__update()
+
+    def add_window(self, start, end):
+        """
+        Dump the waveform in the cycles from start to end, end excluded.
+        """
+
+        self.windows.append((start, end))
+        self.windows.sort()
+        self.__update()
+
+    def clear_windows(self):
+        self.windows.clear()
+        self.__update()
+
+    def select_scopes(self, scopes):
+        """
+        Dump only the given scopes, if the DUT supports it.
+        """
+
+        if self.__call("scope", list(scopes)):
+            self.scopes = list(scopes)
+
+    def dump_around_failures(self, pre, post, filename="waveform_{}.fst"):
+        """
+        Keep only the waveform around the triggers, and trigger on the error logs.
+
+        Args:
+            pre: The number of cycles kept before a trigger.
+            post: The number of cycles kept after a trigger.
+            filename: The name of the segment files, formatted with the segment number.
+        """
+
+        if not self.backend.supports("rotate"):
+            warning("The DUT does not support waveform rotate")
+            return
+        self.__ring = {
+            "pre": pre,
+            "post": post,
+            "filename": filename,
+            "index": -1,
+            "start": 0,
+            "segments": deque(),  # (file name, kept)
+            "until": -1,  # the last cycle kept after a trigger
+        }
+        self.__rotate()
+
+        if self.__handler is None:
+            self.__handler = _TriggerHandler(self)
+            get_logger().addHandler(self.__handler)
+
+    def __rotate(self):
+        ring = self.__ring
+        ring["index"] += 1
+        ring["start"] = self.cycle
+        name = ring["filename"].format(ring["index"])
+        self.backend.call("rotate", name)
+
+        segments = ring["segments"]
+        segments.append([name, self.cycle <= ring["until"]])
+        while len(segments) > 2:
+            old, kept = segments.popleft()
+            if not kept and os.path.exists(old):
+                os.remove(old)
+
+    def trigger(self):
+        """
+        Keep the waveform around the current cycle.
+        """
+
+        self.triggers += 1
+        ring = self.__ring
+        if ring is None:
+            return
+        for segment in ring["segments"]:
+            segment[1] = True
+        ring["until"] = self.cycle + ring["post"]
+
+    def wanted(self, cycle):
+        """
+        Whether the waveform of a cycle is dumped.
+        """
+
+        if not self.enabled:
+            return False
+        return not self.windows or any(s <= cycle < e for s, e in self.windows)
+
+    def __update(self):
+        want = self.wanted(self.cycle)
+        if want == self.dumping:
+            return
+        if want:
+            if self.__call("resume"):
+                self.dumping = True
+        else:
+            self.flush()
+            if self.__call("pause"):
+                self.dumping = False
+
+    def step(self, ncycles=1):
+        """
+        Update the dumping state for the next ncycles cycles, called before the DUT steps.
+        The state is only updated at the first of them.
+        """
+
+        ring = self.__ring
+        if ring is not None and self.cycle - ring["start"] >= ring["pre"]:
+            self.__rotate()
+        self.__update()
+
+        interval = self.flush_interval
+        if (
+            interval
+            and self.dumping
+            and self.cycle // interval != ((self.cycle + ncycles) // interval)
+        ):
+            self.flush()
+        self.cycle += ncycles
+
+    def flush(self):
+        if self.dumping:
+            self.__call("flush")
+
+    def close(self):
+        """
+        Flush the waveform, and in the failure mode remove the segments that are not kept.
+        """
+
+        self.flush()
+        if self.__handler is not None:
+            get_logger().removeHandler(self.__handler)
+            self.__handler = None
+        if self.__ring is not None:
+            for name, kept in self.__ring["segments"]:
+                if not kept and os.path.exists(name):
+                    os.remove(name)
+            self.__ring = None
+
+    def status(self):
+        return {
+            "enabled": self.enabled,
+            "dumping": self.dumping,
+            "cycle": self.cycle,
+            "windows": list(self.windows),
+            "scopes": self.scopes,
+            "triggers": self.triggers,
+            "segments": (
+                [name for name, _ in self.__ring["segments"]] if self.__ring else []
+            ),
+        }
+
+
+async def __process_waveform():
+    loop = asyncio.get_event_loop()
+    controller = getattr(loop, "waveform_controller", None)
+    if controller is not None:
+        controller.cycle = loop.cycle
+        controller.step()
+
+
+add_callback(__process_waveform)